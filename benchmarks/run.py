@@ -13,12 +13,15 @@ from __future__ import annotations
 import argparse
 import gc
 import json
+import os
 import platform
 import statistics
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -37,8 +40,10 @@ if _SRC.is_dir() and str(_SRC) not in sys.path:
     sys.path.insert(0, str(_SRC))
 
 from instructvault import InstructVault  # noqa: E402
-from instructvault.bundle import write_bundle  # noqa: E402
+from instructvault.bundle import load_bundle, write_bundle  # noqa: E402
 from instructvault.io import load_prompt_spec  # noqa: E402
+from instructvault.providers import OpenAIProvider  # noqa: E402
+from instructvault.spec import PromptSpec  # noqa: E402
 
 
 PROMPT_TEMPLATE = """\
@@ -171,6 +176,64 @@ def bench_bundle_load(repo_root: Path, num_prompts: int) -> Dict[str, Any]:
     }
 
 
+def bench_json_bundle_paths(bundle_path: Path, rounds: int = 10) -> Dict[str, Any]:
+    """JSON bundle load: legacy ``json.loads`` + per-spec validation vs. the
+    single-pass ``load_bundle``, and the cost of ``verify=True`` on top."""
+
+    def legacy() -> None:
+        data = json.loads(bundle_path.read_text(encoding="utf-8"))
+        {
+            p["path"]: PromptSpec.model_validate(p["spec"], context={"allow_no_tests": True})
+            for p in data.get("prompts", [])
+        }
+
+    def timed(fn: Any) -> float:
+        samples = []
+        for _ in range(rounds):
+            t0 = time.perf_counter_ns()
+            fn()
+            samples.append((time.perf_counter_ns() - t0) / 1_000_000.0)
+        return statistics.median(samples)
+
+    return {
+        "unit": "milliseconds_median",
+        "legacy_loads_then_validate": timed(legacy),
+        "single_pass": timed(lambda: load_bundle(bundle_path)),
+        "single_pass_verified": timed(lambda: load_bundle(bundle_path, verify=True)),
+    }
+
+
+def bench_binary_bundle_load(repo_root: Path, num_prompts: int) -> Dict[str, Any]:
+    """Cold load of a memory-mapped binary bundle, plus the first lookup."""
+    bundle_path = repo_root / "out" / "ivault.bundle.bin"
+    write_bundle(
+        bundle_path,
+        repo_root=repo_root,
+        prompts_dir=repo_root / "prompts",
+        ref=None,
+        fmt="binary",
+    )
+    size_bytes = bundle_path.stat().st_size
+
+    samples_ms: List[float] = []
+    first_lookup_us: List[float] = []
+    for _ in range(20):
+        t0 = time.perf_counter_ns()
+        vault = InstructVault(bundle_path=bundle_path)
+        t1 = time.perf_counter_ns()
+        vault.load_prompt("prompts/prompt_0000.prompt.yml")
+        first_lookup_us.append((time.perf_counter_ns() - t1) / 1000.0)
+        samples_ms.append((t1 - t0) / 1_000_000.0)
+
+    return {
+        "num_prompts": num_prompts,
+        "bundle_size_bytes": size_bytes,
+        "first_lookup_median_us": statistics.median(first_lookup_us),
+        "load_unit": "milliseconds_to_load_bundle",
+        **_stats(samples_ms),
+    }
+
+
 def bench_validate_throughput(repo_root: Path, num_prompts: int) -> Dict[str, Any]:
     """Throughput of parse + validate on every prompt file in the corpus."""
     prompt_files = sorted((repo_root / "prompts").glob("*.prompt.yml"))
@@ -240,6 +303,155 @@ def bench_render_via_bundle(bundle_path: Path, iters: int) -> Dict[str, Any]:
     }
 
 
+def _large_ticket(num_bytes: int = 100_000) -> str:
+    """Realistic rendered payload: prose that mentions APIs and tokens but holds no secret."""
+    line = (
+        "Customer reports the API token refresh fails after the upgrade; "
+        "they tried again at 09:41 and the highlight widget still shows an error.\n"
+    )
+    return (line * (num_bytes // len(line) + 1))[:num_bytes]
+
+
+def bench_safe_render(repo_root: Path, iters: int) -> Dict[str, Any]:
+    """Render a ~100 KB payload with ``safe=True`` (secret scan on vars + output)."""
+    vault = InstructVault(repo_root=repo_root)
+    prompt_path = "prompts/prompt_0000.prompt.yml"
+    vars_ = {"ticket_text": _large_ticket(), "customer_name": "Ava"}
+    iters = max(1, iters // 50)  # each render scans ~200 KB
+
+    for _ in range(3):
+        vault.render(prompt_path, vars=vars_, safe=True)
+
+    samples_us: List[float] = []
+    for _ in range(iters):
+        t0 = time.perf_counter_ns()
+        vault.render(prompt_path, vars=vars_, safe=True)
+        samples_us.append((time.perf_counter_ns() - t0) / 1000.0)
+
+    return {
+        "iters": iters,
+        "payload_bytes": len(vars_["ticket_text"]),
+        "unit": "microseconds_per_render",
+        **_stats(samples_us),
+    }
+
+
+def bench_cold_stampede(repo_root: Path, threads: int = 64, rounds: int = 20) -> Dict[str, Any]:
+    """Many threads hit one prompt on a cold vault at the same instant.
+
+    Reports wall time per round and how many times the spec was actually
+    parsed; with single-flight loading that should be exactly once per round.
+    """
+    prompt_path = "prompts/prompt_0000.prompt.yml"
+    samples_ms: List[float] = []
+    loads: List[int] = []
+    for _ in range(rounds):
+        vault = InstructVault(repo_root=repo_root)
+        real_load = vault._load_uncached
+        count = [0]
+        count_lock = threading.Lock()
+
+        def counting_load(path: str, ref: Optional[str], _real=real_load, _count=count, _lock=count_lock):
+            with _lock:
+                _count[0] += 1
+            return _real(path, ref)
+
+        vault._load_uncached = counting_load  # type: ignore[method-assign]
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(v=vault, b=barrier) -> None:
+            b.wait()
+            v.load_prompt(prompt_path)
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for t in pool:
+            t.start()
+        t0 = time.perf_counter_ns()
+        barrier.wait()
+        for t in pool:
+            t.join()
+        samples_ms.append((time.perf_counter_ns() - t0) / 1_000_000.0)
+        loads.append(count[0])
+
+    return {
+        "threads": threads,
+        "rounds": rounds,
+        "loads_per_round_max": max(loads),
+        "unit": "milliseconds_per_cold_round",
+        **_stats(samples_ms),
+    }
+
+
+class _StubChatHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible ``/chat/completions`` endpoint with keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    _BODY = json.dumps({
+        "id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": "pong"}}],
+    }).encode("utf-8")
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self._BODY)))
+        self.end_headers()
+        self.wfile.write(self._BODY)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+def bench_provider_clients(calls: int = 300) -> Dict[str, Any]:
+    """Provider call throughput against a local stub HTTP server.
+
+    Compares building a fresh ``OpenAI()`` client per call (the old behaviour)
+    with one pooled provider reused across calls. Needs the optional ``openai``
+    package; reports ``available: False`` without it.
+    """
+    try:
+        import openai  # noqa: F401
+    except ImportError:
+        return {"available": False}
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved = {k: os.environ.get(k) for k in ("OPENAI_BASE_URL", "OPENAI_API_KEY")}
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ["OPENAI_API_KEY"] = "stub"
+    messages = [{"role": "user", "content": "ping"}]
+    try:
+        pooled = OpenAIProvider()
+        pooled(messages, {})  # warm the connection
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            OpenAIProvider()(messages, {})
+        per_call = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            pooled(messages, {})
+        reused = time.perf_counter() - t0
+    finally:
+        server.shutdown()
+        server.server_close()
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+    return {
+        "available": True,
+        "calls": calls,
+        "new_client_per_call_rps": round(calls / per_call, 1),
+        "pooled_client_rps": round(calls / reused, 1),
+        "speedup": round(per_call / reused, 2),
+    }
+
+
 def run(num_prompts: int, iters: int) -> Dict[str, Any]:
     with tempfile.TemporaryDirectory(prefix="ivault-bench-") as tmpdir:
         tmp = Path(tmpdir)
@@ -249,7 +461,12 @@ def run(num_prompts: int, iters: int) -> Dict[str, Any]:
         bundle = bench_bundle_load(repo_root, num_prompts)
         bundle_path = repo_root / "out" / "ivault.bundle.json"
         render_bundle = bench_render_via_bundle(bundle_path, iters)
+        json_paths = bench_json_bundle_paths(bundle_path)
+        binary_bundle = bench_binary_bundle_load(repo_root, num_prompts)
+        safe_render = bench_safe_render(repo_root, iters)
         validate = bench_validate_throughput(repo_root, num_prompts)
+        stampede = bench_cold_stampede(repo_root)
+        providers = bench_provider_clients()
         memory = bench_memory(repo_root, num_prompts)
 
         return {
@@ -261,8 +478,13 @@ def run(num_prompts: int, iters: int) -> Dict[str, Any]:
             },
             "render_from_worktree": render,
             "render_from_bundle": render_bundle,
+            "safe_render_large_payload": safe_render,
             "bundle_load_and_size": bundle,
+            "json_bundle_load_paths": json_paths,
+            "binary_bundle_load": binary_bundle,
             "validate_throughput": validate,
+            "cold_stampede": stampede,
+            "provider_clients": providers,
             "memory_footprint": memory,
         }
 
@@ -271,9 +493,14 @@ def _human(results: Dict[str, Any]) -> str:
     cfg = results["config"]
     r = results["render_from_worktree"]
     rb = results["render_from_bundle"]
+    sr = results["safe_render_large_payload"]
     b = results["bundle_load_and_size"]
+    bb = results["binary_bundle_load"]
+    jp = results["json_bundle_load_paths"]
     v = results["validate_throughput"]
     m = results["memory_footprint"]
+    cs = results["cold_stampede"]
+    pc = results["provider_clients"]
 
     lines = [
         "=" * 64,
@@ -288,15 +515,35 @@ def _human(results: Dict[str, Any]) -> str:
         "Render latency (from pre-built bundle, per render):",
         f"  median = {rb['median']:>8.1f} us    p95 = {rb['p95']:>8.1f} us    max = {rb['max']:>8.1f} us",
         "",
+        f"Safe render (secret scan, {sr['payload_bytes'] // 1000} KB payload, per render):",
+        f"  median = {sr['median']:>8.1f} us    p95 = {sr['p95']:>8.1f} us    max = {sr['max']:>8.1f} us",
+        "",
         "Bundle:",
         f"  size       = {b['bundle_size_bytes']/1024.0:>8.1f} KB total"
         f"  ({b['bundle_size_kb_per_prompt']} KB per prompt)",
         f"  cold load  = {b['median']:>8.2f} ms median over 20 instantiations",
+        f"  json parse = {jp['single_pass']:>8.2f} ms single pass"
+        f"  (legacy loads+validate {jp['legacy_loads_then_validate']:.2f} ms,"
+        f" verified {jp['single_pass_verified']:.2f} ms)",
+        f"  binary     = {bb['median']:>8.2f} ms cold load"
+        f"  ({bb['bundle_size_bytes']/1024.0:.1f} KB, first lookup {bb['first_lookup_median_us']:.0f} us)",
         "",
         "Validate throughput:",
         f"  {v['prompts_per_second']} prompts/second"
         f"  ({v['elapsed_seconds']} s for {v['num_prompts']} prompts)",
         "",
+        f"Cold-cache stampede ({cs['threads']} threads, one prompt):",
+        f"  median = {cs['median']:>8.2f} ms per round"
+        f"    spec loads per round (max) = {cs['loads_per_round_max']}",
+        "",
+        "Provider calls (stub HTTP server, sequential):",
+        (
+            f"  pooled = {pc['pooled_client_rps']:>8.1f} req/s"
+            f"    new client per call = {pc['new_client_per_call_rps']:.1f} req/s ({pc['speedup']}x)"
+            if pc.get("available")
+            else "  skipped (install the optional `openai` package)"
+        ),
+        "",
         "Memory footprint (peak RSS, whole process):",
         (
             f"  peak = {m['peak_rss_mb']} MB"
@@ -31,7 +31,8 @@ if str(_HERE) not in sys.path:
 from instructvault import InstructVault  # noqa: E402
 from instructvault.bundle import write_bundle  # noqa: E402
 from instructvault.io import load_prompt_spec  # noqa: E402
-from run import PROMPT_TEMPLATE  # noqa: E402
+from instructvault.render import _scan_for_secrets  # noqa: E402
+from run import PROMPT_TEMPLATE, _large_ticket  # noqa: E402
 
 
 @pytest.fixture(scope="module")
@@ -78,7 +79,32 @@ def test_bundle_cold_load(benchmark, bundle_path: Path) -> None:
     benchmark(InstructVault, bundle_path=bundle_path)
 
 
+@pytest.fixture(scope="module")
+def binary_bundle_path(repo: Path) -> Path:
+    out = repo / "out" / "ivault.bundle.bin"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    write_bundle(out, repo_root=repo, prompts_dir=repo / "prompts", ref=None, fmt="binary")
+    return out
+
+
+def test_binary_bundle_cold_load(benchmark, binary_bundle_path: Path) -> None:
+    """Time to open a memory-mapped binary bundle (specs validated lazily)."""
+    benchmark(InstructVault, bundle_path=binary_bundle_path)
+
+
 def test_validate_one_prompt(benchmark, repo: Path) -> None:
     """Parse + validate a single prompt file."""
     text = (repo / "prompts" / "prompt_0000.prompt.yml").read_text(encoding="utf-8")
     benchmark(load_prompt_spec, text, allow_no_tests=False)
+
+
+def test_secret_scan_large_payload(benchmark) -> None:
+    """``--safe`` secret scan over a ~100 KB clean payload."""
+    benchmark(_scan_for_secrets, _large_ticket())
+
+
+def test_safe_render_large_payload(benchmark, repo: Path) -> None:
+    """Render with ``safe=True``: scans the vars and the rendered output."""
+    vault = InstructVault(repo_root=repo)
+    vars_ = {"ticket_text": _large_ticket(), "customer_name": "Ava"}
+    benchmark(vault.render, "prompts/prompt_0000.prompt.yml", vars=vars_, safe=True)
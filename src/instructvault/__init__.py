@@ -1,4 +1,5 @@
+from .cache import CachePolicy
 from .result import RenderResult
 from .sdk import InstructVault
 
-__all__ = ["InstructVault", "RenderResult"]
+__all__ = ["CachePolicy", "InstructVault", "RenderResult"]
@@ -0,0 +1,181 @@
+"""Compiled assertion plans.
+
+:func:`compile_assert` turns the deterministic part of an
+:class:`~instructvault.spec.AssertSpec` into an :class:`AssertPlan` once:
+needles are lowered and de-duplicated, regexes compiled, and the JSON Schema
+validator is built (and the schema checked) on first use. Plans are cached by
+assertion content, so dataset rows that repeat the same asserts share one plan.
+
+Needle checks use ``str``'s C-level ``in`` scan, which is fastest for the
+handful of needles a test usually has; from :data:`AUTOMATON_MIN_NEEDLES` on,
+an Aho-Corasick automaton answers in a single pass over the text instead.
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import deque
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+from .spec import AssertSpec
+
+# Below this many needles, repeated ``in`` scans beat a pure-Python automaton.
+AUTOMATON_MIN_NEEDLES = 128
+
+_PlanKey = tuple[tuple[str, ...], tuple[str, ...], tuple[str, ...], tuple[str, ...], tuple[str, ...], str | None]
+
+
+class _Automaton:
+    """Aho-Corasick matcher over a fixed needle set (each state's transitions precomputed)."""
+
+    def __init__(self, needles: Iterable[str]):
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[set[int]] = [set()]
+        self.needles = tuple(needles)
+        for i, needle in enumerate(self.needles):
+            state = 0
+            for ch in needle:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = goto[state][ch] = len(goto)
+                    goto.append({})
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add(i)
+        # Breadth-first: a state's fallback is always shallower, so already complete.
+        fail = [0] * len(goto)
+        self._delta: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            self._delta[state] = {**self._delta[fail[state]], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = self._delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+        self._out = [frozenset(o) for o in outputs]
+
+    def search(self, text: str) -> bool:
+        """True if any needle occurs in ``text``."""
+        delta, out, state = self._delta, self._out, 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                return True
+        return False
+
+    def contains_all(self, text: str) -> bool:
+        missing = set(range(len(self.needles)))
+        delta, out, state = self._delta, self._out, 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                missing -= out[state]
+                if not missing:
+                    return True
+        return not missing
+
+
+class _Needles:
+    """Lowered, de-duplicated needles with an automaton for large sets."""
+
+    def __init__(self, needles: tuple[str, ...]):
+        lowered = dict.fromkeys(n.lower() for n in needles)
+        self._empty = "" in lowered  # "" occurs in every text
+        lowered.pop("", None)
+        self.needles = tuple(lowered)
+        self._automaton = _Automaton(self.needles) if len(self.needles) >= AUTOMATON_MIN_NEEDLES else None
+
+    def any_in(self, text: str) -> bool:
+        if self._empty:
+            return True
+        if self._automaton is not None:
+            return self._automaton.search(text)
+        return any(n in text for n in self.needles)
+
+    def all_in(self, text: str) -> bool:
+        if self._automaton is not None:
+            return self._automaton.contains_all(text)
+        return all(n in text for n in self.needles)
+
+
+class AssertPlan:
+    """Reusable matcher for the deterministic checks of one assertion.
+
+    ``match(text)`` gives the same verdict as evaluating the ``AssertSpec``
+    directly. Safe to share across threads. An invalid regex raises when the
+    plan is compiled; a missing ``jsonschema`` package or an invalid schema
+    raises on the first JSON output checked, as before.
+    """
+
+    def __init__(self, key: _PlanKey):
+        contains_any, contains_all, not_contains, matches, not_matches, schema = key
+        self._any = _Needles(contains_any) if contains_any else None
+        self._all = _Needles(contains_all) if contains_all else None
+        self._none = _Needles(not_contains) if not_contains else None
+        self._matches = [re.compile(p) for p in matches]
+        self._not_matches = [re.compile(p) for p in not_matches]
+        self._schema: dict[str, Any] | None = json.loads(schema) if schema is not None else None
+        self._validator: Any = None
+        self._lock = threading.Lock()
+
+    def _schema_validator(self) -> Any:
+        if self._validator is None:
+            try:
+                import jsonschema  # type: ignore
+            except Exception as e:
+                raise ValueError("jsonschema is required for json_schema assertions") from e
+            with self._lock:
+                if self._validator is None:
+                    cls = jsonschema.validators.validator_for(self._schema)
+                    # An invalid schema (SchemaError) is an author error and raises.
+                    cls.check_schema(self._schema)
+                    self._validator = cls(self._schema)
+        return self._validator
+
+    def match(self, text: str) -> bool:
+        if self._any or self._all or self._none:
+            lowered = text.lower()
+            if self._any is not None and not self._any.any_in(lowered):
+                return False
+            if self._all is not None and not self._all.all_in(lowered):
+                return False
+            if self._none is not None and self._none.any_in(lowered):
+                return False
+        if not all(p.search(text) for p in self._matches):
+            return False
+        if any(p.search(text) for p in self._not_matches):
+            return False
+        if self._schema is not None:
+            try:
+                obj = json.loads(text)
+            except Exception:
+                return False
+            # Instance did not match the schema -> a normal assertion failure.
+            return bool(self._schema_validator().is_valid(obj))
+        return True
+
+
+def _plan_key(assert_spec: AssertSpec) -> _PlanKey:
+    schema = assert_spec.json_schema
+    return (
+        tuple(assert_spec.contains_any or ()),
+        tuple(assert_spec.contains_all or ()),
+        tuple(assert_spec.not_contains or ()),
+        tuple(assert_spec.matches or ()),
+        tuple(assert_spec.not_matches or ()),
+        json.dumps(schema, sort_keys=True) if schema else None,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _compile(key: _PlanKey) -> AssertPlan:
+    return AssertPlan(key)
+
+
+def compile_assert(assert_spec: AssertSpec) -> AssertPlan:
+    """Compiled plan for ``assert_spec``'s deterministic checks, shared by equal assertions."""
+    return _compile(_plan_key(assert_spec))
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
 import json
+import mmap
+import os
+import struct
 import subprocess
+import threading
+from collections.abc import Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
-from .io import load_prompt_spec
+from pydantic import BaseModel, Field
+
+from .io import active_parse_cache, load_prompt_spec, use_parse_cache
+from .parsecache import ParseCache
 from .spec import PromptSpec
 from .store import PromptStore
 
@@ -29,9 +39,60 @@ def _is_prompt_file(path: str) -> bool:
     lower = path.lower()
     return lower.endswith(".prompt.yml") or lower.endswith(".prompt.yaml") or lower.endswith(".prompt.json")
 
-def collect_prompts(repo_root: Path, prompts_dir: Path, ref: str | None) -> list[BundlePrompt]:
-    store = PromptStore(repo_root)
-    prompts: list[BundlePrompt] = []
+def prompt_paths_at_ref(repo_root: Path, ref: str, rel_dir: str) -> list[str]:
+    """Repo-relative prompt files under ``rel_dir`` (``"."`` for the whole tree) at ``ref``."""
+    return [p for p in _list_files_at_ref(repo_root, ref, rel_dir) if _is_prompt_file(p)]
+
+# Below this many files, starting worker processes costs more than it saves.
+_POOL_MIN_FILES = 64
+
+
+def _parse_chunk(texts: list[str], allow_no_tests: bool, cache_dir: Path | None = None) -> list[PromptSpec | None]:
+    """Worker side of :func:`parse_prompt_texts`; ``None`` marks a text that failed."""
+    if cache_dir is not None and active_parse_cache() is None:
+        use_parse_cache(ParseCache(cache_dir))  # spawned workers do not inherit the parent's
+    specs: list[PromptSpec | None] = []
+    for text in texts:
+        try:
+            specs.append(load_prompt_spec(text, allow_no_tests=allow_no_tests))
+        except Exception:
+            specs.append(None)
+    return specs
+
+
+def parse_prompt_texts(texts: Sequence[str], *, allow_no_tests: bool = True, workers: int | None = None) -> list[PromptSpec | Exception]:
+    """Parse and validate prompt sources, in input order; failures are returned, not raised.
+
+    YAML parsing and validation are CPU-bound, so with more than one worker
+    (default: one per CPU) and at least ``_POOL_MIN_FILES`` texts, chunks are
+    parsed in a process pool. Texts that fail there are parsed again in this
+    process, so each returned exception is the original one, not a copy.
+    Workers use the installed :func:`~instructvault.io.use_parse_cache` directory too.
+    """
+    workers = workers or os.cpu_count() or 1
+    parsed: list[PromptSpec | None] = [None] * len(texts)
+    if workers > 1 and len(texts) >= _POOL_MIN_FILES:
+        size = -(-len(texts) // (workers * 4))  # a few chunks per worker evens out slow files
+        chunks = [list(texts[i:i + size]) for i in range(0, len(texts), size)]
+        disk = active_parse_cache()
+        parse = partial(_parse_chunk, allow_no_tests=allow_no_tests, cache_dir=disk.directory if disk is not None else None)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = [spec for chunk in pool.map(parse, chunks) for spec in chunk]
+    results: list[PromptSpec | Exception] = []
+    for text, spec in zip(texts, parsed, strict=True):
+        if spec is None:
+            try:
+                spec = load_prompt_spec(text, allow_no_tests=allow_no_tests)
+            except Exception as e:
+                results.append(e)
+                continue
+        results.append(spec)
+    return results
+
+
+def collect_prompts(repo_root: Path, prompts_dir: Path, ref: str | None, *, workers: int | None = None) -> list[BundlePrompt]:
+    """Every prompt under ``prompts_dir`` (worktree, or ``ref``), read in bulk and
+    parsed by :func:`parse_prompt_texts`; raises the first failure in path order."""
     if ref is None:
         if not prompts_dir.exists():
             raise FileNotFoundError(f"Prompts directory not found: {prompts_dir}")
@@ -39,37 +100,205 @@ def collect_prompts(repo_root: Path, prompts_dir: Path, ref: str | None) -> list
             prompts_dir.relative_to(repo_root)
         except Exception as e:
             raise ValueError("prompts_dir must be within repo_root") from e
-        for p in sorted(prompts_dir.rglob("*.prompt.y*ml")):
-            rel_path = p.relative_to(repo_root).as_posix()
-            spec = load_prompt_spec(p.read_text(encoding="utf-8"), allow_no_tests=True)
-            prompts.append(BundlePrompt(rel_path, spec))
-        for p in sorted(prompts_dir.rglob("*.prompt.json")):
-            rel_path = p.relative_to(repo_root).as_posix()
-            spec = load_prompt_spec(p.read_text(encoding="utf-8"), allow_no_tests=True)
-            prompts.append(BundlePrompt(rel_path, spec))
-        if not prompts:
+        files = sorted(prompts_dir.rglob("*.prompt.y*ml")) + sorted(prompts_dir.rglob("*.prompt.json"))
+        if not files:
             raise ValueError(f"No prompt files found in {prompts_dir}")
-        return prompts
-
-    rel_dir = prompts_dir.relative_to(repo_root).as_posix()
-    for rel_path in _list_files_at_ref(repo_root, ref, rel_dir):
-        if not _is_prompt_file(rel_path):
-            continue
-        spec = load_prompt_spec(store.read_text(rel_path, ref=ref), allow_no_tests=True)
+        rel_paths = [p.relative_to(repo_root).as_posix() for p in files]
+        texts = [p.read_text(encoding="utf-8") for p in files]
+    else:
+        rel_dir = prompts_dir.relative_to(repo_root).as_posix()
+        rel_paths = prompt_paths_at_ref(repo_root, ref, rel_dir)
+        if not rel_paths:
+            raise ValueError(f"No prompt files found at ref {ref} in {rel_dir}")
+        # One pipelined cat-file round-trip instead of a git fork per prompt.
+        with PromptStore(repo_root, batch=True) as store:
+            texts = store.read_many(rel_paths, ref=ref)
+    prompts: list[BundlePrompt] = []
+    for rel_path, spec in zip(rel_paths, parse_prompt_texts(texts, workers=workers), strict=True):
+        if isinstance(spec, Exception):
+            raise spec
         prompts.append(BundlePrompt(rel_path, spec))
-    if not prompts:
-        raise ValueError(f"No prompt files found at ref {ref} in {rel_dir}")
     return prompts
 
-def write_bundle(out_path: Path, *, repo_root: Path, prompts_dir: Path, ref: str | None) -> None:
-    prompts = collect_prompts(repo_root, prompts_dir, ref)
+BUNDLE_FORMATS = ("json", "binary")
+
+# Binary bundle layout (all integers little-endian):
+#   magic (8 bytes) | header: prompt count u32, meta length u32 | meta JSON
+#   | index: count x (path offset u64, path length u32, spec offset u64,
+#                     spec length u32, sha256 of the canonical spec 32 bytes)
+#   | blobs: UTF-8 paths and compact spec JSON, addressed by absolute offsets.
+# Index entries are sorted by UTF-8 path bytes so lookups binary-search the
+# mapped file without building a dict, and a spec is validated on first access.
+BINARY_MAGIC = b"IVBUNDL1"
+_HEADER = struct.Struct("<II")
+_INDEX_ENTRY = struct.Struct("<QIQI32s")
+
+
+def _spec_hash(spec: PromptSpec) -> str:
+    # Imported here because lock builds on collect_prompts from this module.
+    from .lock import canonical_spec_hash
+
+    return canonical_spec_hash(spec)
+
+
+def _check_integrity(path: str, spec: PromptSpec, marker: str | None) -> None:
+    if marker is None:
+        raise ValueError(f"Bundle entry has no spec_sha256 marker to verify: {path}")
+    if _spec_hash(spec) != marker:
+        raise ValueError(f"Bundle integrity check failed for {path}: spec does not match its spec_sha256")
+
+
+def _bundle_meta(ref: str | None) -> dict[str, str]:
+    return {"bundle_version": "1.0", "ref": ref or "WORKTREE"}
+
+
+def _write_json_bundle(out_path: Path, prompts: list[BundlePrompt], ref: str | None) -> None:
     payload = {
-        "bundle_version": "1.0",
-        "ref": ref or "WORKTREE",
+        **_bundle_meta(ref),
         "prompts": [
-            {"path": p.path, "spec": p.spec.model_dump(by_alias=True)}
+            {"path": p.path, "spec_sha256": _spec_hash(p.spec), "spec": p.spec.model_dump(by_alias=True)}
             for p in prompts
         ],
     }
-    out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def _write_binary_bundle(out_path: Path, prompts: list[BundlePrompt], ref: str | None) -> None:
+    entries = sorted(
+        (
+            p.path.encode("utf-8"),
+            json.dumps(p.spec.model_dump(by_alias=True, mode="json"), separators=(",", ":")).encode("utf-8"),
+            bytes.fromhex(_spec_hash(p.spec).removeprefix("sha256:")),
+        )
+        for p in prompts
+    )
+    meta = json.dumps(_bundle_meta(ref)).encode("utf-8")
+    offset = len(BINARY_MAGIC) + _HEADER.size + len(meta) + _INDEX_ENTRY.size * len(entries)
+    index = bytearray()
+    for path, spec, digest in entries:
+        index += _INDEX_ENTRY.pack(offset, len(path), offset + len(path), len(spec), digest)
+        offset += len(path) + len(spec)
+    with out_path.open("wb") as f:
+        f.write(BINARY_MAGIC)
+        f.write(_HEADER.pack(len(entries), len(meta)))
+        f.write(meta)
+        f.write(index)
+        for path, spec, _ in entries:
+            f.write(path)
+            f.write(spec)
+
+
+def write_bundle(out_path: Path, *, repo_root: Path, prompts_dir: Path, ref: str | None, fmt: str = "json") -> None:
+    if fmt not in BUNDLE_FORMATS:
+        raise ValueError(f"Unknown bundle format '{fmt}'. Available: {', '.join(BUNDLE_FORMATS)}")
+    prompts = collect_prompts(repo_root, prompts_dir, ref)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "binary":
+        _write_binary_bundle(out_path, prompts, ref)
+    else:
+        _write_json_bundle(out_path, prompts, ref)
+
+
+class BinaryBundle(Mapping[str, PromptSpec]):
+    """Read-only, memory-mapped view of a binary bundle.
+
+    Opening reads only the fixed header, so startup cost does not grow with
+    the number of prompts, and forked workers share the mapped pages. Each
+    spec is validated the first time it is looked up and memoized after that;
+    with ``verify=True`` it is also checked against its ``spec_sha256`` marker.
+    """
+
+    def __init__(self, path: str | Path, *, verify: bool = False):
+        self._verify = verify
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(BINARY_MAGIC)] != BINARY_MAGIC:
+            self._mm.close()
+            raise ValueError(f"Not a binary InstructVault bundle: {path}")
+        pos = len(BINARY_MAGIC)
+        count, meta_len = _HEADER.unpack_from(self._mm, pos)
+        self._count: int = count
+        pos += _HEADER.size
+        self.meta: dict[str, str] = json.loads(self._mm[pos : pos + meta_len])
+        self._index_start = pos + meta_len
+        self._specs: dict[str, PromptSpec] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, i: int) -> tuple[int, int, int, int, bytes]:
+        entry: tuple[int, int, int, int, bytes] = _INDEX_ENTRY.unpack_from(
+            self._mm, self._index_start + i * _INDEX_ENTRY.size
+        )
+        return entry
+
+    def _path_at(self, i: int) -> bytes:
+        path_off, path_len, _, _, _ = self._entry(i)
+        return self._mm[path_off : path_off + path_len]
+
+    def _find(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._path_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._path_at(lo) == key:
+            return lo
+        return -1
+
+    def __getitem__(self, path: str) -> PromptSpec:
+        spec = self._specs.get(path)
+        if spec is not None:
+            return spec
+        i = self._find(path.encode("utf-8"))
+        if i < 0:
+            raise KeyError(path)
+        _, _, spec_off, spec_len, digest = self._entry(i)
+        spec = PromptSpec.model_validate_json(
+            self._mm[spec_off : spec_off + spec_len], context={"allow_no_tests": True}
+        )
+        if self._verify:
+            _check_integrity(path, spec, f"sha256:{digest.hex()}")
+        with self._lock:
+            return self._specs.setdefault(path, spec)
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and (path in self._specs or self._find(path.encode("utf-8")) >= 0)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._path_at(i).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+class _JsonBundleEntry(BaseModel):
+    path: str
+    spec: PromptSpec
+    spec_sha256: str | None = None
+
+
+class _JsonBundle(BaseModel):
+    prompts: list[_JsonBundleEntry] = Field(default_factory=list)
+
+
+def load_bundle(path: str | Path, *, verify: bool = False) -> Mapping[str, PromptSpec]:
+    """Open a bundle of either format: binary is mapped lazily, JSON is parsed eagerly.
+
+    JSON bundles are parsed and validated in a single pydantic-core pass over
+    the raw bytes. ``verify=True`` additionally checks every spec against the
+    ``spec_sha256`` marker written at build time and rejects unmarked entries.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(BINARY_MAGIC))
+    if magic == BINARY_MAGIC:
+        return BinaryBundle(path, verify=verify)
+    data = _JsonBundle.model_validate_json(Path(path).read_bytes(), context={"allow_no_tests": True})
+    if verify:
+        for entry in data.prompts:
+            _check_integrity(entry.path, entry.spec, entry.spec_sha256)
+    return {entry.path: entry.spec for entry in data.prompts}
@@ -0,0 +1,178 @@
+"""Bounded spec cache used by :class:`~instructvault.sdk.InstructVault`.
+
+Entries are keyed by ``(prompt_path, ref)`` and carry a *stamp*: the worktree
+file's mtime, or ``None`` for a pinned ref. A lookup only hits when the caller's
+current stamp matches, so worktree edits are picked up while immutable refs are
+served until evicted. Eviction is least-recently-used, bounded by entry count
+and an approximate byte budget (the size of each prompt's source text).
+:class:`SingleFlight` keeps a cold or invalidated key from being loaded by
+every concurrent caller at once.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, NamedTuple, TypeVar
+
+from .spec import PromptSpec
+
+CacheKey = tuple[str, str | None]
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Bounds for the SDK spec cache. ``None`` disables a bound.
+
+    Attributes:
+        max_entries:  Most specs kept at once.
+        max_bytes:    Approximate budget, measured as the summed source text size.
+        worktree_ttl: Seconds a worktree entry may be served before it is
+                      reloaded, even if its mtime is unchanged. Pinned refs
+                      never expire.
+    """
+
+    max_entries: int | None = 1024
+    max_bytes: int | None = None
+    worktree_ttl: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.max_entries is not None and self.max_entries < 1:
+            raise ValueError("max_entries must be >= 1 or None")
+        if self.max_bytes is not None and self.max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1 or None")
+        if self.worktree_ttl is not None and self.worktree_ttl <= 0:
+            raise ValueError("worktree_ttl must be > 0 or None")
+
+
+class SpecCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int | None
+    currsize: int
+    maxbytes: int | None
+    currbytes: int
+
+
+class _Entry(NamedTuple):
+    spec: PromptSpec
+    stamp: int | None
+    nbytes: int
+    loaded_at: float
+
+
+class SpecCache:
+    """Thread-safe LRU of parsed specs, bounded by a :class:`CachePolicy`."""
+
+    def __init__(self, policy: CachePolicy | None = None):
+        self.policy = policy or CachePolicy()
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: CacheKey, stamp: int | None) -> PromptSpec | None:
+        """Cached spec for ``key`` if it was stored with the same ``stamp`` and is fresh."""
+        ttl = self.policy.worktree_ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                expired = (
+                    stamp is not None and ttl is not None
+                    and time.monotonic() - entry.loaded_at > ttl
+                )
+                if not expired:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry.spec
+            self._misses += 1
+            return None
+
+    def put(self, key: CacheKey, spec: PromptSpec, stamp: int | None, nbytes: int) -> None:
+        max_bytes = self.policy.max_bytes
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            if max_bytes is not None and nbytes > max_bytes:
+                return  # would evict everything else and still not fit
+            self._entries[key] = _Entry(spec, stamp, nbytes, time.monotonic())
+            self._bytes += nbytes
+            self._evict()
+
+    def _evict(self) -> None:
+        max_entries, max_bytes = self.policy.max_entries, self.policy.max_bytes
+        while self._entries and (
+            (max_entries is not None and len(self._entries) > max_entries)
+            or (max_bytes is not None and self._bytes > max_bytes)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self._evictions += 1
+
+    def info(self) -> SpecCacheInfo:
+        with self._lock:
+            return SpecCacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self.policy.max_entries,
+                len(self._entries),
+                self.policy.max_bytes,
+                self._bytes,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+
+class _Call(Generic[V]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: V | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[K, V]):
+    """Collapse concurrent calls for the same key into one in-flight call.
+
+    The first caller for a key runs ``fn``; callers arriving while it runs wait
+    and receive the same result, or the same exception. Nothing is remembered
+    once the call finishes, so a failure is retried by the next caller.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[K, _Call[V]] = {}
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
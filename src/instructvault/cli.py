@@ -1,32 +1,85 @@
 from __future__ import annotations
 
+import fnmatch
+import glob
 import json
+from collections.abc import Generator, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, NamedTuple
 
 import typer
 import yaml
 from rich import print as rprint
 
-from .bundle import write_bundle
+from .bundle import BUNDLE_FORMATS, parse_prompt_texts, prompt_paths_at_ref, write_bundle
 from .diff import unified_diff
-from .eval import run_dataset, run_inline_tests
-from .io import load_dataset_jsonl, load_prompt_dict, load_prompt_spec
-from .junit import write_junit_xml
+from .eval import TestResult, iter_dataset, iter_inline_tests
+from .io import (
+    active_parse_cache,
+    iter_dataset_jsonl,
+    load_prompt,
+    load_prompt_dict,
+    load_prompt_spec,
+    use_parse_cache,
+)
+from .judge import JudgeCache
 from .lint import Finding, count_by_severity, gate, run_lint, to_markdown
-from .lock import verify_lock, write_lock
+from .lock import LockHashCache, verify_lock, write_lock
+from .manifest import EvalManifest, ManifestChanges, file_fingerprint
+from .parsecache import ParseCache
 from .policy import load_policy_module, run_spec_policy
-from .providers import get_provider
+from .providers import (
+    CACHE_MODES,
+    ClientOptions,
+    ModelPrice,
+    Provider,
+    cached_provider,
+    get_provider,
+    parse_price,
+    priced_provider,
+)
+from .ratelimit import RateLimit, RateLimiter, rate_limited
 from .render import check_required_vars, render_messages
 from .scaffold import init_repo
 from .schema import prompt_json_schema
+from .sinks import ConsoleSink, JsonlReportSink, JsonReportSink, JUnitSink, ResultSink
 from .spec import PromptSpec
 from .store import PromptStore
 
 app = typer.Typer(help="InstructVault: git-first prompt registry + CI evals + runtime SDK")
 
+
+@app.callback()
+def main(ctx: typer.Context,
+         parse_cache: Path | None = typer.Option(None, "--parse-cache", envvar="IVAULT_PARSE_CACHE", help="Share validated specs between commands via this directory (e.g. .ivault-cache)."),
+         parse_cache_max_mb: int = typer.Option(64, "--parse-cache-max-mb", min=1, help="Prune the parse cache's least recently used entries beyond this size.")) -> None:
+    if parse_cache is None:
+        return
+    cache = ParseCache(parse_cache, max_bytes=parse_cache_max_mb * 1024 * 1024)
+    use_parse_cache(cache)
+
+    def close() -> None:
+        use_parse_cache(None)
+        cache.prune()
+
+    ctx.call_on_close(close)
+
+def _has_glob(path: str) -> bool:
+    return any(c in path for c in "*?[")
+
+def _is_prompt_path(path: str) -> bool:
+    lower = path.lower()
+    return lower.endswith((".prompt.yml", ".prompt.yaml", ".prompt.json"))
+
 def _gather_prompt_files(base: Path) -> list[Path]:
     if base.is_file():
         return [base]
+    if not base.exists() and _has_glob(str(base)):
+        # Quoted globs (e.g. "prompts/**/*.prompt.yml") are expanded here, not by the shell.
+        matches = [Path(m) for m in sorted(glob.glob(str(base), recursive=True))]
+        return [f for m in matches for f in (_gather_prompt_files(m) if m.is_dir() else [m] if _is_prompt_path(m.name) else [])]
     files = sorted(base.rglob("*.prompt.y*ml")) + sorted(base.rglob("*.prompt.json"))
     return files
 
@@ -43,6 +96,33 @@ def init(repo: Path = typer.Option(Path("."), "--repo")) -> None:
     init_repo(repo)
     rprint("[green]Initialized prompts/, datasets/, and .github/workflows/ivault.yml[/green]")
 
+def _parse_files(files: list[Path], *, allow_no_tests: bool) -> list[PromptSpec | Exception]:
+    """Spec or error per file, in order, parsed by the shared pooled parser."""
+    texts: list[str | None] = []
+    errors: dict[int, Exception] = {}
+    for i, f in enumerate(files):
+        try:
+            texts.append(f.read_text(encoding="utf-8"))
+        except Exception as e:
+            texts.append(None)
+            errors[i] = e
+    parsed = iter(parse_prompt_texts([t for t in texts if t is not None], allow_no_tests=allow_no_tests))
+    return [next(parsed) if text is not None else errors[i] for i, text in enumerate(texts)]
+
+
+def _load_files(files: list[Path], *, allow_no_tests: bool) -> list[tuple[dict[str, Any] | None, PromptSpec | Exception]]:
+    """``(document, spec or error)`` per file, each from a single :func:`load_prompt` parse."""
+    loaded: list[tuple[dict[str, Any] | None, PromptSpec | Exception]] = []
+    for f in files:
+        try:
+            data, spec = load_prompt(f.read_text(encoding="utf-8"), allow_no_tests=allow_no_tests)
+        except Exception as e:
+            loaded.append((None, e))
+        else:
+            loaded.append((data, spec))
+    return loaded
+
+
 @app.command()
 def validate(paths: list[Path] = typer.Argument(...),
              repo: Path = typer.Option(Path("."), "--repo"),
@@ -55,10 +135,17 @@ def validate(paths: list[Path] = typer.Argument(...),
     ok = True
     results = []
     pol = load_policy_module(policy)
-    for f in files:
+    # Policies see the raw document; load_prompt yields it and the spec from one parse.
+    parsed: list[tuple[dict[str, Any] | None, PromptSpec | Exception]]
+    if pol is None:
+        parsed = [(None, spec) for spec in _parse_files(files, allow_no_tests=False)]
+    else:
+        parsed = _load_files(files, allow_no_tests=False)
+    for f, (data, spec) in zip(files, parsed, strict=True):
         try:
-            spec = load_prompt_spec(f.read_text(encoding="utf-8"), allow_no_tests=False)
-            errors = run_spec_policy(pol, load_prompt_dict(f.read_text(encoding="utf-8")))
+            if isinstance(spec, Exception):
+                raise spec
+            errors = run_spec_policy(pol, data) if pol is not None and data is not None else []
             if errors:
                 ok = False
                 results.append({"path": str(f), "ok": False, "error": "; ".join(errors)})
@@ -104,16 +191,15 @@ def lint(paths: list[Path] = typer.Argument(...),
 
     items: list[tuple[str, PromptSpec]] = []
     parse_findings: list[Finding] = []
-    for f in files:
+    for f, spec in zip(files, _parse_files(files, allow_no_tests=True), strict=True):
         try:
             rel = f.relative_to(repo).as_posix()
         except ValueError:
             rel = str(f)
-        try:
-            spec = load_prompt_spec(f.read_text(encoding="utf-8"), allow_no_tests=True)
+        if isinstance(spec, Exception):
+            parse_findings.append(Finding("IV000", "error", f"Could not parse prompt: {spec}", rel))
+        else:
             items.append((rel, spec))
-        except Exception as e:
-            parse_findings.append(Finding("IV000", "error", f"Could not parse prompt: {e}", rel))
 
     findings = parse_findings + run_lint(items)
     ok = gate(findings, fail_under)
@@ -215,20 +301,30 @@ def migrate(path: Path = typer.Argument(...),
 
 @app.command()
 def bundle(prompts: Path = typer.Option(Path("prompts"), "--prompts"),
-           out: Path = typer.Option(Path("out/ivault.bundle.json"), "--out"),
+           out: Path | None = typer.Option(None, "--out", help="Default: out/ivault.bundle.json (json) or out/ivault.bundle.bin (binary)"),
            ref: str | None = typer.Option(None, "--ref"),
-           repo: Path = typer.Option(Path("."), "--repo")) -> None:
+           repo: Path = typer.Option(Path("."), "--repo"),
+           fmt: str = typer.Option("json", "--format", help="json | binary (memory-mapped, validated lazily at runtime)")) -> None:
+    if fmt not in BUNDLE_FORMATS:
+        raise typer.BadParameter("--format must be one of: json, binary")
+    if out is None:
+        out = Path("out/ivault.bundle.bin" if fmt == "binary" else "out/ivault.bundle.json")
     prompts_dir = prompts if prompts.is_absolute() else repo / prompts
-    write_bundle(out, repo_root=repo, prompts_dir=prompts_dir, ref=ref)
+    write_bundle(out, repo_root=repo, prompts_dir=prompts_dir, ref=ref, fmt=fmt)
     rprint(f"[green]Wrote bundle[/green] {out}")
 
 @app.command()
 def lock(prompts: Path = typer.Option(Path("prompts"), "--prompts"),
          out: Path = typer.Option(Path("ivault.lock.json"), "--out"),
          ref: str | None = typer.Option(None, "--ref"),
-         repo: Path = typer.Option(Path("."), "--repo")) -> None:
+         repo: Path = typer.Option(Path("."), "--repo"),
+         hash_cache: Path | None = typer.Option(None, "--hash-cache", help="Local cache file (e.g. .ivault-cache/lock-hashes.json); only new or edited prompts are re-parsed."),
+         record_tree: bool = typer.Option(False, "--record-tree", help="Record the prompts tree OID (needs --ref) so `verify --ref` only re-hashes changed paths.")) -> None:
+    if record_tree and ref is None:
+        raise typer.BadParameter("--record-tree needs --ref")
     prompts_dir = prompts if prompts.is_absolute() else repo / prompts
-    lock_data = write_lock(out, repo_root=repo, prompts_dir=prompts_dir, ref=ref)
+    cache = LockHashCache(hash_cache) if hash_cache is not None else None
+    lock_data = write_lock(out, repo_root=repo, prompts_dir=prompts_dir, ref=ref, cache=cache, record_tree=record_tree)
     n = len(lock_data["prompts"])
     rprint(f"[green]Wrote lockfile[/green] {out}  ({n} prompt(s))")
 
@@ -238,7 +334,8 @@ def verify(lockfile: Path = typer.Argument(..., help="Path to ivault.lock.json")
            prompts: Path = typer.Option(Path("prompts"), "--prompts"),
            ref: str | None = typer.Option(None, "--ref"),
            repo: Path = typer.Option(Path("."), "--repo"),
-           json_out: bool = typer.Option(False, "--json")) -> None:
+           json_out: bool = typer.Option(False, "--json"),
+           hash_cache: Path | None = typer.Option(None, "--hash-cache", help="Local cache file shared with `ivault lock --hash-cache`.")) -> None:
     prompts_dir = prompts if prompts.is_absolute() else repo / prompts
     try:
         lock_data = json.loads(lockfile.read_text(encoding="utf-8"))
@@ -246,7 +343,8 @@ def verify(lockfile: Path = typer.Argument(..., help="Path to ivault.lock.json")
         raise typer.BadParameter(f"Lockfile not found: {lockfile}") from e
     except json.JSONDecodeError as e:
         raise typer.BadParameter(f"Invalid lockfile: {lockfile}") from e
-    ok, diffs = verify_lock(lock_data, repo_root=repo, prompts_dir=prompts_dir, ref=ref)
+    cache = LockHashCache(hash_cache) if hash_cache is not None else None
+    ok, diffs = verify_lock(lock_data, repo_root=repo, prompts_dir=prompts_dir, ref=ref, cache=cache)
     if json_out:
         rprint(json.dumps({"ok": ok, "drift": diffs}))
     elif ok:
@@ -269,10 +367,189 @@ def schema(out: Path | None = typer.Option(None, "--out", help="Write schema to
         typer.echo(text)
 
 
+@dataclass(frozen=True)
+class _EvalConfig:
+    """Picklable eval settings, so worker processes can rebuild the runtime."""
+    repo: Path
+    ref: str | None
+    safe: bool
+    strict_vars: bool
+    redact: bool
+    policy: str | None
+    provider: str | None
+    judge_provider: str | None
+    concurrency: int
+    fail_fast: bool
+    cache_dir: Path | None
+    cache_mode: str
+    client: ClientOptions
+    rate: RateLimit
+    prices: tuple[tuple[str, ModelPrice], ...] = ()
+    judge_batch: bool = False
+
+    def manifest_context(self) -> dict[str, object]:
+        return {
+            "provider": self.provider, "judge_provider": self.judge_provider, "judge_batch": self.judge_batch, "safe": self.safe,
+            "strict_vars": self.strict_vars, "redact": self.redact, "policy": file_fingerprint(self.policy),
+        }
+
+
+class _EvalRuntime(NamedTuple):
+    policy: object | None
+    provider: Provider | None
+    judge_provider: Provider | None
+    judge_cache: JudgeCache | None
+    store: PromptStore
+
+
+def _eval_runtime(cfg: _EvalConfig) -> _EvalRuntime:
+    pol = load_policy_module(cfg.policy)
+    prov = get_provider(cfg.provider, cfg.client)
+    judge_prov = get_provider(cfg.judge_provider, cfg.client)
+    # One limiter for both: they usually spend the same account's quota.
+    limiter = RateLimiter(cfg.rate)
+    if prov is not None:
+        prov = rate_limited(prov, limiter)
+    if judge_prov is not None:
+        judge_prov = rate_limited(judge_prov, limiter)
+    if cfg.cache_dir is not None:
+        if prov is not None and cfg.provider is not None:
+            prov = cached_provider(prov, cfg.cache_dir, namespace=cfg.provider, mode=cfg.cache_mode)
+        if judge_prov is not None and cfg.judge_provider is not None:
+            judge_prov = cached_provider(judge_prov, cfg.cache_dir, namespace=cfg.judge_provider, mode=cfg.cache_mode)
+    if cfg.prices:
+        # Outermost, so replies replayed from the cache are costed like live ones.
+        prices = dict(cfg.prices)
+        prov = priced_provider(prov, prices) if prov is not None else None
+        judge_prov = priced_provider(judge_prov, prices) if judge_prov is not None else None
+    judge_cache = None
+    if judge_prov is not None:
+        # Always dedupes identical outputs within the run; with --cache-dir scores persist too.
+        scores_dir = cfg.cache_dir / "judge-scores" if cfg.cache_dir is not None else None
+        judge_cache = JudgeCache(scores_dir, namespace=cfg.judge_provider or "", read=cfg.cache_mode != "refresh")
+    # One store per run (or pool worker), so --ref reads share a single git cat-file process.
+    store = PromptStore(repo_root=cfg.repo, batch=cfg.ref is not None)
+    return _EvalRuntime(pol, prov, judge_prov, judge_cache, store)
+
+
+def _eval_prompt(cfg: _EvalConfig, rt: _EvalRuntime, prompt_path: str, dataset: Path | None, manifest: EvalManifest | None) -> tuple[str, Iterator[TestResult]]:
+    """Load the prompt now (so load errors surface here) and stream its results lazily."""
+    spec = load_prompt_spec(rt.store.read_text(prompt_path, ref=cfg.ref), allow_no_tests=False)
+
+    def _results() -> Iterator[TestResult]:
+        ok = True
+        for r in iter_inline_tests(spec, safe=cfg.safe, strict_vars=cfg.strict_vars, redact=cfg.redact, policy=rt.policy, provider=rt.provider, judge_provider=rt.judge_provider, judge_cache=rt.judge_cache, judge_batch=cfg.judge_batch, concurrency=cfg.concurrency, fail_fast=cfg.fail_fast, manifest=manifest):
+            ok = ok and r.passed
+            yield r
+        if dataset is not None and not (cfg.fail_fast and not ok):
+            rows = iter_dataset_jsonl(dataset)
+            yield from iter_dataset(spec, rows, safe=cfg.safe, strict_vars=cfg.strict_vars, redact=cfg.redact, policy=rt.policy, provider=rt.provider, judge_provider=rt.judge_provider, judge_cache=rt.judge_cache, judge_batch=cfg.judge_batch, concurrency=cfg.concurrency, fail_fast=cfg.fail_fast, manifest=manifest)
+
+    return spec.name, _results()
+
+
+def _eval_prompt_or_error(cfg: _EvalConfig, rt: _EvalRuntime, prompt_path: str, manifest: EvalManifest | None) -> tuple[str, Iterable[TestResult]]:
+    """Multi-prompt runs report a prompt that cannot be loaded as a failed test instead of aborting."""
+    try:
+        return _eval_prompt(cfg, rt, prompt_path, None, manifest)
+    except Exception as e:
+        return prompt_path, [TestResult("load_prompt", False, str(e))]
+
+
+# Per-process state for the eval worker pool, set once by _init_eval_worker.
+_worker: tuple[_EvalConfig, _EvalRuntime, EvalManifest | None] | None = None
+
+
+def _init_eval_worker(cfg: _EvalConfig, manifest_path: Path | None, parse_cache: Path | None) -> None:
+    global _worker
+    if parse_cache is not None and active_parse_cache() is None:
+        use_parse_cache(ParseCache(parse_cache))
+    manifest = EvalManifest(manifest_path, context=cfg.manifest_context()) if manifest_path is not None else None
+    _worker = (cfg, _eval_runtime(cfg), manifest)
+
+
+def _eval_in_worker(prompt_path: str) -> tuple[str, list[TestResult], ManifestChanges | None]:
+    assert _worker is not None, "eval worker not initialized"
+    cfg, rt, manifest = _worker
+    name, results = _eval_prompt_or_error(cfg, rt, prompt_path, manifest)
+    results = list(results)
+    return name, results, manifest.take_changes() if manifest is not None else None
+
+
+def _eval_many(cfg: _EvalConfig, prompt_paths: list[str], workers: int, manifest: EvalManifest | None) -> Generator[tuple[str, str, Iterable[TestResult]], None, None]:
+    """Yield ``(path, name, results)`` per prompt, in input order.
+
+    In-process, each prompt's results stream lazily and must be consumed before
+    the next prompt starts. ``workers > 1`` evaluates prompts in a process
+    pool; each worker builds its providers once and sends its results and
+    manifest updates back here, where the file is owned. Closing the generator
+    cancels prompts that have not started.
+    """
+    if workers <= 1 or len(prompt_paths) <= 1:
+        rt = _eval_runtime(cfg)
+        with rt.store:
+            for path in prompt_paths:
+                name, results = _eval_prompt_or_error(cfg, rt, path, manifest)
+                yield path, name, results
+        return
+
+    manifest_path = manifest.path if manifest is not None else None
+    disk = active_parse_cache()
+    initargs = (cfg, manifest_path, disk.directory if disk is not None else None)
+    with ProcessPoolExecutor(max_workers=min(workers, len(prompt_paths)), initializer=_init_eval_worker, initargs=initargs) as pool:
+        futures = [pool.submit(_eval_in_worker, path) for path in prompt_paths]
+        try:
+            for path, fut in zip(prompt_paths, futures, strict=True):
+                name, worker_results, changes = fut.result()
+                if manifest is not None and changes is not None:
+                    manifest.apply(changes)
+                yield path, name, worker_results
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+
+def _eval_targets(paths: list[str], repo: Path, ref: str | None) -> tuple[list[str], bool]:
+    """Repo-relative prompt paths for ``eval`` and whether this is a multi-prompt run.
+
+    A single prompt file keeps the original one-prompt report format; several
+    arguments, directories or globs (``prompts/**/*.prompt.yml``) switch to
+    the combined format. At ``--ref`` directories and globs are matched
+    against the files in that commit.
+    """
+    def _is_file(p: str) -> bool:
+        if ref is None:
+            return (Path(p) if Path(p).is_absolute() else repo / p).is_file()
+        return Path(p).suffix.lower() in (".yml", ".yaml", ".json")
+
+    if len(paths) == 1 and not _has_glob(paths[0]) and _is_file(paths[0]):
+        return [paths[0]], False
+    targets: dict[str, None] = {}
+    if ref is None:
+        bases = [Path(p) if Path(p).is_absolute() else repo / p for p in paths]
+        root = repo.resolve()
+        for f in _gather_many(bases):
+            try:
+                targets[f.resolve().relative_to(root).as_posix()] = None
+            except ValueError as e:
+                raise typer.BadParameter(f"Prompt is outside --repo: {f}") from e
+    else:
+        for p in paths:
+            if _has_glob(p):
+                # fnmatch's "*" already crosses "/"; also let "**/" match zero directories, as glob does.
+                flat = p.replace("**/", "")
+                targets.update(dict.fromkeys(f for f in prompt_paths_at_ref(repo, ref, ".") if fnmatch.fnmatch(f, p) or fnmatch.fnmatch(f, flat)))
+            elif _is_file(p):
+                targets[p] = None
+            else:
+                targets.update(dict.fromkeys(prompt_paths_at_ref(repo, ref, p.rstrip("/"))))
+    return list(targets), True
+
+
 @app.command()
-def eval(prompt_path: str = typer.Argument(...),
+def eval(prompt_paths: list[str] = typer.Argument(..., help="Prompt file(s), directories or globs (quoted); several prompts produce one combined report."),
          ref: str | None = typer.Option(None, "--ref"),
-         dataset: Path | None = typer.Option(None, "--dataset"),
+         dataset: Path | None = typer.Option(None, "--dataset", help="JSONL dataset (single prompt only)."),
          report: Path | None = typer.Option(None, "--report"),
          junit: Path | None = typer.Option(None, "--junit"),
          repo: Path = typer.Option(Path("."), "--repo"),
@@ -282,44 +559,98 @@ def eval(prompt_path: str = typer.Argument(...),
          redact: bool = typer.Option(False, "--redact"),
          policy: str | None = typer.Option(None, "--policy"),
          provider: str | None = typer.Option(None, "--provider", help="Run prompts through a model and assert on its reply (e.g. 'openai', 'ollama', 'mock'). Off by default for deterministic CI."),
-         judge_provider: str | None = typer.Option(None, "--judge-provider", help="Provider used for LLM-as-judge assertions (e.g. 'openai', 'ollama'). Judge asserts are skipped when unset.")) -> None:
-    store = PromptStore(repo_root=repo)
-    spec = load_prompt_spec(store.read_text(prompt_path, ref=ref), allow_no_tests=False)
-    pol = load_policy_module(policy)
-    prov = get_provider(provider)
-    judge_prov = get_provider(judge_provider)
-
-    ok1, r1 = run_inline_tests(spec, safe=safe, strict_vars=strict_vars, redact=redact, policy=pol, provider=prov, judge_provider=judge_prov)
-    results = list(r1)
-    ok = ok1
-
-    if dataset is not None:
-        rows = load_dataset_jsonl(dataset.read_text(encoding="utf-8"))
-        ok2, r2 = run_dataset(spec, rows, safe=safe, strict_vars=strict_vars, redact=redact, policy=pol, provider=prov, judge_provider=judge_prov)
-        ok = ok and ok2
-        results.extend(r2)
-
-    payload = {
-        "prompt": spec.name,
-        "ref": ref or "WORKTREE",
-        "pass": ok,
-        "results": [{"test": r.name, "pass": r.passed, "error": r.error, "skipped": r.skipped} for r in results],
-    }
-    if report:
-        report.parent.mkdir(parents=True, exist_ok=True)
-        report.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    if junit:
-        junit.parent.mkdir(parents=True, exist_ok=True)
-        write_junit_xml(suite_name=f"ivault:{spec.name}", results=results, out_path=str(junit))
+         judge_provider: str | None = typer.Option(None, "--judge-provider", help="Provider used for LLM-as-judge assertions (e.g. 'openai', 'ollama'). Judge asserts are skipped when unset."),
+         concurrency: int = typer.Option(1, "--concurrency", min=1, help="Run up to N tests/rows at once (useful with --provider). Results keep input order."),
+         fail_fast: bool = typer.Option(False, "--fail-fast", help="Stop starting new tests after the first failure."),
+         cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache provider/judge replies here, keyed by a hash of messages + params."),
+         cache_mode: str = typer.Option("record", "--cache-mode", help="record | replay | refresh (used with --cache-dir)"),
+         provider_timeout: float | None = typer.Option(None, "--provider-timeout", min=0.001, help="Per-request timeout in seconds for provider/judge calls."),
+         max_connections: int | None = typer.Option(None, "--max-connections", min=1, help="HTTP connection pool size for provider/judge clients (defaults to --concurrency when > 1)."),
+         rpm: float | None = typer.Option(None, "--rpm", min=0.001, help="Requests/minute budget shared by provider and judge calls."),
+         tpm: float | None = typer.Option(None, "--tpm", min=1, help="Estimated tokens/minute budget shared by provider and judge calls."),
+         max_retries: int = typer.Option(5, "--max-retries", min=0, help="Retries per call after a 429 (jittered backoff, honors Retry-After)."),
+         incremental: Path | None = typer.Option(None, "--incremental", help="Manifest file: reuse passing results whose spec, vars, asserts, provider and flags are unchanged, and record new ones."),
+         workers: int = typer.Option(1, "--workers", min=1, help="Evaluate up to N prompts in parallel worker processes (multi-prompt runs)."),
+         report_jsonl: Path | None = typer.Option(None, "--report-jsonl", help="Stream one JSON line per result as it completes (constant memory, tail-able)."),
+         price: list[str] = typer.Option([], "--price", help="MODEL=INPUT,OUTPUT in USD per 1M tokens (repeatable); adds estimated cost to results."),
+         judge_batch: bool = typer.Option(False, "--judge-batch", help="Score all judge criteria of a test in one call per judge model.")) -> None:
+    if cache_mode not in CACHE_MODES:
+        raise typer.BadParameter(f"--cache-mode must be one of: {', '.join(CACHE_MODES)}")
+    try:
+        prices = tuple(parse_price(p) for p in price)
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+    targets, multi = _eval_targets(prompt_paths, repo, ref)
+    if not targets:
+        raise typer.BadParameter("No prompt files found")
+    if multi and dataset is not None:
+        raise typer.BadParameter("--dataset applies to a single prompt file")
 
-    if json_out:
-        rprint(json.dumps(payload))
+    procs = workers if multi and len(targets) > 1 else 1
+    cfg = _EvalConfig(
+        repo=repo, ref=ref, safe=safe, strict_vars=strict_vars, redact=redact, policy=policy,
+        provider=provider, judge_provider=judge_provider, concurrency=concurrency, fail_fast=fail_fast,
+        cache_dir=cache_dir, cache_mode=cache_mode,
+        client=ClientOptions(timeout=provider_timeout, max_connections=max_connections or (concurrency if concurrency > 1 else None)),
+        # Each worker process has its own limiter, so the quota is split between them.
+        rate=RateLimit(requests_per_minute=rpm / procs if rpm else None, tokens_per_minute=tpm / procs if tpm else None, max_concurrency=concurrency, max_retries=max_retries),
+        prices=prices, judge_batch=judge_batch,
+    )
+    manifest = EvalManifest(incremental, context=cfg.manifest_context()) if incremental is not None else None
+
+    runs: Iterator[tuple[str, str, Iterable[TestResult]]]
+    if multi:
+        runs = _eval_many(cfg, targets, workers, manifest)
     else:
-        for r in results:
-            if r.skipped:
-                rprint(f"[yellow]SKIP[/yellow] {r.name}  (judge not run)")
-            elif r.passed:
-                rprint(f"[green]PASS[/green] {r.name}")
-            else:
-                rprint(f"[red]FAIL[/red] {r.name}  {r.error or ''}")
+        # Load errors for a single prompt still abort before any output is written.
+        rt = _eval_runtime(cfg)
+        with rt.store:
+            spec_name, stream = _eval_prompt(cfg, rt, targets[0], dataset, manifest)
+        runs = iter([(targets[0], spec_name, stream)])
+
+    sinks: list[ResultSink] = []
+    doc = JsonReportSink(multi=multi, ref=ref) if (report or json_out) else None
+    if doc is not None:
+        sinks.append(doc)
+    if not json_out:
+        sinks.append(ConsoleSink(multi=multi))
+    if report_jsonl:
+        sinks.append(JsonlReportSink(report_jsonl))
+    if junit:
+        sinks.append(JUnitSink(junit, multi=multi))
+
+    ok, done, passed = True, 0, 0
+    try:
+        for path, name, results in runs:
+            for sink in sinks:
+                sink.begin_prompt(path, name)
+            prompt_ok = True
+            for r in results:
+                prompt_ok = prompt_ok and r.passed
+                for sink in sinks:
+                    sink.add(r)
+            for sink in sinks:
+                sink.end_prompt()
+            ok = ok and prompt_ok
+            done += 1
+            passed += prompt_ok
+            if cfg.fail_fast and not prompt_ok:
+                break
+    finally:
+        if isinstance(runs, Generator):
+            runs.close()
+        for sink in sinks:
+            sink.close()
+        if manifest is not None:
+            manifest.save()
+
+    if doc is not None:
+        payload = doc.payload()
+        if report:
+            report.parent.mkdir(parents=True, exist_ok=True)
+            report.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        if json_out:
+            rprint(json.dumps(payload))
+    if multi and not json_out:
+        rprint(f"{passed}/{done} prompts passed" + (f" ({len(targets) - done} not run: --fail-fast)" if done < len(targets) else ""))
     raise typer.Exit(code=0 if ok else 1)
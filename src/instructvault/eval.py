@@ -1,13 +1,22 @@
 from __future__ import annotations
 
-import json
-import re
-from dataclasses import dataclass
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
+from functools import partial
 from typing import Any
 
-from .judge import judge_output
+from .asserts import compile_assert
+from .judge import JudgeCache, judge_outputs, judge_outputs_async
+from .lock import canonical_spec_hash
+from .manifest import EvalManifest
 from .policy import run_render_policy
-from .providers import Provider
+from .providers import AsyncProvider, Provider, Reply
 from .render import check_required_vars, render_joined_text, render_messages
 from .spec import AssertSpec, DatasetRow, PromptSpec
 
@@ -18,106 +27,319 @@ class TestResult:
     passed: bool
     error: str | None = None
     skipped: bool = False
+    reused: bool = False  # served from an incremental-eval manifest, not re-run
+    # Measurements; excluded from equality so results compare by outcome only.
+    duration: float = field(default=0.0, compare=False)  # seconds, whole case
+    timings: dict[str, float] = field(default_factory=dict, compare=False)  # seconds per step: render/provider/judge/assert
+    prompt_tokens: int | None = field(default=None, compare=False)  # summed over provider + judge calls that report usage
+    completion_tokens: int | None = field(default=None, compare=False)
+    cost: float | None = field(default=None, compare=False)  # estimated USD; see providers.priced_provider
 
-def _match_assert(assert_spec: AssertSpec, text: str) -> bool:
-    t = text.lower()
-    ok = True
-    if assert_spec.contains_any:
-        ok = ok and any(s.lower() in t for s in assert_spec.contains_any)
-    if assert_spec.contains_all:
-        ok = ok and all(s.lower() in t for s in assert_spec.contains_all)
-    if assert_spec.not_contains:
-        ok = ok and all(s.lower() not in t for s in assert_spec.not_contains)
-    if assert_spec.matches:
-        ok = ok and all(re.search(p, text) for p in assert_spec.matches)
-    if assert_spec.not_matches:
-        ok = ok and all(not re.search(p, text) for p in assert_spec.not_matches)
-    if assert_spec.json_schema:
-        try:
-            obj = json.loads(text)
-        except Exception:
-            return False
-        try:
-            import jsonschema  # type: ignore
-        except Exception as e:
-            raise ValueError("jsonschema is required for json_schema assertions") from e
-        try:
-            jsonschema.validate(instance=obj, schema=assert_spec.json_schema)
-        except jsonschema.ValidationError:
-            # Instance did not match the schema -> a normal assertion failure.
-            return False
-        # Note: an invalid schema (SchemaError) is an author error and still raises.
-    return ok
-
-def _evaluate(
-    assert_spec: AssertSpec, output: str, judge_provider: Provider | None
-) -> tuple[bool, bool, str | None]:
-    """Return (passed, skipped, error) combining deterministic + judge checks."""
-    deterministic_ok = _match_assert(assert_spec, output)
-    if assert_spec.judge is None:
+def _verdict(assert_spec: AssertSpec, deterministic_ok: bool, judged: list[tuple[bool, float]] | None) -> tuple[bool, bool, str | None]:
+    """Combine the deterministic result with each judge's ``(passed, score)``, if they ran."""
+    judges = assert_spec.judges()
+    if not judges or judged is None:
+        if judges and not assert_spec.has_deterministic():
+            return True, True, None  # judge could not run and nothing else evaluated -> skipped, not failed
         return deterministic_ok, False, None if deterministic_ok else "assertion failed"
 
-    if judge_provider is None:
-        # Judge portion cannot run without a provider.
-        if not assert_spec.has_deterministic():
-            return True, True, None  # nothing evaluated -> skipped, not failed
-        return deterministic_ok, False, None if deterministic_ok else "assertion failed"
-
-    judged_ok, score = judge_output(output, assert_spec.judge, judge_provider)
-    passed = deterministic_ok and judged_ok
-    if passed:
+    low = [f"judge score {score:.2f} < threshold {judge.threshold}" for judge, (ok, score) in zip(judges, judged, strict=True) if not ok]
+    if deterministic_ok and not low:
         return True, False, None
-    if not judged_ok:
-        return False, False, f"judge score {score:.2f} < threshold {assert_spec.judge.threshold}"
+    if low:
+        return False, False, "; ".join(low)
     return False, False, "assertion failed"
 
 
-def _produce_output(spec: PromptSpec, vars: dict[str, Any], *, safe: bool, strict_vars: bool, redact: bool, provider: Provider | None) -> str:
-    """Rendered prompt text by default; the model's reply when a provider is given."""
-    if provider is None:
-        return render_joined_text(spec, vars, safe=safe, strict_vars=strict_vars, redact=redact)
+def _provider_request(spec: PromptSpec, vars: dict[str, Any], *, safe: bool, strict_vars: bool, redact: bool) -> tuple[list[dict[str, str]], dict[str, object]]:
     msgs = render_messages(spec, vars, safe=safe, strict_vars=strict_vars, redact=redact)
     payload = [{"role": m.role, "content": m.content} for m in msgs]
-    params = spec.model_defaults.model_dump(exclude_none=True)
-    return provider(payload, params)
+    return payload, spec.model_defaults.model_dump(exclude_none=True)
+
+@dataclass(frozen=True)
+class _Case:
+    name: str
+    vars: dict[str, Any]
+    assert_: AssertSpec
+    kind: str  # "inline" | "dataset", passed to render policies
+
+
+class _Meter:
+    """Per-case step timings plus token usage and cost of the replies seen."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.timings: dict[str, float] = {}
+        self.prompt_tokens: int | None = None
+        self.completion_tokens: int | None = None
+        self.cost: float | None = None
 
-def run_inline_tests(spec: PromptSpec, *, safe: bool = False, strict_vars: bool = False, redact: bool = False, policy: object | None = None, provider: Provider | None = None, judge_provider: Provider | None = None) -> tuple[bool, list[TestResult]]:
-    results: list[TestResult] = []
-    all_ok = True
-    for t in spec.tests:
+    def step(self, name: str) -> AbstractContextManager[None]:
+        return self._step(name)
+
+    @contextmanager
+    def _step(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
         try:
-            check_required_vars(spec, t.vars, safe=safe, strict_vars=strict_vars, redact=redact)
-            out = _produce_output(spec, t.vars, safe=safe, strict_vars=strict_vars, redact=redact, provider=provider)
-            errors = run_render_policy(policy, out, {"prompt": spec.name, "test": t.name, "kind": "inline"})
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - t0
+
+    def count(self, reply: str) -> str:
+        if isinstance(reply, Reply) and reply.usage is not None:
+            self.prompt_tokens = (self.prompt_tokens or 0) + reply.usage.prompt_tokens
+            self.completion_tokens = (self.completion_tokens or 0) + reply.usage.completion_tokens
+            if reply.cost is not None:
+                self.cost = (self.cost or 0.0) + reply.cost
+        return reply
+
+    def wrap(self, provider: Provider) -> Provider:
+        return lambda messages, params: self.count(provider(messages, params))
+
+    def wrap_async(self, provider: AsyncProvider) -> AsyncProvider:
+        async def _call(messages: list[dict[str, str]], params: dict[str, object]) -> str:
+            return self.count(await provider(messages, params))
+        return _call
+
+    def result(self, name: str, passed: bool, error: str | None = None, skipped: bool = False) -> TestResult:
+        return TestResult(
+            name, passed, error, skipped, duration=time.perf_counter() - self.start, timings=self.timings,
+            prompt_tokens=self.prompt_tokens, completion_tokens=self.completion_tokens, cost=self.cost,
+        )
+
+
+def _run_case(case: _Case, spec: PromptSpec, *, safe: bool, strict_vars: bool, redact: bool, policy: object | None, provider: Provider | None, judge_provider: Provider | None, judge_cache: JudgeCache | None = None, judge_batch: bool = False) -> TestResult:
+    meter = _Meter()
+    try:
+        with meter.step("render"):
+            check_required_vars(spec, case.vars, safe=safe, strict_vars=strict_vars, redact=redact)
+            if provider is None:
+                out = render_joined_text(spec, case.vars, safe=safe, strict_vars=strict_vars, redact=redact)
+            else:
+                request = _provider_request(spec, case.vars, safe=safe, strict_vars=strict_vars, redact=redact)
+        if provider is not None:
+            with meter.step("provider"):
+                out = meter.count(provider(*request))
+        with meter.step("assert"):
+            errors = run_render_policy(policy, out, {"prompt": spec.name, "test": case.name, "kind": case.kind})
             if errors:
-                results.append(TestResult(t.name, False, "; ".join(errors)))
-                all_ok = False
-                continue
-            passed, skipped, error = _evaluate(t.assert_, out, judge_provider)
-            results.append(TestResult(t.name, passed, error, skipped))
-            all_ok = all_ok and passed
-        except Exception as e:
-            results.append(TestResult(t.name, False, str(e)))
-            all_ok = False
-    return all_ok, results
-
-def run_dataset(spec: PromptSpec, rows: list[DatasetRow], *, safe: bool = False, strict_vars: bool = False, redact: bool = False, policy: object | None = None, provider: Provider | None = None, judge_provider: Provider | None = None) -> tuple[bool, list[TestResult]]:
-    results: list[TestResult] = []
-    all_ok = True
-    for i, row in enumerate(rows, start=1):
-        name = f"dataset_row_{i}"
-        try:
-            check_required_vars(spec, row.vars, safe=safe, strict_vars=strict_vars, redact=redact)
-            out = _produce_output(spec, row.vars, safe=safe, strict_vars=strict_vars, redact=redact, provider=provider)
-            errors = run_render_policy(policy, out, {"prompt": spec.name, "test": name, "kind": "dataset"})
+                return meter.result(case.name, False, "; ".join(errors))
+            deterministic_ok = compile_assert(case.assert_).match(out)
+        judged = None
+        judges = case.assert_.judges()
+        if judges and judge_provider is not None:
+            with meter.step("judge"):
+                judged = judge_outputs([(out, j) for j in judges], meter.wrap(judge_provider), cache=judge_cache, batch=judge_batch)
+        passed, skipped, error = _verdict(case.assert_, deterministic_ok, judged)
+        return meter.result(case.name, passed, error, skipped)
+    except Exception as e:
+        return meter.result(case.name, False, str(e))
+
+
+async def _run_case_async(case: _Case, spec: PromptSpec, *, safe: bool, strict_vars: bool, redact: bool, policy: object | None, provider: AsyncProvider | None, judge_provider: AsyncProvider | None, judge_cache: JudgeCache | None = None, judge_batch: bool = False) -> TestResult:
+    meter = _Meter()
+    try:
+        with meter.step("render"):
+            check_required_vars(spec, case.vars, safe=safe, strict_vars=strict_vars, redact=redact)
+            if provider is None:
+                out = render_joined_text(spec, case.vars, safe=safe, strict_vars=strict_vars, redact=redact)
+            else:
+                request = _provider_request(spec, case.vars, safe=safe, strict_vars=strict_vars, redact=redact)
+        if provider is not None:
+            with meter.step("provider"):
+                out = meter.count(await provider(*request))
+        with meter.step("assert"):
+            errors = run_render_policy(policy, out, {"prompt": spec.name, "test": case.name, "kind": case.kind})
             if errors:
-                results.append(TestResult(name, False, "; ".join(errors)))
-                all_ok = False
-                continue
-            passed, skipped, error = _evaluate(row.assert_, out, judge_provider)
-            results.append(TestResult(name, passed, error, skipped))
-            all_ok = all_ok and passed
-        except Exception as e:
-            results.append(TestResult(name, False, str(e)))
-            all_ok = False
-    return all_ok, results
+                return meter.result(case.name, False, "; ".join(errors))
+            deterministic_ok = compile_assert(case.assert_).match(out)
+        judged = None
+        judges = case.assert_.judges()
+        if judges and judge_provider is not None:
+            with meter.step("judge"):
+                judged = await judge_outputs_async([(out, j) for j in judges], meter.wrap_async(judge_provider), cache=judge_cache, batch=judge_batch)
+        passed, skipped, error = _verdict(case.assert_, deterministic_ok, judged)
+        return meter.result(case.name, passed, error, skipped)
+    except Exception as e:
+        return meter.result(case.name, False, str(e))
+
+
+class _ManifestKeys:
+    """Manifest keys for one run. Dataset row names are positional (dataset_row_N),
+    so rows key on their content plus which repeat of that content they are:
+    inserting or removing a row leaves every other row's key unchanged."""
+
+    def __init__(self, manifest: EvalManifest, spec: PromptSpec):
+        self._manifest = manifest
+        self._spec_hash = canonical_spec_hash(spec)
+        self._seen: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, case: _Case) -> str:
+        assert_ = case.assert_.model_dump(by_alias=True, mode="json", exclude_none=True)
+        if case.kind == "inline":
+            return self._manifest.key(self._spec_hash, case.kind, case.name, case.vars, assert_)
+        content = self._manifest.key(self._spec_hash, case.kind, None, case.vars, assert_)
+        with self._lock:
+            repeat = self._seen[content] = self._seen.get(content, 0) + 1
+        return self._manifest.key(self._spec_hash, case.kind, f"#{repeat}", case.vars, assert_)
+
+def _reused(case: _Case, entry: dict[str, Any]) -> TestResult:
+    return TestResult(case.name, bool(entry["pass"]), entry.get("error"), bool(entry.get("skipped")), reused=True)
+
+def _entry(spec: PromptSpec, result: TestResult) -> dict[str, Any]:
+    return {"prompt": spec.name, "test": result.name, "pass": result.passed, "error": result.error, "skipped": result.skipped}
+
+def _with_manifest(run: Callable[[_Case], TestResult], spec: PromptSpec, manifest: EvalManifest | None) -> Callable[[_Case], TestResult]:
+    """Serve unchanged cases from ``manifest`` and record fresh results into it."""
+    if manifest is None:
+        return run
+    keys = _ManifestKeys(manifest, spec)
+    manifest.evaluating(spec.name)
+
+    def _run(case: _Case) -> TestResult:
+        key = keys(case)
+        entry = manifest.get(key)
+        if entry is not None:
+            return _reused(case, entry)
+        result = run(case)
+        manifest.put(key, _entry(spec, result))
+        return result
+
+    return _run
+
+def _with_manifest_async(run: Callable[[_Case], Awaitable[TestResult]], spec: PromptSpec, manifest: EvalManifest | None) -> Callable[[_Case], Awaitable[TestResult]]:
+    if manifest is None:
+        return run
+    keys = _ManifestKeys(manifest, spec)
+    manifest.evaluating(spec.name)
+
+    async def _run(case: _Case) -> TestResult:
+        key = keys(case)
+        entry = manifest.get(key)
+        if entry is not None:
+            return _reused(case, entry)
+        result = await run(case)
+        manifest.put(key, _entry(spec, result))
+        return result
+
+    return _run
+
+
+def _execute(cases: Iterable[_Case], run: Callable[[_Case], TestResult], *, concurrency: int, fail_fast: bool) -> Iterator[TestResult]:
+    """Yield one result per case, in input order, running up to ``concurrency`` at once.
+
+    With ``fail_fast`` no new case starts after the first failure; cases still
+    queued are cancelled and produce no result, in-flight ones finish.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    if concurrency == 1:
+        for case in cases:
+            result = run(case)
+            yield result
+            if fail_fast and not result.passed:
+                return
+        return
+
+    failed = threading.Event()
+
+    def _guarded(case: _Case) -> TestResult:
+        result = run(case)
+        if not result.passed:
+            failed.set()
+        return result
+
+    # A bounded window keeps memory flat for long datasets; output stays ordered.
+    window = concurrency * 4
+    pending: deque[Future[TestResult]] = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ivault-eval") as pool:
+        try:
+            for case in cases:
+                if fail_fast and failed.is_set():
+                    break
+                pending.append(pool.submit(_guarded, case))
+                while len(pending) >= window or (pending and pending[0].done()):
+                    yield pending.popleft().result()
+            while pending:
+                fut = pending.popleft()
+                if fail_fast and failed.is_set() and fut.cancel():
+                    continue
+                yield fut.result()
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+
+async def _execute_async(cases: Iterable[_Case], run: Callable[[_Case], Awaitable[TestResult]], *, concurrency: int, fail_fast: bool) -> list[TestResult]:
+    """Async :func:`_execute`: at most ``concurrency`` cases in flight, gated by a semaphore.
+
+    A case's task is only created once a slot is free, so memory stays flat for
+    long datasets. Results come back in input order.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    slots = asyncio.Semaphore(concurrency)
+    results: dict[int, TestResult] = {}
+    failed = False
+    tasks: set[asyncio.Task[None]] = set()
+
+    async def _one(i: int, case: _Case) -> None:
+        nonlocal failed
+        try:
+            result = results[i] = await run(case)
+            if not result.passed:
+                failed = True
+        finally:
+            slots.release()
+
+    try:
+        for i, case in enumerate(cases):
+            await slots.acquire()
+            if fail_fast and failed:
+                slots.release()
+                break
+            task = asyncio.create_task(_one(i, case))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return [results[i] for i in sorted(results)]
+
+
+def iter_inline_tests(spec: PromptSpec, *, safe: bool = False, strict_vars: bool = False, redact: bool = False, policy: object | None = None, provider: Provider | None = None, judge_provider: Provider | None = None, concurrency: int = 1, fail_fast: bool = False, manifest: EvalManifest | None = None, judge_cache: JudgeCache | None = None, judge_batch: bool = False) -> Iterator[TestResult]:
+    """Yield inline test results in order as they complete; see :func:`run_inline_tests`."""
+    cases = [_Case(t.name, t.vars, t.assert_, "inline") for t in spec.tests]
+    run = partial(_run_case, spec=spec, safe=safe, strict_vars=strict_vars, redact=redact, policy=policy, provider=provider, judge_provider=judge_provider, judge_cache=judge_cache, judge_batch=judge_batch)
+    return _execute(cases, _with_manifest(run, spec, manifest), concurrency=concurrency, fail_fast=fail_fast)
+
+def iter_dataset(spec: PromptSpec, rows: Iterable[DatasetRow], *, safe: bool = False, strict_vars: bool = False, redact: bool = False, policy: object | None = None, provider: Provider | None = None, judge_provider: Provider | None = None, concurrency: int = 1, fail_fast: bool = False, manifest: EvalManifest | None = None, judge_cache: JudgeCache | None = None, judge_batch: bool = False) -> Iterator[TestResult]:
+    """Yield dataset results in order as they complete, holding none of them; see :func:`run_dataset`."""
+    cases = (_Case(f"dataset_row_{i}", row.vars, row.assert_, "dataset") for i, row in enumerate(rows, start=1))
+    run = partial(_run_case, spec=spec, safe=safe, strict_vars=strict_vars, redact=redact, policy=policy, provider=provider, judge_provider=judge_provider, judge_cache=judge_cache, judge_batch=judge_batch)
+    return _execute(cases, _with_manifest(run, spec, manifest), concurrency=concurrency, fail_fast=fail_fast)
+
+def run_inline_tests(spec: PromptSpec, *, safe: bool = False, strict_vars: bool = False, redact: bool = False, policy: object | None = None, provider: Provider | None = None, judge_provider: Provider | None = None, concurrency: int = 1, fail_fast: bool = False, manifest: EvalManifest | None = None, judge_cache: JudgeCache | None = None, judge_batch: bool = False) -> tuple[bool, list[TestResult]]:
+    results = list(iter_inline_tests(spec, safe=safe, strict_vars=strict_vars, redact=redact, policy=policy, provider=provider, judge_provider=judge_provider, concurrency=concurrency, fail_fast=fail_fast, manifest=manifest, judge_cache=judge_cache, judge_batch=judge_batch))
+    return all(r.passed for r in results), results
+
+def run_dataset(spec: PromptSpec, rows: Iterable[DatasetRow], *, safe: bool = False, strict_vars: bool = False, redact: bool = False, policy: object | None = None, provider: Provider | None = None, judge_provider: Provider | None = None, concurrency: int = 1, fail_fast: bool = False, manifest: EvalManifest | None = None, judge_cache: JudgeCache | None = None, judge_batch: bool = False) -> tuple[bool, list[TestResult]]:
+    results = list(iter_dataset(spec, rows, safe=safe, strict_vars=strict_vars, redact=redact, policy=policy, provider=provider, judge_provider=judge_provider, concurrency=concurrency, fail_fast=fail_fast, manifest=manifest, judge_cache=judge_cache, judge_batch=judge_batch))
+    return all(r.passed for r in results), results
+
+async def run_inline_tests_async(spec: PromptSpec, *, safe: bool = False, strict_vars: bool = False, redact: bool = False, policy: object | None = None, provider: AsyncProvider | None = None, judge_provider: AsyncProvider | None = None, concurrency: int = 1, fail_fast: bool = False, manifest: EvalManifest | None = None, judge_cache: JudgeCache | None = None, judge_batch: bool = False) -> tuple[bool, list[TestResult]]:
+    """:func:`run_inline_tests` on one event loop; wrap sync providers with :func:`~instructvault.providers.to_async`."""
+    cases = [_Case(t.name, t.vars, t.assert_, "inline") for t in spec.tests]
+    run = partial(_run_case_async, spec=spec, safe=safe, strict_vars=strict_vars, redact=redact, policy=policy, provider=provider, judge_provider=judge_provider, judge_cache=judge_cache, judge_batch=judge_batch)
+    results = await _execute_async(cases, _with_manifest_async(run, spec, manifest), concurrency=concurrency, fail_fast=fail_fast)
+    return all(r.passed for r in results), results
+
+async def run_dataset_async(spec: PromptSpec, rows: Iterable[DatasetRow], *, safe: bool = False, strict_vars: bool = False, redact: bool = False, policy: object | None = None, provider: AsyncProvider | None = None, judge_provider: AsyncProvider | None = None, concurrency: int = 1, fail_fast: bool = False, manifest: EvalManifest | None = None, judge_cache: JudgeCache | None = None, judge_batch: bool = False) -> tuple[bool, list[TestResult]]:
+    """:func:`run_dataset` on one event loop; ``concurrency`` can be in the hundreds."""
+    cases = (_Case(f"dataset_row_{i}", row.vars, row.assert_, "dataset") for i, row in enumerate(rows, start=1))
+    run = partial(_run_case_async, spec=spec, safe=safe, strict_vars=strict_vars, redact=redact, policy=policy, provider=provider, judge_provider=judge_provider, judge_cache=judge_cache, judge_batch=judge_batch)
+    results = await _execute_async(cases, _with_manifest_async(run, spec, manifest), concurrency=concurrency, fail_fast=fail_fast)
+    return all(r.passed for r in results), results
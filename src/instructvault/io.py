@@ -1,36 +1,147 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
-from typing import Any
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from typing import IO, Any, NamedTuple
 
 import yaml
+from pydantic import ValidationError
 
+from .parsecache import ParseCache
 from .spec import DatasetRow, PromptSpec
 
+# libyaml's C loader parses ~8x faster; the pure-Python loader is the fallback
+# when PyYAML was built without it. Both implement the same safe schema.
+_SafeLoader: Any = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def load_prompt_spec(yaml_text: str, *, allow_no_tests: bool = True) -> PromptSpec:
-    text = yaml_text.strip()
-    if text.startswith("{") or text.startswith("["):
-        try:
-            data: dict[str, Any] = json.loads(text) if text else {}
-        except Exception:
-            data = yaml.safe_load(yaml_text) or {}
-    else:
-        data = yaml.safe_load(yaml_text) or {}
-    return PromptSpec.model_validate(data, context={"allow_no_tests": allow_no_tests})
 
-def load_prompt_dict(text: str) -> dict[str, Any]:
+class ParseCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class ParsedPrompt(NamedTuple):
+    """One parse of a prompt source: the raw document and its validated spec."""
+
+    data: dict[str, Any]
+    spec: PromptSpec
+
+
+def _parse_document(text: str) -> Any:
     raw = text.strip()
     if raw.startswith("{") or raw.startswith("["):
         try:
-            return json.loads(raw) if raw else {}
+            return json.loads(raw)
         except Exception:
-            return yaml.safe_load(text) or {}
-    return yaml.safe_load(text) or {}
+            pass
+    return yaml.load(text, Loader=_SafeLoader)
 
-def load_dataset_jsonl(text: str) -> list[DatasetRow]:
-    rows: list[DatasetRow] = []
-    for i, line in enumerate(text.splitlines(), start=1):
+
+class DocumentCache:
+    """Bounded, thread-safe LRU of parsed prompt documents keyed by content hash.
+
+    YAML parsing dominates loading a prompt, so identical sources (the same
+    file read by ``validate`` and then a policy, by several refs, or again by
+    the SDK) are parsed once per process. Entries stay private: every loader
+    validates its own deep copy, so nothing handed out can alter a cached
+    document. Parse errors are not cached.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self._docs: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, text: str) -> Any:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._docs:
+                self._docs.move_to_end(key)
+                self._hits += 1
+                return self._docs[key]
+            self._misses += 1
+        # Parse outside the lock; a racing duplicate parse is harmless.
+        doc = _parse_document(text)
+        with self._lock:
+            self._docs[key] = doc
+            self._docs.move_to_end(key)
+            while len(self._docs) > self.maxsize:
+                self._docs.popitem(last=False)
+                self._evictions += 1
+        return doc
+
+    def info(self) -> ParseCacheInfo:
+        with self._lock:
+            return ParseCacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._docs))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+_documents = DocumentCache()
+
+
+def parse_cache_info() -> ParseCacheInfo:
+    """Hit/miss/eviction counters for the process-wide parsed-document cache."""
+    return _documents.info()
+
+
+def clear_parse_cache() -> None:
+    _documents.clear()
+
+
+_persistent: ParseCache | None = None
+
+
+def use_parse_cache(cache: ParseCache | None) -> None:
+    """Install (or, with ``None``, remove) the process-wide on-disk spec cache."""
+    global _persistent
+    _persistent = cache
+
+
+def active_parse_cache() -> ParseCache | None:
+    return _persistent
+
+
+def _document(text: str) -> Any:
+    # A private copy: validated specs keep references to nested ``Any`` values.
+    return copy.deepcopy(_documents.get(text)) or {}
+
+def load_prompt(text: str, *, allow_no_tests: bool = True) -> ParsedPrompt:
+    """Parse ``text`` once and return both the document and the validated spec."""
+    data = _document(text)
+    return ParsedPrompt(data, PromptSpec.model_validate(data, context={"allow_no_tests": allow_no_tests}))
+
+def load_prompt_spec(yaml_text: str, *, allow_no_tests: bool = True) -> PromptSpec:
+    disk = _persistent
+    if disk is not None and (cached := disk.get(yaml_text, allow_no_tests=allow_no_tests)) is not None:
+        return cached
+    spec = PromptSpec.model_validate(_document(yaml_text), context={"allow_no_tests": allow_no_tests})
+    if disk is not None:
+        disk.put(yaml_text, spec)
+    return spec
+
+def load_prompt_dict(text: str) -> dict[str, Any]:
+    data: dict[str, Any] = _document(text)
+    return data
+
+def _iter_rows(lines: Iterable[str]) -> Iterator[DatasetRow]:
+    for i, line in enumerate(lines, start=1):
         line = line.strip()
         if not line:
             continue
@@ -38,5 +149,22 @@ def load_dataset_jsonl(text: str) -> list[DatasetRow]:
             obj = json.loads(line)
         except Exception as e:
             raise ValueError(f"Invalid JSON on line {i}: {e}") from e
-        rows.append(DatasetRow.model_validate(obj))
-    return rows
+        try:
+            yield DatasetRow.model_validate(obj)
+        except ValidationError as e:
+            raise ValueError(f"Invalid dataset row on line {i}: {e}") from e
+
+def iter_dataset_jsonl(source: str | os.PathLike[str] | IO[str]) -> Iterator[DatasetRow]:
+    """Stream rows from a JSONL file path or open text file, one line at a time.
+
+    Rows are parsed and validated only as they are consumed, so memory stays
+    flat for any dataset size; errors name the offending line.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as f:
+            yield from _iter_rows(f)
+    else:
+        yield from _iter_rows(source)
+
+def load_dataset_jsonl(text: str) -> list[DatasetRow]:
+    return list(_iter_rows(text.splitlines()))
@@ -4,12 +4,27 @@ Judging is inherently non-deterministic, so it is strictly opt-in: it only runs
 when the caller supplies a judge :class:`~instructvault.providers.Provider`.
 The judge reuses the same provider abstraction as output evals, keeping the core
 free of any hard LLM-SDK dependency.
+
+Scores can be kept in a :class:`JudgeCache`, keyed by the output's hash, the
+rubric and the judge model -- not the threshold, which is applied afterwards,
+so tuning thresholds never re-judges. :func:`judge_outputs` scores several
+``(output, rubric)`` pairs and, with ``batch=True``, asks for all scores of one
+judge model in a single numbered call.
 """
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
 import re
+import tempfile
+import threading
+from collections.abc import Sequence
+from pathlib import Path
 
-from .providers import Provider
+from .providers import AsyncProvider, Provider
 from .spec import JudgeSpec
 
 _JUDGE_SYSTEM = (
@@ -18,9 +33,16 @@ _JUDGE_SYSTEM = (
     "Reply with ONLY the number, e.g. 0.8."
 )
 
+_BATCH_SYSTEM = (
+    "You are a strict evaluator. Given numbered CRITERIA, each naming one of the "
+    "RESPONSES, score how well that response satisfies the criterion on a scale "
+    "from 0.0 to 1.0. Reply with ONLY one line per criterion, e.g. 1: 0.8"
+)
+
 _PERCENT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*%")
 _FRACTION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)")
 _NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_BATCH_LINE_RE = re.compile(r"^\s*(\d+)\s*[:.)=-]\s*(.+?)\s*$", re.MULTILINE)
 
 
 def _clamp(value: float) -> float:
@@ -57,8 +79,7 @@ def _parse_score(text: str) -> float:
     raise ValueError(f"Could not parse a 0.0-1.0 score from judge output: {text!r}")
 
 
-def judge_output(output: str, judge: JudgeSpec, provider: Provider) -> tuple[bool, float]:
-    """Return (passed, score). ``passed`` is ``score >= judge.threshold``."""
+def _judge_request(output: str, judge: JudgeSpec) -> tuple[list[dict[str, str]], dict[str, object]]:
     messages = [
         {"role": "system", "content": _JUDGE_SYSTEM},
         {
@@ -67,6 +88,170 @@ def judge_output(output: str, judge: JudgeSpec, provider: Provider) -> tuple[boo
         },
     ]
     params: dict[str, object] = {"model": judge.model} if judge.model else {}
-    raw = provider(messages, params)
-    score = _parse_score(raw)
-    return (score >= judge.threshold, score)
+    return messages, params
+
+
+def _batch_request(items: Sequence[tuple[str, JudgeSpec]]) -> tuple[list[dict[str, str]], dict[str, object]]:
+    """One call scoring every ``(output, judge)`` pair; shared outputs are sent once."""
+    labels = {output: f"R{i}" for i, output in enumerate(dict.fromkeys(o for o, _ in items), start=1)}
+    responses = "\n\n".join(f"<<<{label}\n{output}\n>>>" for output, label in labels.items())
+    criteria = "\n".join(f"{i}. ({labels[output]}) {judge.rubric}" for i, (output, judge) in enumerate(items, start=1))
+    messages = [
+        {"role": "system", "content": _BATCH_SYSTEM},
+        {"role": "user", "content": f"RESPONSES:\n{responses}\n\nCRITERIA:\n{criteria}\n\nScores (one line per criterion, '<number>: <score>'):"},
+    ]
+    model = items[0][1].model
+    params: dict[str, object] = {"model": model} if model else {}
+    return messages, params
+
+
+def _parse_scores(text: str, count: int) -> list[float]:
+    """Scores from a batched reply (``"1: 0.8"`` per line), each normalized by :func:`_parse_score`."""
+    scores: dict[int, float] = {}
+    for m in _BATCH_LINE_RE.finditer(text):
+        index = int(m.group(1))
+        if 1 <= index <= count and index not in scores:
+            scores[index] = _parse_score(m.group(2))
+    if len(scores) != count:
+        raise ValueError(f"Batched judge reply scored {len(scores)} of {count} criteria: {text!r}")
+    return [scores[i] for i in range(1, count + 1)]
+
+
+class JudgeCache:
+    """Judge scores keyed by ``(output hash, rubric, model)`` within a ``namespace``
+    (usually the judge provider's name).
+
+    Scores are kept in memory for the run and, with a ``directory``, also at
+    ``directory/<key[:2]>/<key>.json``, written atomically so concurrent evals
+    can share it. ``read=False`` ignores scores stored by earlier runs (they are
+    still overwritten), which is what a refresh wants. Thread-safe.
+    """
+
+    def __init__(self, directory: Path | None = None, *, namespace: str = "", read: bool = True):
+        self.directory = directory
+        self.namespace = namespace
+        self.read = read
+        self._scores: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, output: str, judge: JudgeSpec) -> str:
+        payload = {
+            "namespace": self.namespace, "model": judge.model, "rubric": judge.rubric,
+            "output": hashlib.sha256(output.encode("utf-8")).hexdigest(),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, output: str, judge: JudgeSpec) -> float | None:
+        key = self.key(output, judge)
+        with self._lock:
+            score = self._scores.get(key)
+        if score is None and self.read and self.directory is not None:
+            # A missing, truncated or foreign entry is just a miss; the judge is asked again.
+            with contextlib.suppress(OSError, ValueError, KeyError, TypeError):
+                score = float(json.loads((self.directory / key[:2] / f"{key}.json").read_text(encoding="utf-8"))["score"])
+        with self._lock:
+            if score is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._scores[key] = score
+        return score
+
+    def put(self, output: str, judge: JudgeSpec, score: float) -> None:
+        key = self.key(output, judge)
+        with self._lock:
+            self._scores[key] = score
+        if self.directory is None:
+            return
+        # Persisting is best effort: a read-only or full disk still keeps the score for this run.
+        path = self.directory / key[:2] / f"{key}.json"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"namespace": self.namespace, "model": judge.model, "rubric": judge.rubric, "score": score}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+def _cached_scores(items: Sequence[tuple[str, JudgeSpec]], cache: JudgeCache | None) -> list[float | None]:
+    return [cache.get(output, judge) if cache is not None else None for output, judge in items]
+
+
+def _batches(items: Sequence[tuple[str, JudgeSpec]], scores: list[float | None], batch: bool) -> list[list[int]]:
+    """Indexes still to judge, grouped per call: one group per judge model when batching."""
+    missing = [i for i, score in enumerate(scores) if score is None]
+    if not batch:
+        return [[i] for i in missing]
+    groups: dict[str | None, list[int]] = {}
+    for i in missing:
+        groups.setdefault(items[i][1].model, []).append(i)
+    return list(groups.values())
+
+
+def _verdicts(items: Sequence[tuple[str, JudgeSpec]], scores: list[float | None], cache: JudgeCache | None, fresh: dict[int, float]) -> list[tuple[bool, float]]:
+    for i, score in fresh.items():
+        scores[i] = score
+        if cache is not None:
+            cache.put(*items[i], score)
+    return [(score >= judge.threshold, score) for (_, judge), score in zip(items, scores, strict=True) if score is not None]
+
+
+def judge_output(output: str, judge: JudgeSpec, provider: Provider, *, cache: JudgeCache | None = None) -> tuple[bool, float]:
+    """Return (passed, score). ``passed`` is ``score >= judge.threshold``."""
+    return judge_outputs([(output, judge)], provider, cache=cache)[0]
+
+
+def judge_outputs(items: Sequence[tuple[str, JudgeSpec]], provider: Provider, *, cache: JudgeCache | None = None, batch: bool = False) -> list[tuple[bool, float]]:
+    """:func:`judge_output` for several ``(output, judge)`` pairs, in order.
+
+    Cached scores are reused. With ``batch`` the rest are scored in one call
+    per judge model; if that reply cannot be parsed into one score per
+    criterion, those pairs fall back to one call each.
+    """
+    scores = _cached_scores(items, cache)
+    fresh: dict[int, float] = {}
+    for group in _batches(items, scores, batch):
+        if len(group) > 1:
+            try:
+                fresh.update(zip(group, _parse_scores(provider(*_batch_request([items[i] for i in group])), len(group)), strict=True))
+                continue
+            except ValueError:
+                pass
+        for i in group:
+            fresh[i] = _parse_score(provider(*_judge_request(*items[i])))
+    return _verdicts(items, scores, cache, fresh)
+
+
+async def judge_output_async(output: str, judge: JudgeSpec, provider: AsyncProvider, *, cache: JudgeCache | None = None) -> tuple[bool, float]:
+    """:func:`judge_output` for an :data:`~instructvault.providers.AsyncProvider`."""
+    return (await judge_outputs_async([(output, judge)], provider, cache=cache))[0]
+
+
+async def judge_outputs_async(items: Sequence[tuple[str, JudgeSpec]], provider: AsyncProvider, *, cache: JudgeCache | None = None, batch: bool = False) -> list[tuple[bool, float]]:
+    """:func:`judge_outputs` for an :data:`~instructvault.providers.AsyncProvider`; separate calls run concurrently."""
+    scores = _cached_scores(items, cache)
+    fresh: dict[int, float] = {}
+
+    async def _score(group: list[int]) -> None:
+        if len(group) > 1:
+            try:
+                reply = await provider(*_batch_request([items[i] for i in group]))
+                fresh.update(zip(group, _parse_scores(reply, len(group)), strict=True))
+                return
+            except ValueError:
+                pass
+        replies = await asyncio.gather(*(provider(*_judge_request(*items[i])) for i in group))
+        fresh.update((i, _parse_score(reply)) for i, reply in zip(group, replies, strict=True))
+
+    await asyncio.gather(*(_score(group) for group in _batches(items, scores, batch)))
+    return _verdicts(items, scores, cache, fresh)
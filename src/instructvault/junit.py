@@ -3,35 +3,147 @@ from __future__ import annotations
 import xml.etree.ElementTree as ET
 from collections.abc import Iterable
 from datetime import datetime, timezone
+from pathlib import Path
+from types import TracebackType
+from xml.sax.saxutils import quoteattr
 
 from .eval import TestResult
 
+# Blank space left inside each opening tag; the counts are written into it on close.
+_RESERVED = 128
+
+
+def _case_element(r: TestResult, suite_name: str) -> ET.Element:
+    case = ET.Element("testcase", {"name": r.name, "classname": suite_name, "time": f"{r.duration:.3f}"})
+    props = {"reused": "true"} if r.reused else {}
+    props.update({f"time.{step}": f"{seconds:.3f}" for step, seconds in r.timings.items()})
+    if r.prompt_tokens is not None:
+        props["prompt_tokens"] = str(r.prompt_tokens)
+        props["completion_tokens"] = str(r.completion_tokens or 0)
+    if r.cost is not None:
+        props["cost_usd"] = f"{r.cost:.6f}"
+    if props:
+        el = ET.SubElement(case, "properties")
+        for name, value in props.items():
+            ET.SubElement(el, "property", {"name": name, "value": value})
+    if r.skipped:
+        ET.SubElement(case, "skipped", {"message": "judge assertion skipped (no judge provider)"})
+    elif not r.passed:
+        f = ET.SubElement(case, "failure", {"message": r.error or "assertion failed", "type": "AssertionError"})
+        f.text = r.error or "assertion failed"
+    return case
+
+
+class _Counts:
+    def __init__(self) -> None:
+        self.tests = self.failures = self.skipped = 0
+        self.time = 0.0
+
+    def add(self, r: TestResult) -> None:
+        self.tests += 1
+        self.failures += not r.passed and not r.skipped
+        self.skipped += r.skipped
+        self.time += r.duration
+
+    def attrs(self) -> str:
+        return f' tests="{self.tests}" failures="{self.failures}" errors="0" skipped="{self.skipped}" time="{self.time:.3f}"'
+
+
+class JUnitStreamWriter:
+    """Write JUnit XML as results arrive instead of building the tree in memory.
+
+    Each opening ``<testsuite>``/``<testsuites>`` tag is written with blank
+    space reserved for its counts, which are patched in when the suite ends,
+    so memory stays constant and the file on disk only ever lacks the counts
+    of the suite still running. ``multi=True`` wraps suites in ``<testsuites>``;
+    otherwise the single suite is the root, as ``write_junit_xml`` always wrote.
+    """
+
+    def __init__(self, out_path: str | Path, *, multi: bool = False, timestamp: str | None = None):
+        self._f = open(out_path, "wb")  # noqa: SIM115 - closed in close()
+        self._multi = multi
+        self._ts = timestamp or datetime.now(timezone.utc).isoformat()
+        self._f.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+        self._totals = _Counts()
+        self._root = self._open_tag("testsuites", {}, 0) if multi else None
+        self._suite: tuple[str, int, _Counts] | None = None
+        self._suites = 0
+
+    def _open_tag(self, tag: str, attrs: dict[str, str], depth: int) -> int:
+        head = "  " * depth + f"<{tag}" + "".join(f" {k}={quoteattr(v)}" for k, v in attrs.items())
+        self._f.write(head.encode("utf-8"))
+        offset = self._f.tell()
+        self._f.write(b" " * _RESERVED + b">\n")
+        return offset
+
+    def _patch(self, offset: int, counts: _Counts) -> None:
+        data = counts.attrs().encode("utf-8")
+        if len(data) > _RESERVED:
+            raise ValueError("JUnit counts do not fit the reserved header space")
+        end = self._f.tell()
+        self._f.seek(offset)
+        self._f.write(data.ljust(_RESERVED))
+        self._f.seek(end)
+        self._f.flush()
+
+    def begin_suite(self, suite_name: str) -> None:
+        if self._suite is not None:
+            raise ValueError("previous suite is still open")
+        if not self._multi and self._suites:
+            raise ValueError("single-suite JUnit writer already has a suite; use multi=True")
+        offset = self._open_tag("testsuite", {"name": suite_name, "timestamp": self._ts}, 1 if self._multi else 0)
+        self._suite = (suite_name, offset, _Counts())
+        self._suites += 1
+
+    def add(self, result: TestResult) -> None:
+        if self._suite is None:
+            raise ValueError("no open suite")
+        suite_name, _, counts = self._suite
+        depth = 2 if self._multi else 1
+        case = _case_element(result, suite_name)
+        ET.indent(case, space="  ", level=depth)
+        self._f.write(("  " * depth + ET.tostring(case, encoding="unicode") + "\n").encode("utf-8"))
+        counts.add(result)
+        self._totals.add(result)
+
+    def end_suite(self) -> None:
+        if self._suite is None:
+            return
+        _, offset, counts = self._suite
+        self._f.write(("  " * (1 if self._multi else 0) + "</testsuite>\n").encode("utf-8"))
+        self._patch(offset, counts)
+        self._suite = None
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        try:
+            self.end_suite()
+            if self._root is not None:
+                self._f.write(b"</testsuites>\n")
+                self._patch(self._root, self._totals)
+        finally:
+            self._f.close()
+
+    def __enter__(self) -> JUnitStreamWriter:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
+
 
 def write_junit_xml(*, suite_name: str, results: Iterable[TestResult], out_path: str, timestamp: str | None = None) -> None:
-    results = list(results)
-    tests = len(results)
-    failures = sum(1 for r in results if not r.passed and not r.skipped)
-    skipped = sum(1 for r in results if r.skipped)
-    ts = timestamp or datetime.now(timezone.utc).isoformat()
-
-    suite = ET.Element("testsuite", {
-        "name": suite_name,
-        "tests": str(tests),
-        "failures": str(failures),
-        "errors": "0",
-        "skipped": str(skipped),
-        "time": "0",
-        "timestamp": ts,
-    })
-
-    for r in results:
-        case = ET.SubElement(suite, "testcase", {"name": r.name, "classname": suite_name, "time": "0"})
-        if r.skipped:
-            ET.SubElement(case, "skipped", {"message": "judge assertion skipped (no judge provider)"})
-        elif not r.passed:
-            f = ET.SubElement(case, "failure", {"message": r.error or "assertion failed", "type": "AssertionError"})
-            f.text = r.error or "assertion failed"
-
-    tree = ET.ElementTree(suite)
-    ET.indent(tree, space="  ")
-    tree.write(out_path, encoding="utf-8", xml_declaration=True)
+    with JUnitStreamWriter(out_path, timestamp=timestamp) as w:
+        w.begin_suite(suite_name)
+        for r in results:
+            w.add(r)
+
+
+def write_junit_suites(*, suites: Iterable[tuple[str, Iterable[TestResult]]], out_path: str, timestamp: str | None = None) -> None:
+    """One ``<testsuites>`` file with a ``<testsuite>`` per ``(suite_name, results)``."""
+    with JUnitStreamWriter(out_path, multi=True, timestamp=timestamp) as w:
+        for suite_name, results in suites:
+            w.begin_suite(suite_name)
+            for r in results:
+                w.add(r)
+            w.end_suite()
@@ -4,18 +4,40 @@ A lockfile pins every prompt to a canonical hash of its *parsed* spec, so the
 identity is independent of file format (YAML vs JSON) and line endings
 (CRLF vs LF). This makes lock/verify behave identically across repositories,
 operating systems, and CI runners.
+
+Hashing means parsing and validating every prompt. A :class:`LockHashCache`
+remembers each file's ``(name, spec_sha256)`` by content id -- the git blob OID
+-- and, for worktree files, maps ``size + mtime + inode`` to that id. Then
+only new or edited files are parsed again. The lock built from it is
+identical to an uncached build.
+
+A lock built from a ref can also record the git tree OID of its prompts
+directory (``prompts_tree``), sealed with a digest of the locked entries and
+the spec-model fingerprint. :func:`verify_lock` against a ref then returns at
+once when the tree is unchanged, and otherwise re-hashes only the paths that
+``git diff-tree`` reports, so drift checks cost O(changed files).
 """
 from __future__ import annotations
 
 import hashlib
 import json
+import os
+import subprocess
+import tempfile
+import time
+from functools import cache
 from pathlib import Path
 from typing import Any, cast
 
-from .bundle import collect_prompts
+from .bundle import _is_prompt_file, collect_prompts, parse_prompt_texts
 from .spec import PromptSpec
+from .store import PromptStore, _decode
 
 LOCK_VERSION = "1.0"
+HASH_CACHE_VERSION = "1"
+# Worktree stat entries are only trusted for files last modified before this
+# many seconds ago; a quicker edit could share the recorded mtime ("racy" stat).
+_RACY_SECONDS = 2.0
 
 
 def canonical_spec_hash(spec: PromptSpec) -> str:
@@ -30,18 +52,249 @@ def canonical_spec_hash(spec: PromptSpec) -> str:
     return f"sha256:{digest}"
 
 
-def build_lock(repo_root: Path, prompts_dir: Path, ref: str | None) -> dict[str, Any]:
-    prompts = collect_prompts(repo_root, prompts_dir, ref)
-    entries = [
-        {"path": p.path, "name": p.spec.name, "spec_sha256": canonical_spec_hash(p.spec)}
-        for p in prompts
-    ]
+@cache
+def _model_fingerprint() -> str:
+    # Any change to the spec model can change canonical hashes, so it voids the cache.
+    schema = json.dumps(PromptSpec.model_json_schema(by_alias=True), sort_keys=True)
+    return hashlib.sha256(f"{LOCK_VERSION}\n{schema}".encode()).hexdigest()
+
+
+def blob_oid(data: bytes) -> str:
+    """Git blob OID (SHA-1) of ``data``, as ``git hash-object`` computes it."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class LockHashCache:
+    """Local ``content id -> (name, spec_sha256)`` store that makes lock builds incremental.
+
+    Backed by a JSON file that is loaded on construction and written
+    atomically by :meth:`save`; pass it to :func:`build_lock`,
+    :func:`write_lock` or :func:`verify_lock`. Keep it out of version control.
+    At most ``max_entries`` blob entries are kept, least recently used first
+    out, so switching between a few refs stays warm.
+    """
+
+    def __init__(self, path: Path, *, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._blobs: dict[str, list[str]] = {}
+        self._stats: dict[str, list[Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError:
+                data = {}
+            # A damaged or foreign cache is only a cold cache.
+            if not isinstance(data, dict):
+                data = {}
+            blobs, stats = data.get("blobs", {}), data.get("stats", {})
+            if data.get("cache_version") == HASH_CACHE_VERSION and data.get("model") == _model_fingerprint() and isinstance(blobs, dict) and isinstance(stats, dict):
+                self._blobs = dict(blobs)
+                self._stats = dict(stats)
+
+    def lookup(self, oid: str) -> tuple[str, str] | None:
+        entry = self._blobs.pop(oid, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._blobs[oid] = entry  # most recently used last
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def store(self, oid: str, name: str, spec_hash: str) -> None:
+        self._blobs.pop(oid, None)
+        self._blobs[oid] = [name, spec_hash]
+
+    def stat_oid(self, rel_path: str, stat: os.stat_result) -> str | None:
+        entry = self._stats.get(rel_path)
+        if entry is not None and entry[:3] == [stat.st_size, stat.st_mtime_ns, stat.st_ino]:
+            return str(entry[3])
+        return None
+
+    def record_stat(self, rel_path: str, stat: os.stat_result, oid: str) -> None:
+        if time.time_ns() - stat.st_mtime_ns > _RACY_SECONDS * 1e9:
+            self._stats[rel_path] = [stat.st_size, stat.st_mtime_ns, stat.st_ino, oid]
+        else:
+            self._stats.pop(rel_path, None)
+
+    def keep_stats(self, rel_paths: set[str]) -> None:
+        self._stats = {p: e for p, e in self._stats.items() if p in rel_paths}
+
+    def save(self) -> None:
+        while len(self._blobs) > self.max_entries:
+            del self._blobs[next(iter(self._blobs))]
+        text = json.dumps({"cache_version": HASH_CACHE_VERSION, "model": _model_fingerprint(), "blobs": self._blobs, "stats": self._stats})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+def _hash_texts(texts: list[str]) -> list[tuple[str, str]]:
+    """``(name, spec_sha256)`` per prompt source; raises the first parse failure."""
+    hashed = []
+    for spec in parse_prompt_texts(texts):
+        if isinstance(spec, Exception):
+            raise spec
+        hashed.append((spec.name, canonical_spec_hash(spec)))
+    return hashed
+
+
+def _blobs_at_ref(repo_root: Path, ref: str, rel_dir: str) -> list[tuple[str, str]]:
+    """``(path, blob oid)`` of the prompt files under ``rel_dir`` at ``ref``."""
+    cmd = ["git", "-C", str(repo_root), "ls-tree", "-r", "-z", ref, "--", rel_dir]
+    try:
+        res = subprocess.run(cmd, capture_output=True, timeout=30)
+    except subprocess.TimeoutExpired as e:
+        raise TimeoutError(f"git ls-tree timed out after 30s at ref {ref}") from e
+    if res.returncode != 0:
+        raise ValueError(res.stderr.decode("utf-8", "replace").strip() or f"Could not list files at ref {ref}")
+    blobs = []
+    for record in res.stdout.decode("utf-8").split("\0"):
+        meta, _, path = record.partition("\t")
+        parts = meta.split()
+        if len(parts) == 3 and parts[1] == "blob" and _is_prompt_file(path):
+            blobs.append((path, parts[2]))
+    return blobs
+
+
+def _cached_entries_at_ref(repo_root: Path, prompts_dir: Path, ref: str, cache: LockHashCache) -> list[dict[str, Any]]:
+    rel_dir = prompts_dir.relative_to(repo_root).as_posix()
+    blobs = _blobs_at_ref(repo_root, ref, rel_dir)
+    if not blobs:
+        raise ValueError(f"No prompt files found at ref {ref} in {rel_dir}")
+    known: dict[str, tuple[str, str]] = {}
+    missing: list[str] = []
+    for oid in dict.fromkeys(oid for _, oid in blobs):
+        hit = cache.lookup(oid)
+        if hit is None:
+            missing.append(oid)
+        else:
+            known[oid] = hit
+    if missing:
+        # Blobs are addressed by OID, so identical files are parsed once.
+        with PromptStore(repo_root, batch=True) as store:
+            texts = store.read_blobs(missing)
+        for oid, hit in zip(missing, _hash_texts(texts), strict=True):
+            known[oid] = hit
+            cache.store(oid, *hit)
+    return [{"path": path, "name": known[oid][0], "spec_sha256": known[oid][1]} for path, oid in blobs]
+
+
+def _cached_entries_in_worktree(repo_root: Path, prompts_dir: Path, cache: LockHashCache) -> list[dict[str, Any]]:
+    if not prompts_dir.exists():
+        raise FileNotFoundError(f"Prompts directory not found: {prompts_dir}")
+    try:
+        prompts_dir.relative_to(repo_root)
+    except Exception as e:
+        raise ValueError("prompts_dir must be within repo_root") from e
+    files = sorted(prompts_dir.rglob("*.prompt.y*ml")) + sorted(prompts_dir.rglob("*.prompt.json"))
+    if not files:
+        raise ValueError(f"No prompt files found in {prompts_dir}")
+    located: list[tuple[str, str]] = []
+    known: dict[str, tuple[str, str]] = {}
+    unknown: dict[str, str] = {}  # oid -> text still to parse
+    for p in files:
+        rel_path = p.relative_to(repo_root).as_posix()
+        stat = p.stat()
+        oid = cache.stat_oid(rel_path, stat)
+        hit = cache.lookup(oid) if oid is not None else None
+        if oid is None or hit is None:
+            data = p.read_bytes()
+            oid = blob_oid(data)
+            hit = known.get(oid) or cache.lookup(oid)
+            if hit is None and oid not in unknown:
+                unknown[oid] = _decode(data)
+        if hit is not None:
+            known[oid] = hit
+        cache.record_stat(rel_path, stat, oid)
+        located.append((rel_path, oid))
+    for oid, hit in zip(unknown, _hash_texts(list(unknown.values())), strict=True):
+        known[oid] = hit
+        cache.store(oid, *hit)
+    cache.keep_stats({path for path, _ in located})
+    return [{"path": path, "name": known[oid][0], "spec_sha256": known[oid][1]} for path, oid in located]
+
+
+def _git(repo_root: Path, args: list[str]) -> subprocess.CompletedProcess[bytes]:
+    try:
+        return subprocess.run(["git", "-C", str(repo_root), *args], capture_output=True, timeout=30)
+    except subprocess.TimeoutExpired as e:
+        raise TimeoutError(f"git {args[0]} timed out after 30s") from e
+
+
+def prompts_tree_oid(repo_root: Path, ref: str, rel_dir: str) -> str | None:
+    """OID of the git tree holding ``rel_dir`` at ``ref`` (``"."`` for the root), or ``None``."""
+    spec = f"{ref}^{{tree}}" if rel_dir in ("", ".") else f"{ref}:{rel_dir}"
+    res = _git(repo_root, ["rev-parse", "--verify", "--quiet", spec])
+    if res.returncode != 0:
+        return None
+    return res.stdout.decode("utf-8").strip() or None
+
+
+def _diff_trees(repo_root: Path, old: str, new: str) -> list[tuple[str, str, str]] | None:
+    """``(status, path, new blob oid)`` per changed file between two trees; ``None`` if git can't diff them."""
+    res = _git(repo_root, ["diff-tree", "-r", "-z", "--no-renames", old, new])
+    if res.returncode != 0:
+        return None
+    fields = res.stdout.decode("utf-8").split("\0")
+    changes = []
+    for meta, path in zip(fields[0::2], fields[1::2], strict=False):
+        parts = meta.lstrip(":").split()
+        if len(parts) == 5:
+            changes.append((parts[4], path, parts[3]))
+    return changes
+
+
+def build_lock(repo_root: Path, prompts_dir: Path, ref: str | None, *, cache: LockHashCache | None = None, record_tree: bool = False) -> dict[str, Any]:
+    """Lock document for the prompts under ``prompts_dir`` (worktree, or ``ref``).
+
+    With a ``cache`` only files whose content id is unknown are parsed; the
+    cache is saved before returning. ``record_tree`` (ref builds only) adds the
+    prompts tree OID that lets :func:`verify_lock` skip unchanged trees.
+    """
+    if record_tree and ref is None:
+        raise ValueError("record_tree needs a ref: the worktree has no tree OID")
+    if cache is None:
+        entries = [
+            {"path": p.path, "name": p.spec.name, "spec_sha256": canonical_spec_hash(p.spec)}
+            for p in collect_prompts(repo_root, prompts_dir, ref)
+        ]
+    else:
+        if ref is None:
+            entries = _cached_entries_in_worktree(repo_root, prompts_dir, cache)
+        else:
+            entries = _cached_entries_at_ref(repo_root, prompts_dir, ref, cache)
+        cache.save()
     entries.sort(key=lambda e: str(e["path"]))
-    return {
+    lock: dict[str, Any] = {
         "lock_version": LOCK_VERSION,
         "ref": ref or "WORKTREE",
         "prompts": entries,
     }
+    if record_tree and ref is not None:
+        rel_dir = prompts_dir.relative_to(repo_root).as_posix()
+        lock["prompts_tree"] = {
+            "path": rel_dir,
+            "oid": prompts_tree_oid(repo_root, ref, rel_dir),
+            "prompts_sha256": _prompts_digest(entries),
+            "model": _model_fingerprint(),
+        }
+    return lock
+
+
+def _prompts_digest(prompts: Any) -> str:
+    # Seals the entries the tree OID vouches for: an edited or mis-merged
+    # ``prompts`` list no longer matches and verify rebuilds in full.
+    payload = json.dumps(prompts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 def dumps_lock(lock: dict[str, Any]) -> str:
@@ -50,9 +303,9 @@ def dumps_lock(lock: dict[str, Any]) -> str:
 
 
 def write_lock(
-    out_path: Path, *, repo_root: Path, prompts_dir: Path, ref: str | None
+    out_path: Path, *, repo_root: Path, prompts_dir: Path, ref: str | None, cache: LockHashCache | None = None, record_tree: bool = False
 ) -> dict[str, Any]:
-    lock = build_lock(repo_root, prompts_dir, ref)
+    lock = build_lock(repo_root, prompts_dir, ref, cache=cache, record_tree=record_tree)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(dumps_lock(lock), encoding="utf-8")
     return lock
@@ -62,14 +315,7 @@ def _entry_map(prompts: list[dict[str, Any]]) -> dict[str, str]:
     return {str(e["path"]): str(e["spec_sha256"]) for e in prompts}
 
 
-def verify_lock(
-    lock: dict[str, Any], *, repo_root: Path, prompts_dir: Path, ref: str | None
-) -> tuple[bool, list[str]]:
-    """Compare a lockfile against the current prompts. Returns (ok, human diffs)."""
-    current = build_lock(repo_root, prompts_dir, ref)
-    locked_entries = _entry_map(cast(list[dict[str, Any]], lock.get("prompts", [])))
-    current_entries = _entry_map(cast(list[dict[str, Any]], current["prompts"]))
-
+def _drift(locked_entries: dict[str, str], current_entries: dict[str, str]) -> list[str]:
     diffs: list[str] = []
     for path in sorted(set(current_entries) - set(locked_entries)):
         diffs.append(f"added: {path}")
@@ -78,4 +324,74 @@ def verify_lock(
     for path in sorted(set(locked_entries) & set(current_entries)):
         if locked_entries[path] != current_entries[path]:
             diffs.append(f"changed: {path}")
+    return diffs
+
+
+def _verify_by_tree(lock: dict[str, Any], locked_entries: dict[str, str], *, repo_root: Path, prompts_dir: Path, ref: str, cache: LockHashCache | None) -> list[str] | None:
+    """Drift from the lock's recorded prompts tree to ``ref``'s, touching only changed paths.
+
+    ``None`` when the fast path does not apply: no tree recorded, another
+    prompts dir, ``prompts`` entries that no longer match the digest recorded
+    with the tree, a lock from another spec model or lock version, or a
+    recorded tree that is not in this repository.
+    """
+    recorded = lock.get("prompts_tree")
+    rel_dir = prompts_dir.relative_to(repo_root).as_posix()
+    if not isinstance(recorded, dict) or recorded.get("path") != rel_dir or not recorded.get("oid"):
+        return None
+    if recorded.get("model") != _model_fingerprint() or recorded.get("prompts_sha256") != _prompts_digest(lock.get("prompts", [])):
+        return None
+    target = prompts_tree_oid(repo_root, ref, rel_dir)
+    if target is None:
+        return None
+    if target == recorded["oid"]:
+        return []
+    changes = _diff_trees(repo_root, str(recorded["oid"]), target)
+    if changes is None:
+        return None
+    prefix = "" if rel_dir in ("", ".") else f"{rel_dir}/"
+    current = dict(locked_entries)
+    fresh: dict[str, str] = {}
+    for status, path, oid in changes:
+        if not _is_prompt_file(path):
+            continue
+        current.pop(prefix + path, None)
+        if status != "D":
+            fresh[prefix + path] = oid
+    hashes: dict[str, str] = {}
+    unknown: list[str] = []
+    for oid in dict.fromkeys(fresh.values()):
+        hit = cache.lookup(oid) if cache is not None else None
+        if hit is None:
+            unknown.append(oid)
+        else:
+            hashes[oid] = hit[1]
+    if unknown:
+        with PromptStore(repo_root, batch=True) as store:
+            texts = store.read_blobs(unknown)
+        for oid, (name, spec_hash) in zip(unknown, _hash_texts(texts), strict=True):
+            hashes[oid] = spec_hash
+            if cache is not None:
+                cache.store(oid, name, spec_hash)
+        if cache is not None:
+            cache.save()
+    current.update((path, hashes[oid]) for path, oid in fresh.items())
+    return _drift(locked_entries, current)
+
+
+def verify_lock(
+    lock: dict[str, Any], *, repo_root: Path, prompts_dir: Path, ref: str | None, cache: LockHashCache | None = None
+) -> tuple[bool, list[str]]:
+    """Compare a lockfile against the current prompts. Returns (ok, human diffs).
+
+    Against a ref, a lock with a recorded ``prompts_tree`` is checked from the
+    tree diff alone; otherwise the current lock is rebuilt in full.
+    """
+    locked_entries = _entry_map(cast(list[dict[str, Any]], lock.get("prompts", [])))
+    if ref is not None:
+        diffs = _verify_by_tree(lock, locked_entries, repo_root=repo_root, prompts_dir=prompts_dir, ref=ref, cache=cache)
+        if diffs is not None:
+            return (not diffs), diffs
+    current = build_lock(repo_root, prompts_dir, ref, cache=cache)
+    diffs = _drift(locked_entries, _entry_map(cast(list[dict[str, Any]], current["prompts"])))
     return (not diffs), diffs
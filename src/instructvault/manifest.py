@@ -0,0 +1,138 @@
+"""Incremental eval: remember passing results and skip unchanged work.
+
+An :class:`EvalManifest` maps a content hash of everything that can change an
+eval result -- the prompt's :func:`~instructvault.lock.canonical_spec_hash`,
+the test/row (vars + assertions; tests also by name, dataset rows by content
+so inserting a row does not shift the others), the provider and judge names
+and the eval flags -- to the :class:`~instructvault.eval.TestResult` of the last run. When
+the same key comes up again the stored result is returned, marked ``reused``,
+instead of rendering and calling a model. Only passing (or skipped) results are
+stored: a failure is always re-run, since it may have been transient.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, NamedTuple
+
+MANIFEST_VERSION = "2"
+
+
+def _digest(payload: object) -> str:
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path: str | Path | None) -> str | None:
+    """Content hash of a file used by the run (e.g. a policy module), or ``None``."""
+    if not path:
+        return None
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class ManifestChanges(NamedTuple):
+    """What a worker's manifest did since the last hand-off (see :meth:`EvalManifest.take_changes`)."""
+
+    entries: dict[str, dict[str, Any] | None]  # added, or dropped as ``None``
+    touched: set[str]  # keys looked up or recorded
+    prompts: set[str]  # prompts evaluated
+
+
+class EvalManifest:
+    """Result store for one eval configuration, backed by a JSON file.
+
+    ``context`` holds the run-wide inputs that are not part of the spec
+    (provider names, ``--safe``/``--redact`` flags, policy fingerprint); any
+    change to it invalidates every entry. The file is loaded on construction
+    and written by :meth:`save`. Entries of prompts this run did not evaluate
+    are kept, so one manifest can serve many prompts; for the prompts it did
+    evaluate, :meth:`save` keeps only the keys this run used, so edits to a
+    spec, dataset or provider do not leave stale entries behind. Each entry
+    records its ``prompt`` for that. Safe to share across eval threads.
+    """
+
+    def __init__(self, path: Path, context: dict[str, Any] | None = None):
+        self.path = path
+        self._context = _digest(context or {})
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._changes: dict[str, dict[str, Any] | None] = {}
+        self._touched: set[str] = set()
+        self._prompts: set[str] = set()
+        self._pending_touched: set[str] = set()
+        self._pending_prompts: set[str] = set()
+        self.reused = 0
+        self.recorded = 0
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("manifest_version") == MANIFEST_VERSION:
+                self._entries = dict(data.get("entries", {}))
+
+    def key(self, spec_hash: str, kind: str, name: str | None, vars: dict[str, Any], assert_: dict[str, Any]) -> str:
+        """Entry key; dataset rows pass a content-derived ``name`` rather than their position."""
+        return _digest({"context": self._context, "spec": spec_hash, "kind": kind, "name": name, "vars": vars, "assert": assert_})
+
+    def evaluating(self, prompt: str) -> None:
+        """Mark ``prompt`` as evaluated by this run, so :meth:`save` prunes its unused keys."""
+        with self._lock:
+            self._prompts.add(prompt)
+            self._pending_prompts.add(prompt)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            self._touched.add(key)
+            self._pending_touched.add(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.reused += 1
+            return entry
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._touched.add(key)
+            self._pending_touched.add(key)
+            if entry.get("pass"):
+                self._entries[key] = entry
+                self._changes[key] = entry
+                self.recorded += 1
+            elif self._entries.pop(key, None) is not None:
+                self._changes[key] = None
+
+    def take_changes(self) -> ManifestChanges:
+        """Everything since the last call. Lets eval worker processes hand their
+        updates to the parent, which owns the file."""
+        with self._lock:
+            changes = ManifestChanges(self._changes, self._pending_touched, self._pending_prompts)
+            self._changes, self._pending_touched, self._pending_prompts = {}, set(), set()
+            return changes
+
+    def apply(self, changes: ManifestChanges) -> None:
+        with self._lock:
+            for key, entry in changes.entries.items():
+                if entry is None:
+                    self._entries.pop(key, None)
+                else:
+                    self._entries[key] = entry
+            self._touched |= changes.touched
+            self._prompts |= changes.prompts
+            self.recorded += sum(1 for e in changes.entries.values() if e is not None)
+
+    def save(self) -> None:
+        """Drop the evaluated prompts' unused entries, then atomically rewrite
+        the manifest file (sorted, so it diffs cleanly)."""
+        with self._lock:
+            self._entries = {k: e for k, e in self._entries.items() if k in self._touched or e.get("prompt") not in self._prompts}
+            text = json.dumps({"manifest_version": MANIFEST_VERSION, "entries": self._entries}, indent=2, sort_keys=True) + "\n"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,162 @@
+"""Persistent parse cache: validated specs shared across ``ivault`` commands.
+
+CI usually runs ``validate``, ``lint``, ``lock``, ``bundle`` and ``eval`` back to
+back over the same prompt files. With a :class:`ParseCache` installed (``ivault
+--parse-cache DIR`` or ``IVAULT_PARSE_CACHE``), the first command stores each
+validated spec as compact JSON keyed by the source's content hash, and later
+commands load it with a single pydantic-core pass over those bytes instead of
+parsing YAML and validating the document in Python.
+
+Entries live at ``DIR/specs/<fingerprint>/<key[:2]>/<key>.json``. The
+fingerprint covers :data:`PARSE_CACHE_VERSION` and the spec model's JSON
+schema, so a model change starts a fresh namespace and :meth:`ParseCache.prune`
+drops the old one. Files are written atomically, so concurrent commands can
+share one directory. Only specs that validated and reload from their JSON
+form unchanged are stored, so a hit always equals a fresh parse.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import suppress
+from functools import cache
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from .spec import PromptSpec
+
+PARSE_CACHE_VERSION = "1"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Temp files this old belong to a writer that died before os.replace().
+_STALE_TMP_SECONDS = 3600.0
+
+
+@cache
+def schema_fingerprint() -> str:
+    """Short hash of the cache format and the spec model; entries from other models are ignored."""
+    schema = json.dumps(PromptSpec.model_json_schema(by_alias=True), sort_keys=True)
+    return hashlib.sha256(f"{PARSE_CACHE_VERSION}\n{schema}".encode()).hexdigest()[:16]
+
+
+class ParseCache:
+    """Directory of validated specs keyed by source content hash.
+
+    ``get`` re-applies the caller's validation context (``allow_no_tests``), so
+    an entry stored by a lenient command never lets a strict one pass; any entry
+    that does not load is treated as a miss and the source is parsed normally.
+    Hits refresh the file's mtime, which :meth:`prune` uses as recency when the
+    directory grows past ``max_bytes``. Safe to share across threads.
+    """
+
+    def __init__(self, directory: str | Path, *, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._root = self.directory / "specs"
+        self._dir = self._root / schema_fingerprint()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.skipped = 0  # specs that would not round-trip through JSON
+
+    def _path(self, text: str) -> Path:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return self._dir / key[:2] / f"{key}.json"
+
+    def get(self, text: str, *, allow_no_tests: bool = True) -> PromptSpec | None:
+        path = self._path(text)
+        try:
+            spec = PromptSpec.model_validate_json(path.read_bytes(), context={"allow_no_tests": allow_no_tests})
+        except (OSError, ValidationError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with suppress(OSError):
+            os.utime(path)
+        with self._lock:
+            self.hits += 1
+        return spec
+
+    def put(self, text: str, spec: PromptSpec) -> bool:
+        """Store ``spec`` for ``text`` if its JSON form reloads to an equal spec.
+
+        YAML-native values in free-form fields (a date in test ``vars``, say)
+        would come back as strings, so such specs are not cached: a warm run
+        must see exactly what a cold one does. Writing is best effort; a
+        read-only or full disk leaves the entry a miss. Returns whether it was stored.
+        """
+        data = json.dumps(spec.model_dump(by_alias=True, mode="json"), separators=(",", ":"), ensure_ascii=False)
+        try:
+            lossless = PromptSpec.model_validate_json(data, context={"allow_no_tests": True}) == spec
+        except ValidationError:
+            lossless = False
+        if not lossless:
+            with self._lock:
+                self.skipped += 1
+            return False
+        path = self._path(text)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError:
+            return False
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            return False
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.writes += 1
+        return True
+
+    def prune(self) -> int:
+        """Drop other fingerprints' entries, then the least recently used ones
+        until the cache is under three quarters of ``max_bytes``. Returns how
+        many entries were evicted for size. Tolerates concurrent writers and pruners."""
+        removed = 0
+        if not self._root.is_dir():
+            return removed
+        for other in self._root.iterdir():
+            if other == self._dir:
+                continue
+            if other.is_dir():
+                shutil.rmtree(other, ignore_errors=True)
+            else:
+                other.unlink(missing_ok=True)
+        entries: list[tuple[float, int, Path]] = []
+        now = time.time()
+        for path in self._dir.glob("*/*"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if path.suffix == ".tmp":
+                if now - st.st_mtime > _STALE_TMP_SECONDS:
+                    path.unlink(missing_ok=True)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return removed
+        target = self.max_bytes * 3 // 4
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
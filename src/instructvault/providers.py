@@ -1,9 +1,99 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+import abc
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, NamedTuple
 
 # A provider takes rendered messages + model params and returns the model's reply text.
 Provider = Callable[[list[dict[str, str]], dict[str, object]], str]
+# Same contract, awaited; lets one event loop keep many requests in flight.
+AsyncProvider = Callable[[list[dict[str, str]], dict[str, object]], Awaitable[str]]
+
+
+class TokenUsage(NamedTuple):
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class Reply(str):
+    """Reply text that also carries the API's token usage and model, when reported.
+
+    Providers may return a plain ``str``; a ``Reply`` is still a ``str``, so
+    assertions and wrappers treat both the same and only eval accounting looks
+    at the extra fields. ``cost`` is filled in by :func:`priced_provider`.
+    """
+
+    usage: TokenUsage | None
+    model: str | None
+    cost: float | None
+
+    def __new__(cls, text: str, *, usage: TokenUsage | None = None, model: str | None = None, cost: float | None = None) -> Reply:
+        reply = super().__new__(cls, text)
+        reply.usage = usage
+        reply.model = model
+        reply.cost = cost
+        return reply
+
+
+class ModelPrice(NamedTuple):
+    """USD per million input (prompt) and output (completion) tokens."""
+    input_per_mtok: float
+    output_per_mtok: float
+
+
+def parse_price(text: str) -> tuple[str, ModelPrice]:
+    """Parse ``MODEL=INPUT,OUTPUT`` (USD per million tokens), e.g. ``gpt-4o-mini=0.15,0.60``."""
+    model, sep, rates = text.partition("=")
+    parts = rates.split(",")
+    if not sep or not model.strip() or len(parts) != 2:
+        raise ValueError(f"Invalid price '{text}': expected MODEL=INPUT,OUTPUT (USD per 1M tokens)")
+    try:
+        return model.strip(), ModelPrice(float(parts[0]), float(parts[1]))
+    except ValueError as e:
+        raise ValueError(f"Invalid price '{text}': {e}") from e
+
+
+def _model_price(prices: Mapping[str, ModelPrice], *models: object) -> ModelPrice | None:
+    # APIs often answer with a dated snapshot ("gpt-4o-mini-2024-07-18") of the
+    # requested model, so fall back to the longest configured prefix.
+    for model in models:
+        if not isinstance(model, str) or not model:
+            continue
+        if model in prices:
+            return prices[model]
+        prefixes = [m for m in prices if model.startswith(m)]
+        if prefixes:
+            return prices[max(prefixes, key=len)]
+    return None
+
+
+def priced_provider(provider: Provider, prices: Mapping[str, ModelPrice]) -> Provider:
+    """Attach an estimated USD ``cost`` to every :class:`Reply` that reports token usage.
+
+    The price is looked up by the model the API reports, then by the requested
+    ``params["model"]``; replies without usage or a matching price are returned unchanged.
+    """
+
+    def _call(messages: list[dict[str, str]], params: dict[str, object]) -> str:
+        reply = provider(messages, params)
+        if not isinstance(reply, Reply) or reply.usage is None:
+            return reply
+        price = _model_price(prices, reply.model, params.get("model"))
+        if price is None:
+            return reply
+        usage = reply.usage
+        cost = (usage.prompt_tokens * price.input_per_mtok + usage.completion_tokens * price.output_per_mtok) / 1_000_000
+        return Reply(reply, usage=usage, model=reply.model, cost=cost)
+
+    return _call
 
 
 def _mock_provider(messages: list[dict[str, str]], params: dict[str, object]) -> str:
@@ -14,34 +104,264 @@ def _mock_provider(messages: list[dict[str, str]], params: dict[str, object]) ->
     return messages[-1]["content"] if messages else ""
 
 
-def _openai_provider(messages: list[dict[str, str]], params: dict[str, object]) -> str:
-    from openai import OpenAI  # lazy import; only needed when actually used
+@dataclass(frozen=True)
+class ClientOptions:
+    """HTTP settings for the pooled SDK clients. ``None`` keeps the SDK default.
+
+    Attributes:
+        timeout:         Per-request timeout in seconds.
+        max_connections: Size of the keep-alive connection pool, i.e. how many
+                         requests may be in flight at once (match ``--concurrency``).
+    """
+
+    timeout: float | None = None
+    max_connections: int | None = None
 
-    client = OpenAI()
-    model = str(params.get("model") or "gpt-4o-mini")
-    kwargs = {k: params[k] for k in ("temperature", "top_p", "max_tokens") if params.get(k) is not None}
-    resp = client.chat.completions.create(model=model, messages=messages, **kwargs)
-    return resp.choices[0].message.content or ""
+    def __post_init__(self) -> None:
+        if self.timeout is not None and self.timeout <= 0:
+            raise ValueError("timeout must be > 0 or None")
+        if self.max_connections is not None and self.max_connections < 1:
+            raise ValueError("max_connections must be >= 1 or None")
 
+    def client_kwargs(self) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {}
+        if self.timeout is not None:
+            kwargs["timeout"] = self.timeout
+        if self.max_connections is not None:
+            import httpx  # shipped with both SDKs
 
-def _ollama_provider(messages: list[dict[str, str]], params: dict[str, object]) -> str:
-    from ollama import Client  # lazy import; only needed when actually used
+            kwargs["limits"] = httpx.Limits(
+                max_connections=self.max_connections, max_keepalive_connections=self.max_connections
+            )
+        return kwargs
 
-    # Client() defaults host to http://127.0.0.1:11434 and honors OLLAMA_HOST for overrides.
-    client = Client()
-    model = str(params.get("model") or "llama3.2")
+
+class _PooledProvider(abc.ABC):
+    """Provider that builds its SDK client once and reuses it for every call.
+
+    The client (and its HTTP keep-alive pool) lives as long as this object, so
+    a whole eval run pays for one connection setup instead of one per row or
+    judge call. The SDK clients are thread-safe, so one instance can be shared
+    by concurrent eval workers; construction is guarded by a lock.
+    """
+
+    def __init__(self, options: ClientOptions | None = None):
+        self.options = options or ClientOptions()
+        self._client: Any = None
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _make_client(self) -> Any:
+        """Build the SDK client; called once, on first use."""
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._make_client()
+        return self._client
+
+
+def _openai_request(params: dict[str, object]) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {k: params[k] for k in ("temperature", "top_p", "max_tokens") if params.get(k) is not None}
+    kwargs["model"] = str(params.get("model") or "gpt-4o-mini")
+    return kwargs
+
+
+def _ollama_request(params: dict[str, object]) -> dict[str, Any]:
     option_keys = {"temperature": "temperature", "top_p": "top_p", "max_tokens": "num_predict"}
     options = {option_keys[k]: params[k] for k in option_keys if params.get(k) is not None}
-    resp = client.chat(model=model, messages=messages, options=options or None)
-    return resp.message.content or ""
+    return {"model": str(params.get("model") or "llama3.2"), "options": options or None}
+
+
+def _openai_reply(resp: Any) -> Reply:
+    usage = getattr(resp, "usage", None)
+    tokens = TokenUsage(usage.prompt_tokens or 0, usage.completion_tokens or 0) if usage is not None else None
+    return Reply(resp.choices[0].message.content or "", usage=tokens, model=getattr(resp, "model", None))
+
+
+def _ollama_reply(resp: Any) -> Reply:
+    prompt, completion = getattr(resp, "prompt_eval_count", None), getattr(resp, "eval_count", None)
+    tokens = TokenUsage(prompt or 0, completion or 0) if prompt is not None or completion is not None else None
+    return Reply(resp.message.content or "", usage=tokens, model=getattr(resp, "model", None))
+
+
+def _openai_client_kwargs(options: ClientOptions, http_client_cls: Callable[..., Any]) -> dict[str, Any]:
+    kwargs = options.client_kwargs()
+    limits = kwargs.pop("limits", None)
+    if limits is not None:
+        # The SDK's Default*HttpxClient keeps its defaults (redirects, timeouts) and only swaps the pool.
+        kwargs["http_client"] = http_client_cls(limits=limits)
+    return kwargs
+
+
+class OpenAIProvider(_PooledProvider):
+    def _make_client(self) -> Any:
+        from openai import DefaultHttpxClient, OpenAI  # lazy import; only needed when actually used
+
+        return OpenAI(**_openai_client_kwargs(self.options, DefaultHttpxClient))
+
+    def __call__(self, messages: list[dict[str, str]], params: dict[str, object]) -> str:
+        resp = self.client.chat.completions.create(messages=messages, **_openai_request(params))
+        return _openai_reply(resp)
 
 
-_PROVIDERS: dict[str, Provider] = {"mock": _mock_provider, "openai": _openai_provider, "ollama": _ollama_provider}
+class OllamaProvider(_PooledProvider):
+    def _make_client(self) -> Any:
+        from ollama import Client  # lazy import; only needed when actually used
 
+        # Client() defaults host to http://127.0.0.1:11434 and honors OLLAMA_HOST for overrides;
+        # extra kwargs are passed through to its httpx.Client.
+        return Client(**self.options.client_kwargs())
 
-def get_provider(name: str | None) -> Provider | None:
+    def __call__(self, messages: list[dict[str, str]], params: dict[str, object]) -> str:
+        resp = self.client.chat(messages=messages, **_ollama_request(params))
+        return _ollama_reply(resp)
+
+
+async def _mock_async_provider(messages: list[dict[str, str]], params: dict[str, object]) -> str:
+    return _mock_provider(messages, params)
+
+
+class AsyncOpenAIProvider(_PooledProvider):
+    """:class:`OpenAIProvider` on ``AsyncOpenAI``. Use one instance per event loop."""
+
+    def _make_client(self) -> Any:
+        from openai import (  # lazy import; only needed when actually used
+            AsyncOpenAI,
+            DefaultAsyncHttpxClient,
+        )
+
+        return AsyncOpenAI(**_openai_client_kwargs(self.options, DefaultAsyncHttpxClient))
+
+    async def __call__(self, messages: list[dict[str, str]], params: dict[str, object]) -> str:
+        resp = await self.client.chat.completions.create(messages=messages, **_openai_request(params))
+        return _openai_reply(resp)
+
+
+class AsyncOllamaProvider(_PooledProvider):
+    """:class:`OllamaProvider` on ``ollama.AsyncClient``. Use one instance per event loop."""
+
+    def _make_client(self) -> Any:
+        from ollama import AsyncClient  # lazy import; only needed when actually used
+
+        return AsyncClient(**self.options.client_kwargs())
+
+    async def __call__(self, messages: list[dict[str, str]], params: dict[str, object]) -> str:
+        resp = await self.client.chat(messages=messages, **_ollama_request(params))
+        return _ollama_reply(resp)
+
+
+def to_async(provider: Provider) -> AsyncProvider:
+    """Adapt a sync provider for the async eval pipeline by running each call in a worker thread."""
+
+    async def _call(messages: list[dict[str, str]], params: dict[str, object]) -> str:
+        return await asyncio.to_thread(provider, messages, params)
+
+    return _call
+
+
+_PROVIDERS: dict[str, Callable[[ClientOptions | None], Provider]] = {
+    "mock": lambda _options: _mock_provider,
+    "openai": OpenAIProvider,
+    "ollama": OllamaProvider,
+}
+
+_ASYNC_PROVIDERS: dict[str, Callable[[ClientOptions | None], AsyncProvider]] = {
+    "mock": lambda _options: _mock_async_provider,
+    "openai": AsyncOpenAIProvider,
+    "ollama": AsyncOllamaProvider,
+}
+
+
+def get_provider(name: str | None, options: ClientOptions | None = None) -> Provider | None:
+    """Build the named provider. Each call returns a new provider with its own
+    client pool; hold on to it for the duration of a run."""
     if not name:
         return None
     if name not in _PROVIDERS:
         raise ValueError(f"Unknown provider '{name}'. Available: {', '.join(sorted(_PROVIDERS))}")
-    return _PROVIDERS[name]
+    return _PROVIDERS[name](options)
+
+
+def get_async_provider(name: str | None, options: ClientOptions | None = None) -> AsyncProvider | None:
+    """Async counterpart of :func:`get_provider`."""
+    if not name:
+        return None
+    if name not in _ASYNC_PROVIDERS:
+        raise ValueError(f"Unknown provider '{name}'. Available: {', '.join(sorted(_ASYNC_PROVIDERS))}")
+    return _ASYNC_PROVIDERS[name](options)
+
+
+CACHE_MODES = ("record", "replay", "refresh")
+_CACHE_KEY_VERSION = 1
+
+
+def response_cache_key(namespace: str, messages: list[dict[str, str]], params: dict[str, object]) -> str:
+    """Content address of one provider call: same messages + params -> same key."""
+    payload = json.dumps(
+        {"v": _CACHE_KEY_VERSION, "provider": namespace, "messages": messages, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cached_reply(record: dict[str, Any]) -> str:
+    # Recorded usage is served back so replayed runs still report tokens and cost.
+    usage = record.get("usage")
+    if not usage:
+        return str(record["reply"])
+    return Reply(str(record["reply"]), usage=TokenUsage(int(usage["prompt_tokens"]), int(usage["completion_tokens"])), model=record.get("model"))
+
+
+def cached_provider(provider: Provider, cache_dir: Path, *, namespace: str, mode: str = "record") -> Provider:
+    """Wrap ``provider`` with an on-disk, content-addressed response cache.
+
+    Replies live at ``cache_dir/<key[:2]>/<key>.json`` and are written
+    atomically, so concurrent evals can share one directory. Modes:
+
+    * ``record``  -- serve cached replies; call the provider and store on a miss
+      (a damaged entry counts as a miss).
+    * ``replay``  -- serve cached replies only; a miss or damaged entry is an error (no network).
+    * ``refresh`` -- always call the provider and overwrite the stored reply.
+
+    ``namespace`` (usually the provider name) keeps replies from different
+    providers apart even for identical requests.
+    """
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown cache mode '{mode}'. Available: {', '.join(CACHE_MODES)}")
+
+    def _call(messages: list[dict[str, str]], params: dict[str, object]) -> str:
+        key = response_cache_key(namespace, messages, params)
+        path = cache_dir / key[:2] / f"{key}.json"
+        if mode != "refresh":
+            try:
+                return _cached_reply(json.loads(path.read_text(encoding="utf-8")))
+            except FileNotFoundError:
+                if mode == "replay":
+                    raise LookupError(f"No cached {namespace} response for this request (replay mode, key {key[:12]})") from None
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                # A truncated or hand-edited entry is a miss; the live reply below rewrites it.
+                if mode == "replay":
+                    raise LookupError(f"Damaged cached {namespace} response for this request (replay mode, key {key[:12]})") from e
+        reply = provider(messages, params)
+        record: dict[str, Any] = {"provider": namespace, "messages": messages, "params": params, "reply": reply}
+        if isinstance(reply, Reply) and reply.usage is not None:
+            record["usage"] = reply.usage._asdict()
+            record["model"] = reply.model
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False, default=str)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return reply
+
+    return _call
@@ -0,0 +1,263 @@
+"""Client-side rate limiting and retry for provider calls.
+
+:class:`RateLimiter` combines a requests/min and a tokens/min token bucket with
+an adaptive (AIMD) concurrency cap. :func:`rate_limited` and
+:func:`rate_limited_async` wrap a provider so each call waits for budget,
+retries throttled responses (HTTP 429) with jittered exponential backoff or the
+server's ``Retry-After``, and halves the concurrency cap when throttled. One
+limiter is meant to be shared by every provider/judge that spends the same quota.
+Token counts are estimates (about four characters per token, plus the
+requested ``max_tokens``), since a call must be charged before its reply
+(and any reported :class:`~instructvault.providers.TokenUsage`) exists.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+from .providers import AsyncProvider, Provider
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Quota and retry settings. ``None`` disables a bound.
+
+    Attributes:
+        requests_per_minute: Request budget, refilled continuously.
+        tokens_per_minute:   Estimated token budget, refilled continuously.
+        max_concurrency:     Upper bound for the adaptive in-flight cap. Without
+                             it the cap only applies after the first throttle.
+        max_retries:         Retries per call after a throttled response.
+        base_delay:          First backoff step in seconds; doubles per retry.
+        max_delay:           Ceiling for one backoff step (``Retry-After`` is
+                             honored as sent).
+    """
+
+    requests_per_minute: float | None = None
+    tokens_per_minute: float | None = None
+    max_concurrency: int | None = None
+    max_retries: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 60.0
+
+    def __post_init__(self) -> None:
+        if self.requests_per_minute is not None and self.requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be > 0 or None")
+        if self.tokens_per_minute is not None and self.tokens_per_minute <= 0:
+            raise ValueError("tokens_per_minute must be > 0 or None")
+        if self.max_concurrency is not None and self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1 or None")
+        if self.max_retries < 0:
+            raise ValueError("max_retries must be >= 0")
+        if self.base_delay <= 0 or self.max_delay < self.base_delay:
+            raise ValueError("need 0 < base_delay <= max_delay")
+
+
+class _Bucket:
+    """Token bucket that may go into debt: ``reserve`` never blocks, it returns
+    how long the caller must wait before its reservation is covered."""
+
+    def __init__(self, per_minute: float, now: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.level = per_minute
+        self.stamp = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+        # A single call larger than the whole bucket still goes through, after a full refill.
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+
+class RateLimiter:
+    """Thread-safe shared quota for provider calls; see :class:`RateLimit`."""
+
+    def __init__(self, limit: RateLimit | None = None, *, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit or RateLimit()
+        self._clock = clock
+        now = clock()
+        self._requests = _Bucket(self.limit.requests_per_minute, now) if self.limit.requests_per_minute else None
+        self._tokens = _Bucket(self.limit.tokens_per_minute, now) if self.limit.tokens_per_minute else None
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._cap: float | None = float(self.limit.max_concurrency) if self.limit.max_concurrency else None
+        self._paused_until = 0.0
+        self._async_waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = deque()
+        self.throttles = 0
+
+    @property
+    def concurrency_cap(self) -> int | None:
+        """Current adaptive in-flight cap (``None`` = unbounded)."""
+        with self._cond:
+            return None if self._cap is None else int(self._cap)
+
+    def reserve(self, tokens: int) -> float:
+        """Charge one request of ``tokens`` and return the seconds to wait before sending."""
+        with self._cond:
+            now = self._clock()
+            wait = max(0.0, self._paused_until - now)
+            if self._requests is not None:
+                wait = max(wait, self._requests.reserve(1, now))
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            return wait
+
+    def enter(self) -> None:
+        with self._cond:
+            while self._cap is not None and self._in_flight >= int(self._cap):
+                self._cond.wait()
+            self._in_flight += 1
+
+    async def enter_async(self) -> None:
+        """:meth:`enter` for coroutines: parks on a future that :meth:`exit` resolves."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._cap is None or self._in_flight < int(self._cap):
+                    self._in_flight += 1
+                    return
+                fut: asyncio.Future[None] = loop.create_future()
+                self._async_waiters.append((loop, fut))
+            try:
+                await fut
+            except asyncio.CancelledError:
+                with self._cond:
+                    try:
+                        self._async_waiters.remove((loop, fut))
+                    except ValueError:
+                        self._wake_async()  # already woken: hand the slot to the next waiter
+                raise
+
+    def _wake_async(self) -> None:
+        # Caller holds self._cond. Wake one parked coroutine per free slot, oldest first.
+        free = len(self._async_waiters) if self._cap is None else int(self._cap) - self._in_flight
+        while free > 0 and self._async_waiters:
+            loop, fut = self._async_waiters.popleft()
+            loop.call_soon_threadsafe(_resolve, fut)
+            free -= 1
+
+    def exit(self, *, throttled: bool, retry_after: float | None = None) -> None:
+        """Leave the in-flight set. A throttle halves the cap and, with
+        ``retry_after``, pauses every caller sharing this limiter; a success
+        grows the cap by about one per cap's worth of calls."""
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self.throttles += 1
+                self._cap = max(1.0, (self._cap if self._cap is not None else self._in_flight + 1) / 2)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, self._clock() + retry_after)
+            elif self._cap is not None:
+                grown = self._cap + 1.0 / self._cap
+                ceiling = self.limit.max_concurrency
+                self._cap = grown if ceiling is None else min(float(ceiling), grown)
+            self._cond.notify_all()
+            self._wake_async()
+
+    def backoff(self, attempt: int, retry_after: float | None) -> float:
+        """Delay before retry ``attempt`` (0-based): ``Retry-After`` if given, else full jitter."""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.limit.base_delay)
+        return random.uniform(0, min(self.limit.max_delay, self.limit.base_delay * 2 ** attempt))
+
+
+def _resolve(fut: asyncio.Future[None]) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+def estimate_tokens(messages: list[dict[str, str]], params: dict[str, object]) -> int:
+    """Rough token cost of a call: ~4 characters per prompt token plus ``max_tokens``."""
+    prompt = sum(len(m.get("content") or "") for m in messages) // 4 + 1
+    max_tokens = params.get("max_tokens")
+    return prompt + (max_tokens if isinstance(max_tokens, int) else 0)
+
+
+def is_throttled(exc: BaseException) -> bool:
+    """True for HTTP 429 errors raised by the OpenAI/Ollama SDKs (or anything with ``status_code``)."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status == 429
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds from the response's ``Retry-After`` header (delta or HTTP date), if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def rate_limited(provider: Provider, limiter: RateLimiter) -> Provider:
+    """Wrap a sync provider with ``limiter``'s quota, adaptive concurrency and 429 retries.
+
+    Once retries are exhausted the last throttle error is raised, and the eval
+    row fails as before.
+    """
+
+    def _call(messages: list[dict[str, str]], params: dict[str, object]) -> str:
+        tokens = estimate_tokens(messages, params)
+        attempt = 0
+        while True:
+            limiter.enter()
+            throttled, delay = False, None
+            try:
+                wait = limiter.reserve(tokens)
+                if wait:
+                    time.sleep(wait)
+                return provider(messages, params)
+            except Exception as e:
+                throttled = is_throttled(e)
+                if not throttled or attempt >= limiter.limit.max_retries:
+                    raise
+                delay = retry_after(e)
+            finally:
+                limiter.exit(throttled=throttled, retry_after=delay)
+            time.sleep(limiter.backoff(attempt, delay))
+            attempt += 1
+
+    return _call
+
+
+def rate_limited_async(provider: AsyncProvider, limiter: RateLimiter) -> AsyncProvider:
+    """:func:`rate_limited` for an :data:`~instructvault.providers.AsyncProvider`; never blocks the loop."""
+
+    async def _call(messages: list[dict[str, str]], params: dict[str, object]) -> str:
+        tokens = estimate_tokens(messages, params)
+        attempt = 0
+        while True:
+            await limiter.enter_async()
+            throttled, delay = False, None
+            try:
+                wait = limiter.reserve(tokens)
+                if wait:
+                    await asyncio.sleep(wait)
+                return await provider(messages, params)
+            except Exception as e:
+                throttled = is_throttled(e)
+                if not throttled or attempt >= limiter.limit.max_retries:
+                    raise
+                delay = retry_after(e)
+            finally:
+                limiter.exit(throttled=throttled, retry_after=delay)
+            await asyncio.sleep(limiter.backoff(attempt, delay))
+            attempt += 1
+
+    return _call
@@ -1,14 +1,84 @@
 from __future__ import annotations
 
 import re
-from typing import Any
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple
 
-from jinja2 import Environment, StrictUndefined
+from jinja2 import Environment, StrictUndefined, Template
 
-from .spec import PromptMessage, PromptSpec
+from .spec import PromptMessage, PromptSpec, Role
 
 _env = Environment(undefined=StrictUndefined, autoescape=False)
 
+
+class TemplateCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class TemplateCache:
+    """Bounded, thread-safe LRU of compiled Jinja templates keyed by source text.
+
+    Compiling a template (lex, parse, codegen) costs far more than rendering
+    it, and message content is the template's full identity, so identical
+    content across prompts, refs and reloads shares one compiled object.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self._templates: OrderedDict[str, Template] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, source: str) -> Template:
+        with self._lock:
+            tmpl = self._templates.get(source)
+            if tmpl is not None:
+                self._templates.move_to_end(source)
+                self._hits += 1
+                return tmpl
+            self._misses += 1
+        # Compile outside the lock; a racing duplicate compile is harmless.
+        tmpl = _env.from_string(source)
+        with self._lock:
+            self._templates[source] = tmpl
+            self._templates.move_to_end(source)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+                self._evictions += 1
+        return tmpl
+
+    def info(self) -> TemplateCacheInfo:
+        with self._lock:
+            return TemplateCacheInfo(
+                self._hits, self._misses, self._evictions, self.maxsize, len(self._templates)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+_templates = TemplateCache()
+
+
+def template_cache_info() -> TemplateCacheInfo:
+    """Hit/miss/eviction counters for the process-wide compiled-template cache."""
+    return _templates.info()
+
+
+def clear_template_cache() -> None:
+    _templates.clear()
+
 _SECRET_PATTERNS = [
     ("anthropic_key", re.compile(r"sk-ant-[A-Za-z0-9_-]{20,}")),
     ("openai_key", re.compile(r"sk-[A-Za-z0-9]{20,}")),
@@ -21,13 +91,62 @@ _SECRET_PATTERNS = [
     ("generic_token", re.compile(r"(?:api|token|secret)[=_:\s-]{1,}[A-Za-z0-9-]{16,}", re.IGNORECASE)),
 ]
 
+# Literal every match of a case-sensitive pattern starts with. A cheap substring
+# test rules a pattern out before its regex runs, so clean text skips them all.
+_SECRET_PREFIXES = {
+    "anthropic_key": "sk-ant-",
+    "openai_key": "sk-",
+    "aws_key": "AKIA",
+    "github_token": "gh",
+    "google_api_key": "AIza",
+    "slack_token": "xox",
+    "pypi_token": "pypi-",
+    "private_key_block": "-----BEGIN ",
+}
+# generic_token is case-insensitive; every match starts at one of these keywords.
+_GENERIC_KEYWORDS = ("api", "token", "secret")
+# Characters re.IGNORECASE folds onto a keyword letter that str.lower() does not.
+_IGNORECASE_ODDITIES = ("\u0131", "\u017f")
+
+def _search_generic(pat: re.Pattern[str], text: str) -> bool:
+    """``pat.search(text)`` for a keyword-led IGNORECASE pattern, trying only keyword positions."""
+    low = text.lower()
+    if len(low) != len(text) or any(c in text for c in _IGNORECASE_ODDITIES):
+        return pat.search(text) is not None  # offsets would not line up; scan everything
+    for kw in _GENERIC_KEYWORDS:
+        i = low.find(kw)
+        while i != -1:
+            if pat.match(text, i):
+                return True
+            i = low.find(kw, i + 1)
+    return False
+
 def _scan_for_secrets(text: str) -> list[str]:
     hits: list[str] = []
     for name, pat in _SECRET_PATTERNS:
-        if pat.search(text):
+        prefix = _SECRET_PREFIXES.get(name)
+        if prefix is None:
+            found = _search_generic(pat, text)
+        else:
+            found = prefix in text and pat.search(text) is not None
+        if found:
             hits.append(name)
     return hits
 
+def _redact_secrets(text: str) -> tuple[str, list[str]]:
+    """Return ``(redacted_text, hits)``, substituting only the patterns that hit.
+
+    Equivalent to applying every pattern's ``sub`` in order: ``[REDACTED]``
+    cannot complete a match, so patterns that missed the original text would
+    also miss after earlier substitutions.
+    """
+    hits = _scan_for_secrets(text)
+    if hits:
+        patterns = dict(_SECRET_PATTERNS)
+        for name in hits:
+            text = patterns[name].sub("[REDACTED]", text)
+    return text, hits
+
 def check_required_vars(spec: PromptSpec, vars: dict[str, Any], *, safe: bool = False, strict_vars: bool = False, redact: bool = False) -> None:
     missing = [k for k in spec.variables.required if k not in vars]
     if missing:
@@ -44,22 +163,27 @@ def check_required_vars(spec: PromptSpec, vars: dict[str, Any], *, safe: bool =
                 if hits:
                     raise ValueError(f"Potential secret detected in vars: {hits}")
 
-def render_messages(spec: PromptSpec, vars: dict[str, Any], *, safe: bool = False, strict_vars: bool = False, redact: bool = False) -> list[PromptMessage]:
+def compile_messages(spec: PromptSpec) -> list[tuple[Role, Template]]:
+    """``(role, compiled template)`` per message, for rendering one spec many times."""
+    return [(m.role, _templates.get(m.content)) for m in spec.messages]
+
+def render_compiled(compiled: list[tuple[Role, Template]], vars: dict[str, Any], *, safe: bool = False, redact: bool = False) -> list[PromptMessage]:
     rendered: list[PromptMessage] = []
-    for m in spec.messages:
-        tmpl = _env.from_string(m.content)
+    for role, tmpl in compiled:
         content = tmpl.render(**vars)
         if safe:
-            hits = _scan_for_secrets(content)
+            redacted, hits = _redact_secrets(content)
             if hits:
-                if redact:
-                    for _, pat in _SECRET_PATTERNS:
-                        content = pat.sub("[REDACTED]", content)
-                else:
+                if not redact:
                     raise ValueError(f"Potential secret detected in rendered output: {hits}")
-        rendered.append(PromptMessage(role=m.role, content=content))
+                content = redacted
+        # The role comes from a validated spec and render() returns str: skip re-validation.
+        rendered.append(PromptMessage.model_construct(role=role, content=content))
     return rendered
 
+def render_messages(spec: PromptSpec, vars: dict[str, Any], *, safe: bool = False, strict_vars: bool = False, redact: bool = False) -> list[PromptMessage]:
+    return render_compiled(compile_messages(spec), vars, safe=safe, redact=redact)
+
 def render_joined_text(spec: PromptSpec, vars: dict[str, Any], *, safe: bool = False, strict_vars: bool = False, redact: bool = False) -> str:
     msgs = render_messages(spec, vars, safe=safe, strict_vars=strict_vars, redact=redact)
     return "\n\n".join([f"{m.role}: {m.content}" for m in msgs])
@@ -1,24 +1,51 @@
 from __future__ import annotations
 
-import json
-import threading
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, Future
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
+from .bundle import load_bundle
+from .cache import CacheKey, CachePolicy, SingleFlight, SpecCache, SpecCacheInfo
 from .io import load_prompt_spec
-from .render import check_required_vars, render_messages
+from .render import check_required_vars, compile_messages, render_compiled, render_messages
 from .result import RenderResult
-from .spec import PromptSpec
+from .spec import PromptMessage, PromptSpec
 from .store import PromptStore
 
 
+def _render_rows(
+    spec: PromptSpec, rows: list[dict[str, Any]], safe: bool, strict_vars: bool, redact: bool
+) -> list[list[PromptMessage] | Exception]:
+    """Render a chunk of var sets; module-level so process pools can pickle it."""
+    compiled = compile_messages(spec)
+    out: list[list[PromptMessage] | Exception] = []
+    for vars in rows:
+        try:
+            check_required_vars(spec, vars, safe=safe, strict_vars=strict_vars, redact=redact)
+            out.append(render_compiled(compiled, vars, safe=safe, redact=redact))
+        except Exception as e:
+            out.append(e)
+    return out
+
+
 class InstructVault:
     """Runtime loader for prompt specs from a git repo or a build-time bundle.
 
     Specs are cached for speed (safe for use in web servers): immutable git
-    refs are cached for the lifetime of the instance, and worktree reads are
-    revalidated by file mtime. Pass ``cache=False`` to disable, or call
-    :meth:`clear_cache` to reset.
+    refs are served from cache until evicted, and worktree reads are
+    revalidated by file mtime. The cache is a bounded LRU; pass a
+    :class:`~instructvault.cache.CachePolicy` as ``cache`` to tune its entry
+    count, byte budget and worktree TTL, ``cache=False`` to disable it, and
+    use :meth:`cache_info` / :meth:`clear_cache` to inspect or reset it.
+
+    Pass ``git_batch=True`` to serve ref reads from one long-lived
+    ``git cat-file --batch`` process instead of forking ``git`` per load, and
+    ``verify_bundle=True`` to check bundle specs against their ``spec_sha256``
+    integrity markers.
     """
 
     def __init__(
@@ -26,28 +53,36 @@ class InstructVault:
         repo_root: str | Path | None = None,
         bundle_path: str | Path | None = None,
         *,
-        cache: bool = True,
+        cache: bool | CachePolicy = True,
+        git_batch: bool = False,
+        verify_bundle: bool = False,
     ):
         if repo_root is None and bundle_path is None:
             raise ValueError("Provide repo_root or bundle_path")
-        self.store = PromptStore(Path(repo_root)) if repo_root is not None else None
-        self.bundle = None
-        if bundle_path is not None:
-            data = json.loads(Path(bundle_path).read_text(encoding="utf-8"))
-            self.bundle = {p["path"]: PromptSpec.model_validate(p["spec"]) for p in data.get("prompts", [])}
-        self._cache_enabled = cache
-        # key -> (spec, worktree_mtime_ns or None for pinned refs)
-        self._cache: dict[tuple[str, str | None], tuple[PromptSpec, int | None]] = {}
-        self._lock = threading.Lock()
+        self.store = PromptStore(Path(repo_root), batch=git_batch) if repo_root is not None else None
+        self.bundle = load_bundle(bundle_path, verify=verify_bundle) if bundle_path is not None else None
+        self._cache: SpecCache | None = None
+        if cache is not False:
+            self._cache = SpecCache(cache if isinstance(cache, CachePolicy) else None)
+        # Concurrent misses for one (path, ref, stamp) share a single load.
+        self._flights: SingleFlight[tuple[CacheKey, int | None], PromptSpec] = SingleFlight()
 
     def clear_cache(self) -> None:
-        with self._lock:
+        if self._cache is not None:
             self._cache.clear()
 
-    def _load_uncached(self, prompt_path: str, ref: str | None) -> PromptSpec:
+    def cache_info(self) -> SpecCacheInfo:
+        """Hit/miss/eviction counters and current size of the spec cache."""
+        if self._cache is None:
+            return SpecCacheInfo(0, 0, 0, 0, 0, 0, 0)
+        return self._cache.info()
+
+    def _load_uncached(self, prompt_path: str, ref: str | None) -> tuple[PromptSpec, int]:
+        """Parsed spec plus its source size in bytes (the cache's weight)."""
         if self.store is None:
             raise ValueError("No repo_root configured")
-        return load_prompt_spec(self.store.read_text(prompt_path, ref=ref), allow_no_tests=True)
+        text = self.store.read_text(prompt_path, ref=ref)
+        return load_prompt_spec(text, allow_no_tests=True), len(text.encode("utf-8"))
 
     def load_prompt(self, prompt_path: str, ref: str | None = None) -> PromptSpec:
         if self.bundle is not None:
@@ -58,37 +93,96 @@ class InstructVault:
             return self.bundle[prompt_path]
         if self.store is None:
             raise ValueError("No repo_root configured")
-        if not self._cache_enabled:
-            return self._load_uncached(prompt_path, ref)
+        if self._cache is None:
+            return self._load_uncached(prompt_path, ref)[0]
 
         key = (prompt_path, ref)
-        with self._lock:
-            cached = self._cache.get(key)
-        if cached is not None:
-            spec, stamp = cached
-            if ref is not None:
-                return spec  # pinned ref is immutable for this process
-            if stamp is not None and self.store.mtime_ns(prompt_path) == stamp:
-                return spec
-
-        spec = self._load_uncached(prompt_path, ref)
+        # A pinned ref is immutable for this process; worktree files are stamped
+        # by mtime *before* reading, so an edit racing the read forces a reload.
         stamp = None if ref is not None else self.store.mtime_ns(prompt_path)
-        with self._lock:
-            self._cache[key] = (spec, stamp)
+        spec = self._cache.get(key, stamp)
+        if spec is not None:
+            return spec
+        return self._flights.do((key, stamp), lambda: self._load_and_cache(key, stamp))
+
+    def _load_and_cache(self, key: CacheKey, stamp: int | None) -> PromptSpec:
+        assert self._cache is not None
+        spec, nbytes = self._load_uncached(*key)
+        self._cache.put(key, spec, stamp, nbytes)
         return spec
+
+    @staticmethod
+    def _result_meta(spec: PromptSpec, prompt_path: str, ref: str | None) -> dict[str, Any]:
+        md = spec.model_defaults.model_dump()
+        return {
+            "model": md.get("model"),
+            "provider": md.get("provider"),
+            "temperature": md.get("temperature"),
+            "top_p": md.get("top_p"),
+            "max_tokens": md.get("max_tokens"),
+            "prompt_name": spec.name,
+            "prompt_path": prompt_path,
+            "ref": ref,
+        }
+
     def render(self, prompt_path: str, vars: dict[str, Any], ref: str | None = None, *, safe: bool = False, strict_vars: bool = False, redact: bool = False) -> RenderResult:
         spec = self.load_prompt(prompt_path, ref=ref)
         check_required_vars(spec, vars, safe=safe, strict_vars=strict_vars, redact=redact)
         msgs = render_messages(spec, vars, safe=safe, strict_vars=strict_vars, redact=redact)
-        md = spec.model_defaults.model_dump()
-        return RenderResult(
-            msgs,
-            model=md.get("model"),
-            provider=md.get("provider"),
-            temperature=md.get("temperature"),
-            top_p=md.get("top_p"),
-            max_tokens=md.get("max_tokens"),
-            prompt_name=spec.name,
-            prompt_path=prompt_path,
-            ref=ref,
-        )
+        return RenderResult(msgs, **self._result_meta(spec, prompt_path, ref))
+
+    def render_many(
+        self,
+        prompt_path: str,
+        vars_iter: Iterable[dict[str, Any]],
+        ref: str | None = None,
+        *,
+        safe: bool = False,
+        strict_vars: bool = False,
+        redact: bool = False,
+        executor: Executor | None = None,
+        chunksize: int = 64,
+    ) -> Iterator[RenderResult | Exception]:
+        """Render one prompt for many var sets, streaming results in input order.
+
+        The spec is loaded and its templates compiled once. A row that fails
+        (missing vars, secret detected, template error) yields its exception
+        instead of raising, so one bad row never stops the batch. Pass a
+        ``ThreadPoolExecutor`` or ``ProcessPoolExecutor`` to fan rows out in
+        chunks of ``chunksize``; only a bounded window of chunks is in flight,
+        so ``vars_iter`` may be an arbitrarily long generator.
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be >= 1")
+        spec = self.load_prompt(prompt_path, ref=ref)  # errors here raise eagerly
+        meta = self._result_meta(spec, prompt_path, ref)
+
+        def _wrap(chunk: list[list[PromptMessage] | Exception]) -> Iterator[RenderResult | Exception]:
+            for item in chunk:
+                if isinstance(item, Exception):
+                    yield item
+                else:
+                    yield RenderResult(item, **meta)
+
+        rows = iter(vars_iter)
+        chunks = iter(lambda: list(islice(rows, chunksize)), [])
+
+        def _serial() -> Iterator[RenderResult | Exception]:
+            for chunk in chunks:
+                yield from _wrap(_render_rows(spec, chunk, safe, strict_vars, redact))
+
+        def _pooled(pool: Executor) -> Iterator[RenderResult | Exception]:
+            window = 2 * (os.cpu_count() or 1)
+            pending: deque[Future[list[list[PromptMessage] | Exception]]] = deque()
+            try:
+                for chunk in chunks:
+                    pending.append(pool.submit(_render_rows, spec, chunk, safe, strict_vars, redact))
+                    if len(pending) >= window:
+                        yield from _wrap(pending.popleft().result())
+                while pending:
+                    yield from _wrap(pending.popleft().result())
+            finally:
+                for fut in pending:
+                    fut.cancel()
+
+        return _serial() if executor is None else _pooled(executor)
@@ -0,0 +1,208 @@
+"""Result sinks: where ``ivault eval`` sends each result as it completes.
+
+A run calls ``begin_prompt`` once per prompt, ``add`` for every result in
+order, ``end_prompt``, and finally ``close`` (also on errors, so files written
+so far stay well-formed). Streaming sinks write through immediately and hold
+no results, so long provider-backed evals can be tailed live and use constant
+memory; :class:`JsonReportSink` is the one that keeps results, because its
+single JSON document needs all of them.
+"""
+from __future__ import annotations
+
+import json
+import math
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from rich import print as rprint
+
+from .eval import TestResult
+from .junit import JUnitStreamWriter
+
+
+def result_record(r: TestResult) -> dict[str, Any]:
+    return {
+        "test": r.name, "pass": r.passed, "error": r.error, "skipped": r.skipped, "reused": r.reused,
+        "duration": round(r.duration, 6), "timings": {k: round(v, 6) for k, v in r.timings.items()},
+        "prompt_tokens": r.prompt_tokens, "completion_tokens": r.completion_tokens, "cost": r.cost,
+    }
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:  # nearest-rank: always an observed value
+        return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)], 6)
+
+    return {"p50": rank(0.50), "p95": rank(0.95), "max": rank(1.0)}
+
+
+class ResultStats:
+    """Running latency, token and cost aggregates for a stream of results.
+
+    Holds one float per result (and per step) for the percentiles plus running
+    totals, never the results themselves. Results reused from an incremental
+    manifest did no work and are skipped.
+    """
+
+    def __init__(self, results: Iterable[TestResult] = ()):
+        self.measured = 0
+        self.durations: list[float] = []
+        self.steps: dict[str, list[float]] = {}
+        self.prompt_tokens: int | None = None
+        self.completion_tokens: int | None = None
+        self.cost: float | None = None
+        for r in results:
+            self.add(r)
+
+    def add(self, r: TestResult) -> None:
+        if r.reused:
+            return
+        self.measured += 1
+        self.durations.append(r.duration)
+        for step, seconds in r.timings.items():
+            self.steps.setdefault(step, []).append(seconds)
+        if r.prompt_tokens is not None:
+            self.prompt_tokens = (self.prompt_tokens or 0) + r.prompt_tokens
+        if r.completion_tokens is not None:
+            self.completion_tokens = (self.completion_tokens or 0) + r.completion_tokens
+        if r.cost is not None:
+            self.cost = (self.cost or 0.0) + r.cost
+
+
+def result_stats(stats: ResultStats) -> dict[str, Any]:
+    """p50/p95/max of case and per-step durations (seconds), plus token and cost totals.
+
+    Token and cost totals are ``None`` when no reply reported usage or had a price.
+    """
+    return {
+        "measured": stats.measured,
+        "duration": _percentiles(stats.durations) if stats.durations else None,
+        "steps": {step: _percentiles(v) for step, v in sorted(stats.steps.items())},
+        "prompt_tokens": stats.prompt_tokens,
+        "completion_tokens": stats.completion_tokens,
+        "cost": stats.cost,
+    }
+
+
+class ResultSink:
+    """Base sink; subclasses override the hooks they need."""
+
+    def begin_prompt(self, path: str, name: str) -> None:
+        pass
+
+    def add(self, result: TestResult) -> None:
+        pass
+
+    def end_prompt(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlReportSink(ResultSink):
+    """One JSON object per result (with its prompt), flushed as it is written."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = path.open("w", encoding="utf-8")
+        self._prompt: dict[str, str] = {}
+
+    def begin_prompt(self, path: str, name: str) -> None:
+        self._prompt = {"prompt": name, "path": path}
+
+    def add(self, result: TestResult) -> None:
+        self._f.write(json.dumps({**self._prompt, **result_record(result)}) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class JUnitSink(ResultSink):
+    """Incremental JUnit XML; one ``ivault:<name>`` suite per prompt."""
+
+    def __init__(self, path: Path, *, multi: bool):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = JUnitStreamWriter(path, multi=multi)
+
+    def begin_prompt(self, path: str, name: str) -> None:
+        self._writer.begin_suite(f"ivault:{name}")
+
+    def add(self, result: TestResult) -> None:
+        self._writer.add(result)
+
+    def end_prompt(self) -> None:
+        self._writer.end_suite()
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class ConsoleSink(ResultSink):
+    """PASS/FAIL/SKIP lines as results arrive; multi-prompt runs get a header per prompt."""
+
+    def __init__(self, *, multi: bool):
+        self._indent = "  " if multi else ""
+        self._multi = multi
+        self._stats = ResultStats()
+
+    def begin_prompt(self, path: str, name: str) -> None:
+        self._stats = ResultStats()
+        if self._multi:
+            rprint(f"[bold]{path}[/bold]  ({name})")
+
+    def end_prompt(self) -> None:
+        # Latency/cost line only for model-backed runs; rendering alone is not worth it.
+        if not self._stats.measured:
+            return
+        stats = result_stats(self._stats)
+        line = "  ".join(f"{k} {v * 1000:.0f}ms" for k, v in stats["duration"].items())
+        if stats["prompt_tokens"] is not None:
+            line += f"  tokens {stats['prompt_tokens']}/{stats['completion_tokens']}"
+        if stats["cost"] is not None:
+            line += f"  cost ${stats['cost']:.4f}"
+        rprint(f"{self._indent}[dim]{line}[/dim]")
+
+    def add(self, r: TestResult) -> None:
+        if "provider" in r.timings:
+            self._stats.add(r)
+        if r.skipped:
+            rprint(f"{self._indent}[yellow]SKIP[/yellow] {r.name}  (judge not run)")
+        elif r.passed:
+            rprint(f"{self._indent}[green]PASS[/green] {r.name}" + ("  (reused)" if r.reused else ""))
+        else:
+            rprint(f"{self._indent}[red]FAIL[/red] {r.name}  {r.error or ''}")
+
+
+class JsonReportSink(ResultSink):
+    """Collects the classic ``--report``/``--json`` document (kept in memory)."""
+
+    def __init__(self, *, multi: bool, ref: str | None):
+        self._multi = multi
+        self._ref = ref or "WORKTREE"
+        self._prompts: list[dict[str, Any]] = []
+        self._stats = ResultStats()
+
+    def begin_prompt(self, path: str, name: str) -> None:
+        self._prompts.append({"prompt": name, "path": path, "pass": True, "reused": 0, "results": []})
+        self._stats = ResultStats()
+
+    def add(self, result: TestResult) -> None:
+        current = self._prompts[-1]
+        current["pass"] = current["pass"] and result.passed
+        current["reused"] += result.reused
+        current["results"].append(result_record(result))
+        self._stats.add(result)
+
+    def end_prompt(self) -> None:
+        self._prompts[-1]["stats"] = result_stats(self._stats)
+
+    def payload(self) -> dict[str, Any]:
+        ok = all(p["pass"] for p in self._prompts)
+        if self._multi:
+            return {"ref": self._ref, "pass": ok, "reused": sum(p["reused"] for p in self._prompts), "prompts": self._prompts}
+        single = self._prompts[0]
+        return {"prompt": single["prompt"], "ref": self._ref, "pass": ok, "reused": single["reused"], "stats": single.get("stats"), "results": single["results"]}
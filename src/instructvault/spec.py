@@ -41,7 +41,13 @@ class AssertSpec(BaseModel):
     matches: list[str] | None = None
     not_matches: list[str] | None = None
     json_schema: dict[str, Any] | None = None
-    judge: JudgeSpec | None = None
+    # One rubric, or several criteria that must all pass.
+    judge: JudgeSpec | list[JudgeSpec] | None = None
+
+    def judges(self) -> list[JudgeSpec]:
+        if self.judge is None:
+            return []
+        return self.judge if isinstance(self.judge, list) else [self.judge]
 
     def has_deterministic(self) -> bool:
         return bool(
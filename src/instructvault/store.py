@@ -1,15 +1,190 @@
 from __future__ import annotations
 
+import contextlib
 import subprocess
+import threading
+import weakref
 from pathlib import Path
+from types import TracebackType
 
 # Git operations should never hang a runtime request. Bound them defensively.
 _GIT_TIMEOUT_SECONDS = 30
 
+# Requests up to this size fit in any OS pipe buffer, so they can be written
+# inline without risking a deadlock against git's own stdout.
+_INLINE_WRITE_BYTES = 4096
+
+
+def _decode(data: bytes) -> str:
+    """Decode git output the way ``text=True`` / ``read_text`` would (universal newlines)."""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _terminate(proc: subprocess.Popen[bytes]) -> None:
+    if proc.poll() is None:
+        if proc.stdin is not None:
+            with contextlib.suppress(OSError):
+                proc.stdin.close()
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    if proc.stdout is not None:
+        proc.stdout.close()
+
+
+class _BatchCrashed(Exception):
+    """The cat-file coprocess exited or closed its pipes mid-transaction."""
+
+
+class _CatFileBatch:
+    """A long-lived ``git cat-file --batch`` coprocess shared by one store.
+
+    Requests are pipelined over stdin and a lock serializes transactions across
+    threads. Each transaction is bounded by ``_GIT_TIMEOUT_SECONDS`` (the
+    process is killed on expiry), and a crashed process is restarted once
+    before the error is surfaced.
+    """
 
-class PromptStore:
     def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self._proc: subprocess.Popen[bytes] | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen[bytes]:
+        if self._proc is None or self._proc.poll() is not None:
+            self._discard()
+            try:
+                proc = subprocess.Popen(
+                    ["git", "-C", str(self.repo_root), "cat-file", "--batch"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            except FileNotFoundError as e:
+                raise RuntimeError("git executable not found on PATH") from e
+            weakref.finalize(self, _terminate, proc)
+            self._proc = proc
+        return self._proc
+
+    def _discard(self) -> None:
+        if self._proc is not None:
+            proc, self._proc = self._proc, None
+            if proc.poll() is None:
+                proc.kill()
+            _terminate(proc)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._proc is not None:
+                proc, self._proc = self._proc, None
+                _terminate(proc)
+
+    def query(self, names: list[str]) -> list[tuple[str, bytes] | None]:
+        """``(oid, content)`` per object name, or ``None`` where git reports it missing."""
+        if any("\n" in n for n in names):
+            raise ValueError("git object names must not contain newlines")
+        if not names:
+            return []
+        with self._lock:
+            try:
+                return self._transact(names)
+            except _BatchCrashed:
+                self._discard()
+            try:
+                return self._transact(names)
+            except _BatchCrashed as e:
+                self._discard()
+                raise RuntimeError("git cat-file --batch exited unexpectedly") from e
+
+    def _transact(self, names: list[str]) -> list[tuple[str, bytes] | None]:
+        proc = self._ensure_started()
+        assert proc.stdin is not None and proc.stdout is not None
+        timed_out = threading.Event()
+
+        def _expire() -> None:
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(_GIT_TIMEOUT_SECONDS, _expire)
+        timer.daemon = True
+        payload = "".join(f"{n}\n" for n in names).encode("utf-8")
+        writer: threading.Thread | None = None
+        timer.start()
+        try:
+            if len(payload) <= _INLINE_WRITE_BYTES:
+                self._write(proc, payload)
+            else:
+                writer = threading.Thread(target=self._write, args=(proc, payload), daemon=True)
+                writer.start()
+            return [self._read_one(proc) for _ in names]
+        except _BatchCrashed:
+            if timed_out.is_set():
+                self._discard()
+                raise TimeoutError(
+                    f"git cat-file timed out after {_GIT_TIMEOUT_SECONDS}s reading {len(names)} object(s)"
+                ) from None
+            raise
+        finally:
+            timer.cancel()
+            if writer is not None:
+                writer.join()
+
+    @staticmethod
+    def _write(proc: subprocess.Popen[bytes], payload: bytes) -> None:
+        assert proc.stdin is not None
+        # A dead process surfaces as EOF on the reading side.
+        with contextlib.suppress(OSError, ValueError):
+            proc.stdin.write(payload)
+            proc.stdin.flush()
+
+    @staticmethod
+    def _read_one(proc: subprocess.Popen[bytes]) -> tuple[str, bytes] | None:
+        assert proc.stdout is not None
+        header = proc.stdout.readline()
+        if not header.endswith(b"\n"):
+            raise _BatchCrashed()
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+        parts = header.split()
+        if len(parts) != 3 or not parts[2].isdigit():
+            raise _BatchCrashed()
+        size = int(parts[2])
+        data = proc.stdout.read(size + 1)  # content + trailing LF
+        if len(data) != size + 1:
+            raise _BatchCrashed()
+        return parts[0].decode("ascii"), data[:-1]
+
+
+class PromptStore:
+    """Reads prompt files from the worktree or from any git ref.
+
+    With ``batch=True`` ref reads and :meth:`resolve_ref` go through one
+    long-lived ``git cat-file --batch`` process instead of a ``git`` fork per
+    call; :meth:`read_many` then fetches many files in a single round-trip.
+    Call :meth:`close` (or use the store as a context manager) to stop it
+    early; otherwise it is reaped when the store is garbage collected.
+    """
+
+    def __init__(self, repo_root: Path, *, batch: bool = False):
         self.repo_root = repo_root.resolve()
+        self._batch = _CatFileBatch(self.repo_root) if batch else None
+
+    def close(self) -> None:
+        if self._batch is not None:
+            self._batch.close()
+
+    def __enter__(self) -> PromptStore:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
 
     def _safe_abspath(self, rel_path: str) -> Path:
         """Resolve ``rel_path`` inside the repo, rejecting traversal outside it."""
@@ -42,12 +217,43 @@ class PromptStore:
         normalized = rel_path.lstrip("/")
         if ref is None:
             return self._safe_abspath(normalized).read_text(encoding="utf-8")
+        if self._batch is not None:
+            return self.read_many([normalized], ref=ref)[0]
         return self._run_git(
             ["show", f"{ref}:{normalized}"],
             on_error=f"Could not read {normalized} at ref {ref}",
         )
 
+    def read_many(self, rel_paths: list[str], ref: str) -> list[str]:
+        """Read several files at ``ref``, in order; pipelined when ``batch=True``."""
+        normalized = [p.lstrip("/") for p in rel_paths]
+        if self._batch is None:
+            return [self.read_text(p, ref=ref) for p in normalized]
+        objects = self._batch.query([f"{ref}:{p}" for p in normalized])
+        texts: list[str] = []
+        for path, obj in zip(normalized, objects, strict=True):
+            if obj is None:
+                raise FileNotFoundError(f"Could not read {path} at ref {ref}")
+            texts.append(_decode(obj[1]))
+        return texts
+
+    def read_blobs(self, oids: list[str]) -> list[str]:
+        """Read blobs by object id, in order; one round-trip when ``batch=True``."""
+        if self._batch is None:
+            return [self._run_git(["cat-file", "blob", oid], on_error=f"Could not read blob {oid}") for oid in oids]
+        texts: list[str] = []
+        for oid, obj in zip(oids, self._batch.query(oids), strict=True):
+            if obj is None:
+                raise FileNotFoundError(f"Could not read blob {oid}")
+            texts.append(_decode(obj[1]))
+        return texts
+
     def resolve_ref(self, ref: str) -> str:
+        if self._batch is not None:
+            obj = self._batch.query([ref])[0]
+            if obj is None:
+                raise ValueError(f"Could not resolve ref {ref}")
+            return obj[0]
         try:
             out = self._run_git(["rev-parse", ref], on_error=f"Could not resolve ref {ref}")
         except FileNotFoundError as e:
@@ -88,3 +88,41 @@ def test_junit_counts_pass_fail_skip(tmp_path: Path) -> None:
     assert cases["bad"].find("failure") is not None
     assert cases["judged"].find("skipped") is not None
     assert cases["ok"].find("failure") is None
+
+
+def test_junit_reports_durations_and_usage(tmp_path: Path) -> None:
+    out = tmp_path / "junit.xml"
+    results = [
+        TestResult("slow", True, duration=1.25, timings={"render": 0.01, "provider": 1.2}, prompt_tokens=10, completion_tokens=5, cost=0.002),
+        TestResult("fast", True, duration=0.5),
+    ]
+    write_junit_xml(suite_name="ivault:demo", results=results, out_path=str(out))
+    suite = ET.parse(out).getroot()
+    assert suite.get("time") == "1.750"
+    slow = suite.findall("testcase")[0]
+    assert slow.get("time") == "1.250"
+    props = {p.get("name"): p.get("value") for p in slow.iter("property")}
+    assert props == {"time.render": "0.010", "time.provider": "1.200", "prompt_tokens": "10", "completion_tokens": "5", "cost_usd": "0.002000"}
+
+
+def test_junit_stream_writer_patches_counts_incrementally(tmp_path: Path) -> None:
+    from instructvault.junit import JUnitStreamWriter
+
+    out = tmp_path / "junit.xml"
+    w = JUnitStreamWriter(out, multi=True)
+    w.begin_suite("ivault:a")
+    w.add(TestResult("ok", True))
+    w.add(TestResult("bad <&>", False, 'said "no"'))
+    w.end_suite()
+    # The finished suite is complete on disk while the run is still going.
+    assert 'tests="2" failures="1"' in out.read_text(encoding="utf-8")
+    w.begin_suite("ivault:b")
+    w.add(TestResult("judged", True, None, skipped=True))
+    w.close()  # also closes the open suite, e.g. after a crash
+
+    root = ET.parse(out).getroot()
+    assert root.tag == "testsuites"
+    assert (root.get("tests"), root.get("failures"), root.get("skipped")) == ("3", "1", "1")
+    a, b = root.findall("testsuite")
+    assert a.get("tests") == "2" and b.get("skipped") == "1"
+    assert a.findall("testcase")[1].get("name") == "bad <&>"
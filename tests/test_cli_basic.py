@@ -163,6 +163,38 @@ def test_bundle_ref_param_with_bundle_path_errors(tmp_path: Path) -> None:
     with pytest.raises(ValueError, match="ref is not supported"):
         vault.render("prompts/hello_world.prompt.yml", vars={"name": "Ava"}, ref="prompts/v1.0.0")
 
+def test_binary_bundle_loads_lazily_and_matches_json(tmp_path: Path) -> None:
+    from instructvault import InstructVault
+    from instructvault.bundle import BinaryBundle
+
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    (tmp_path / "prompts" / "a_first.prompt.yml").write_text(
+        'name: a_first\nmessages:\n  - role: user\n    content: "Hi {{ name }}"\n', encoding="utf-8"
+    )
+    json_bundle = tmp_path / "out" / "ivault.bundle.json"
+    bin_bundle = tmp_path / "out" / "ivault.bundle.bin"
+    res = runner.invoke(app, ["bundle", "--repo", str(tmp_path), "--out", str(json_bundle)])
+    assert res.exit_code == 0
+    res = runner.invoke(app, ["bundle", "--repo", str(tmp_path), "--out", str(bin_bundle), "--format", "binary"])
+    assert res.exit_code == 0
+
+    vault = InstructVault(bundle_path=bin_bundle)
+    assert isinstance(vault.bundle, BinaryBundle)
+    assert vault.bundle.meta["ref"] == "WORKTREE"
+    assert sorted(vault.bundle) == ["prompts/a_first.prompt.yml", "prompts/hello_world.prompt.yml"]
+    assert vault.bundle._specs == {}  # nothing validated until first access
+    prompt_rel = "prompts/hello_world.prompt.yml"
+    expected = InstructVault(bundle_path=json_bundle).render(prompt_rel, vars={"name": "Ava"})
+    assert vault.render(prompt_rel, vars={"name": "Ava"}).to_dict() == expected.to_dict()
+    assert list(vault.bundle._specs) == [prompt_rel]
+    assert vault.load_prompt("prompts/a_first.prompt.yml").tests == []
+    with pytest.raises(FileNotFoundError, match="not found in bundle"):
+        vault.load_prompt("prompts/missing.prompt.yml")
+
+    res = runner.invoke(app, ["bundle", "--repo", str(tmp_path), "--format", "zip"])
+    assert res.exit_code != 0
+
 def test_render_strict_vars_blocks_extra(tmp_path: Path) -> None:
     _git_init(tmp_path)
     runner.invoke(app, ["init", "--repo", str(tmp_path)])
@@ -221,4 +253,197 @@ def test_verify_invalid_lockfile(tmp_path: Path) -> None:
     )
 
     assert res.exit_code != 0
-    assert "Invalid lockfile" in res.output
\ No newline at end of file
+    assert "Invalid lockfile" in res.output
+
+
+def test_eval_dataset_with_concurrency(tmp_path: Path) -> None:
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    dataset = tmp_path / "datasets" / "rows.jsonl"
+    dataset.parent.mkdir(parents=True, exist_ok=True)
+    rows = [{"vars": {"name": f"user{i}"}, "assert": {"contains_any": [f"user{i}"]}} for i in range(12)]
+    dataset.write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+    report = tmp_path / "out" / "report.json"
+    res = runner.invoke(app, [
+        "eval", "prompts/hello_world.prompt.yml", "--repo", str(tmp_path),
+        "--dataset", str(dataset), "--report", str(report), "--concurrency", "4",
+    ])
+    assert res.exit_code == 0
+    names = [r["test"] for r in json.loads(report.read_text())["results"]]
+    assert names == ["includes_name"] + [f"dataset_row_{i}" for i in range(1, 13)]
+
+
+def test_eval_provider_cache_replay(tmp_path: Path) -> None:
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    cache = tmp_path / ".replies"
+    args = ["eval", "prompts/hello_world.prompt.yml", "--repo", str(tmp_path), "--provider", "mock", "--cache-dir", str(cache)]
+    res = runner.invoke(app, [*args, "--cache-mode", "replay"])
+    assert res.exit_code == 1 and "replay" in res.output
+    assert runner.invoke(app, args).exit_code == 0
+    assert list(cache.rglob("*.json"))
+    assert runner.invoke(app, [*args, "--cache-mode", "replay"]).exit_code == 0
+    assert runner.invoke(app, [*args, "--cache-mode", "bogus"]).exit_code != 0
+
+
+def test_eval_incremental_reuses_unchanged_results(tmp_path: Path) -> None:
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    dataset = tmp_path / "datasets" / "rows.jsonl"
+    dataset.parent.mkdir(parents=True, exist_ok=True)
+
+    def write_rows(names: list[str]) -> None:
+        rows = [{"vars": {"name": n}, "assert": {"contains_any": [n]}} for n in names]
+        dataset.write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+
+    manifest = tmp_path / ".ivault" / "eval-manifest.json"
+    report = tmp_path / "out" / "report.json"
+    args = ["eval", "prompts/hello_world.prompt.yml", "--repo", str(tmp_path), "--dataset", str(dataset),
+            "--report", str(report), "--incremental", str(manifest)]
+
+    def reused() -> list[bool]:
+        return [r["reused"] for r in json.loads(report.read_text())["results"]]
+
+    write_rows(["ana", "bo", "cy"])
+    assert runner.invoke(app, args).exit_code == 0
+    assert reused() == [False, False, False, False]
+    assert runner.invoke(app, args).exit_code == 0
+    assert reused() == [True, True, True, True]
+
+    write_rows(["ana", "bob", "cy"])
+    assert runner.invoke(app, args).exit_code == 0
+    assert reused() == [True, True, False, True]
+
+    assert runner.invoke(app, [*args, "--safe"]).exit_code == 0  # flags are part of the key
+    assert reused() == [False, False, False, False]
+
+
+def _write_prompts(repo: Path, names: list[str], failing: set[str]) -> None:
+    for n in names:
+        needle = "nope" if n in failing else "Ava"
+        (repo / "prompts" / f"{n}.prompt.yml").write_text(
+            f'spec_version: "1.0"\nname: {n}\nvariables:\n  required: [name]\n'
+            f'messages:\n  - role: user\n    content: "Hi {{{{ name }}}}"\n'
+            f'tests:\n  - name: t\n    vars: {{ name: "Ava" }}\n    assert: {{ contains_any: ["{needle}"] }}\n',
+            encoding="utf-8",
+        )
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_eval_many_prompts_combined_report(tmp_path: Path, workers: str) -> None:
+    import xml.etree.ElementTree as ET
+
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    _write_prompts(tmp_path, ["alpha", "beta", "gamma"], failing={"beta"})
+    report, junit = tmp_path / "out" / "report.json", tmp_path / "out" / "junit.xml"
+    res = runner.invoke(app, ["eval", "prompts", "--repo", str(tmp_path), "--workers", workers,
+                              "--report", str(report), "--junit", str(junit)])
+    assert res.exit_code == 1
+    data = json.loads(report.read_text())
+    assert [p["path"] for p in data["prompts"]] == [
+        "prompts/alpha.prompt.yml", "prompts/beta.prompt.yml", "prompts/gamma.prompt.yml", "prompts/hello_world.prompt.yml",
+    ]
+    assert [p["pass"] for p in data["prompts"]] == [True, False, True, True] and data["pass"] is False
+    root = ET.parse(junit).getroot()
+    assert root.tag == "testsuites" and root.get("tests") == "4" and root.get("failures") == "1"
+    assert [s.get("name") for s in root] == ["ivault:alpha", "ivault:beta", "ivault:gamma", "ivault:hello_world"]
+
+    res = runner.invoke(app, ["eval", "prompts/[ag]*.prompt.yml", "--repo", str(tmp_path), "--json"])
+    assert res.exit_code == 0
+    assert [p["prompt"] for p in json.loads(res.output)["prompts"]] == ["alpha", "gamma"]
+
+
+def test_eval_many_prompts_at_ref_and_fail_fast(tmp_path: Path) -> None:
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    _write_prompts(tmp_path, ["alpha", "beta"], failing={"alpha"})
+    subprocess.check_call(["git", "-C", str(tmp_path), "add", "prompts"])
+    subprocess.check_call(["git", "-C", str(tmp_path), "commit", "-m", "prompts"])
+    (tmp_path / "prompts" / "alpha.prompt.yml").unlink()
+
+    res = runner.invoke(app, ["eval", "prompts", "--repo", str(tmp_path), "--ref", "HEAD", "--json"])
+    assert [p["prompt"] for p in json.loads(res.output)["prompts"]] == ["alpha", "beta", "hello_world"]
+    res = runner.invoke(app, ["eval", "prompts/*.prompt.yml", "--repo", str(tmp_path), "--ref", "HEAD", "--fail-fast", "--json"])
+    assert res.exit_code == 1 and [p["prompt"] for p in json.loads(res.output)["prompts"]] == ["alpha"]
+    res = runner.invoke(app, ["eval", "prompts", "--repo", str(tmp_path), "--dataset", "x.jsonl"])
+    assert res.exit_code != 0
+
+
+def test_eval_many_prompts_at_ref_share_one_batch_reader(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from instructvault import store
+
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    _write_prompts(tmp_path, ["alpha", "beta"], failing=set())
+    subprocess.check_call(["git", "-C", str(tmp_path), "add", "prompts"])
+    subprocess.check_call(["git", "-C", str(tmp_path), "commit", "-m", "prompts"])
+    shows: list[list[str]] = []
+    starts: list[object] = []
+    run_git, ensure_started = store.PromptStore._run_git, store._CatFileBatch._ensure_started
+
+    def _run_git(self: store.PromptStore, args: list[str], *, on_error: str) -> str:
+        if args[0] == "show":
+            shows.append(args)
+        return run_git(self, args, on_error=on_error)
+
+    def _ensure_started(self: store._CatFileBatch) -> object:
+        if self._proc is None:
+            starts.append(self)
+        return ensure_started(self)
+
+    monkeypatch.setattr(store.PromptStore, "_run_git", _run_git)
+    monkeypatch.setattr(store._CatFileBatch, "_ensure_started", _ensure_started)
+    res = runner.invoke(app, ["eval", "prompts", "--repo", str(tmp_path), "--ref", "HEAD", "--json"])
+    assert res.exit_code == 0, res.output
+    assert [p["prompt"] for p in json.loads(res.output)["prompts"]] == ["alpha", "beta", "hello_world"]
+    assert shows == [] and len(starts) == 1
+
+
+def test_eval_streams_jsonl_report(tmp_path: Path) -> None:
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    _write_prompts(tmp_path, ["alpha", "beta"], failing={"beta"})
+    stream = tmp_path / "out" / "results.jsonl"
+    res = runner.invoke(app, ["eval", "prompts", "--repo", str(tmp_path), "--report-jsonl", str(stream)])
+    assert res.exit_code == 1
+    lines = [json.loads(line) for line in stream.read_text().splitlines()]
+    assert [(r["prompt"], r["test"], r["pass"]) for r in lines] == [
+        ("alpha", "t", True), ("beta", "t", False), ("hello_world", "includes_name", True),
+    ]
+    assert "PASS" in res.output and "2/3 prompts passed" in res.output
+
+
+def test_parse_cache_is_shared_between_commands(tmp_path: Path) -> None:
+    from instructvault.io import active_parse_cache, clear_parse_cache, parse_cache_info
+
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    _write_prompts(tmp_path, ["alpha", "beta"], failing=set())
+    cache_dir = tmp_path / ".ivault-cache"
+    res = runner.invoke(app, ["--parse-cache", str(cache_dir), "validate", "prompts", "--repo", str(tmp_path)])
+    assert res.exit_code == 0
+    assert len(list(cache_dir.glob("specs/*/*/*.json"))) == 3
+    assert active_parse_cache() is None  # uninstalled when the command ends
+
+    clear_parse_cache()
+    for args in (["lint", "prompts", "--repo", str(tmp_path)],
+                 ["bundle", "--repo", str(tmp_path), "--out", str(tmp_path / "b.json")],
+                 ["eval", "prompts", "--repo", str(tmp_path)]):
+        res = runner.invoke(app, args, env={"IVAULT_PARSE_CACHE": str(cache_dir)})
+        assert res.exit_code == 0, res.output
+    assert parse_cache_info().misses == 0  # no prompt YAML was parsed again
+
+
+def test_validate_policy_parses_each_file_once(tmp_path: Path) -> None:
+    from instructvault.io import clear_parse_cache, parse_cache_info
+
+    _git_init(tmp_path)
+    runner.invoke(app, ["init", "--repo", str(tmp_path)])
+    _write_prompts(tmp_path, ["alpha", "beta"], failing=set())
+    policy = tmp_path / "policy.py"
+    policy.write_text("def check_spec(spec):\n    return ['blocked'] if spec['name'] == 'beta' else []\n")
+    clear_parse_cache()
+    res = runner.invoke(app, ["validate", "prompts", "--repo", str(tmp_path), "--policy", str(policy)])
+    assert res.exit_code == 1 and res.output.count("FAIL") == 1 and res.output.count("OK") == 2
+    assert (parse_cache_info().hits, parse_cache_info().misses) == (0, 3)
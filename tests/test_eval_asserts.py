@@ -64,6 +64,42 @@ def test_ollama_provider_maps_params(monkeypatch) -> None:
         model="llama3.2", messages=[{"role": "user", "content": "hi"}], options={"num_predict": 50, "temperature": 0.2}
     )
 
+def test_pooled_provider_reuses_one_client(monkeypatch) -> None:
+    import sys
+    import types
+    from concurrent.futures import ThreadPoolExecutor
+    from unittest.mock import MagicMock
+
+    from instructvault.providers import ClientOptions
+
+    fake_client = MagicMock()
+    fake_client.chat.return_value.message.content = "ok"
+    fake_module = types.ModuleType("ollama")
+    fake_module.Client = MagicMock(return_value=fake_client)  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "ollama", fake_module)
+
+    provider = get_provider("ollama", ClientOptions(timeout=5, max_connections=4))
+    assert provider is not None
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        replies = list(pool.map(lambda _: provider([{"role": "user", "content": "hi"}], {}), range(32)))
+
+    assert replies == ["ok"] * 32
+    assert fake_module.Client.call_count == 1  # type: ignore[attr-defined]
+    kwargs = fake_module.Client.call_args.kwargs  # type: ignore[attr-defined]
+    assert kwargs["timeout"] == 5 and kwargs["limits"].max_connections == 4
+    assert get_provider("ollama") is not provider  # each run gets its own pool
+
+    import pytest
+
+    from instructvault.providers import _PooledProvider
+
+    class Incomplete(_PooledProvider):
+        pass
+
+    with pytest.raises(TypeError, match="_make_client"):
+        Incomplete()  # type: ignore[abstract]
+
+
 def test_ollama_provider_live() -> None:
     """Opportunistic smoke test against a real local Ollama server; skips if none is reachable."""
     import pytest
@@ -76,3 +112,392 @@ def test_ollama_provider_live() -> None:
         pytest.skip(f"local Ollama server not available: {exc}")
 
     assert isinstance(result, str) and result.strip() != ""
+
+def _rows(n: int, failing: set[int] | None = None) -> list:
+    from instructvault.spec import DatasetRow
+
+    failing = failing or set()
+    return [
+        DatasetRow.model_validate({"vars": {}, "assert": {"contains_all": ["nope" if i in failing else "hello"]}})
+        for i in range(1, n + 1)
+    ]
+
+def test_concurrent_dataset_keeps_order_and_overlaps_calls() -> None:
+    import threading
+    import time
+
+    from instructvault.eval import run_dataset
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow(messages, params):  # type: ignore[no-untyped-def]
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return messages[-1]["content"]
+
+    spec = _spec_with_assert({"contains_any": ["hello"]})
+    ok, results = run_dataset(spec, _rows(40, failing={7}), provider=slow, concurrency=8)
+    assert ok is False
+    assert [r.name for r in results] == [f"dataset_row_{i}" for i in range(1, 41)]
+    assert [r.passed for r in results].count(False) == 1 and results[6].passed is False
+    assert peak[0] > 1
+
+def test_fail_fast_stops_scheduling() -> None:
+    from instructvault.eval import run_dataset
+
+    spec = _spec_with_assert({"contains_any": ["hello"]})
+    ok, results = run_dataset(spec, _rows(10, failing={3}), fail_fast=True)
+    assert ok is False
+    assert [r.name for r in results] == ["dataset_row_1", "dataset_row_2", "dataset_row_3"]
+
+    ok, results = run_dataset(spec, _rows(500, failing={1}), concurrency=4, fail_fast=True)
+    assert ok is False and results[0].passed is False
+    assert len(results) < 500
+
+def test_concurrency_must_be_positive() -> None:
+    import pytest
+
+    from instructvault.eval import run_dataset
+
+    with pytest.raises(ValueError, match="concurrency"):
+        run_dataset(_spec_with_assert({"contains_any": ["hello"]}), _rows(1), concurrency=0)
+
+def test_cached_provider_record_replay_refresh(tmp_path) -> None:
+    import pytest
+
+    from instructvault.providers import cached_provider, response_cache_key
+
+    calls: list[str] = []
+
+    def counting(messages, params):  # type: ignore[no-untyped-def]
+        calls.append(messages[-1]["content"])
+        return f"reply {len(calls)}"
+
+    msgs = [{"role": "user", "content": "hi"}]
+    rec = cached_provider(counting, tmp_path, namespace="mock")
+    assert rec(msgs, {"temperature": 0}) == "reply 1"
+    assert rec(msgs, {"temperature": 0}) == "reply 1"
+    assert rec(msgs, {"temperature": 1}) == "reply 2"  # params are part of the key
+    assert len(calls) == 2
+
+    replay = cached_provider(counting, tmp_path, namespace="mock", mode="replay")
+    assert replay(msgs, {"temperature": 0}) == "reply 1"
+    with pytest.raises(LookupError, match="replay"):
+        replay([{"role": "user", "content": "new"}], {})
+    with pytest.raises(LookupError):
+        cached_provider(counting, tmp_path, namespace="other", mode="replay")(msgs, {"temperature": 0})
+
+    refresh = cached_provider(counting, tmp_path, namespace="mock", mode="refresh")
+    assert refresh(msgs, {"temperature": 0}) == "reply 3"
+    assert rec(msgs, {"temperature": 0}) == "reply 3"
+    assert len(calls) == 3
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    key = response_cache_key("mock", msgs, {"temperature": 0})
+    entry = tmp_path / key[:2] / f"{key}.json"
+    entry.write_text('{"reply": "trunc', encoding="utf-8")
+    with pytest.raises(LookupError, match="Damaged"):
+        cached_provider(counting, tmp_path, namespace="mock", mode="replay")(msgs, {"temperature": 0})
+    assert rec(msgs, {"temperature": 0}) == "reply 4"  # damage is a miss; the entry is rewritten
+    assert rec(msgs, {"temperature": 0}) == "reply 4"
+
+    with pytest.raises(ValueError, match="cache mode"):
+        cached_provider(counting, tmp_path, namespace="mock", mode="nope")
+
+def test_async_dataset_keeps_hundreds_in_flight() -> None:
+    import asyncio
+
+    from instructvault.eval import run_dataset_async
+
+    active, peak = [0], [0]
+
+    async def slow(messages, params):  # type: ignore[no-untyped-def]
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return messages[-1]["content"]
+
+    spec = _spec_with_assert({"contains_any": ["hello"]})
+    ok, results = asyncio.run(run_dataset_async(spec, _rows(400, failing={7}), provider=slow, concurrency=200))
+    assert ok is False
+    assert [r.name for r in results] == [f"dataset_row_{i}" for i in range(1, 401)]
+    assert [r.passed for r in results].count(False) == 1 and results[6].passed is False
+    assert peak[0] == 200
+
+    ok, results = asyncio.run(run_dataset_async(spec, _rows(10, failing={3}), provider=slow, fail_fast=True))
+    assert [r.name for r in results] == ["dataset_row_1", "dataset_row_2", "dataset_row_3"]
+
+def test_async_inline_tests_with_sync_adapter_and_async_judge() -> None:
+    import asyncio
+
+    from instructvault.eval import run_inline_tests_async
+    from instructvault.providers import get_async_provider, to_async
+
+    spec = _spec_with_assert({"contains_any": ["hello"], "judge": {"rubric": "r", "threshold": 0.5}})
+
+    async def judge(messages, params):  # type: ignore[no-untyped-def]
+        return "0.9"
+
+    mock = get_provider("mock")
+    assert mock is not None
+    ok, results = asyncio.run(run_inline_tests_async(spec, provider=to_async(mock), judge_provider=judge))
+    assert ok and results[0].passed and not results[0].skipped
+
+    judge_only = _spec_with_assert({"judge": {"rubric": "r"}})
+    ok, results = asyncio.run(run_inline_tests_async(judge_only, provider=get_async_provider("mock")))
+    assert ok and results[0].skipped  # judge asserts skip without a judge provider
+
+class _Throttled(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: str | None = None) -> None:
+        super().__init__("rate limited")
+        self.response = type("R", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+def test_rate_limited_retries_429_and_adapts_concurrency() -> None:
+    import pytest
+
+    from instructvault.ratelimit import RateLimit, RateLimiter, rate_limited
+
+    calls = [0]
+
+    def flaky(messages, params):  # type: ignore[no-untyped-def]
+        calls[0] += 1
+        if calls[0] <= 2:
+            raise _Throttled("0" if calls[0] == 1 else None)
+        return "ok"
+
+    limiter = RateLimiter(RateLimit(max_concurrency=8, base_delay=0.001, max_delay=0.01))
+    assert rate_limited(flaky, limiter)([{"role": "user", "content": "hi"}], {}) == "ok"
+    assert calls[0] == 3 and limiter.throttles == 2
+    assert limiter.concurrency_cap == 2  # halved twice from 8
+
+    def always(messages, params):  # type: ignore[no-untyped-def]
+        raise _Throttled()
+
+    with pytest.raises(_Throttled):
+        rate_limited(always, RateLimiter(RateLimit(max_retries=1, base_delay=0.001)))([], {})
+
+    def broken(messages, params):  # type: ignore[no-untyped-def]
+        calls[0] += 1
+        raise RuntimeError("boom")
+
+    calls[0] = 0
+    with pytest.raises(RuntimeError):
+        rate_limited(broken, limiter)([], {})
+    assert calls[0] == 1  # only throttles are retried
+
+def test_rate_limiter_buckets_and_retry_after() -> None:
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from email.utils import format_datetime
+
+    from instructvault.ratelimit import RateLimit, RateLimiter, rate_limited_async, retry_after
+
+    now = [0.0]
+    limiter = RateLimiter(RateLimit(requests_per_minute=60, tokens_per_minute=600), clock=lambda: now[0])
+    assert all(limiter.reserve(1) == 0 for _ in range(60))
+    assert limiter.reserve(1) == 1.0  # 61st request waits for one refill
+    now[0] = 100.0
+    assert limiter.reserve(600) == 0 and limiter.reserve(300) == 30.0
+
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < (retry_after(_Throttled(later)) or 0) <= 30
+    assert retry_after(_Throttled("2.5")) == 2.5 and retry_after(_Throttled()) is None
+
+    attempts = [0]
+
+    async def flaky(messages, params):  # type: ignore[no-untyped-def]
+        attempts[0] += 1
+        if attempts[0] == 1:
+            raise _Throttled("0")
+        return "ok"
+
+    wrapped = rate_limited_async(flaky, RateLimiter(RateLimit(base_delay=0.001)))
+    assert asyncio.run(wrapped([], {})) == "ok" and attempts[0] == 2
+
+def test_async_rate_limit_parks_waiters_instead_of_polling() -> None:
+    import asyncio
+
+    from instructvault.ratelimit import RateLimit, RateLimiter, rate_limited_async
+
+    limiter = RateLimiter(RateLimit(max_concurrency=4))
+    live = [0, 0]
+
+    async def main() -> list[str]:
+        release = asyncio.Event()
+
+        async def slow(messages, params):  # type: ignore[no-untyped-def]
+            live[0] += 1
+            live[1] = max(live[1], live[0])
+            await release.wait()
+            live[0] -= 1
+            return "ok"
+
+        wrapped = rate_limited_async(slow, limiter)
+        tasks = [asyncio.create_task(wrapped([], {})) for _ in range(200)]
+        await asyncio.sleep(0.05)
+        assert live[0] == 4 and len(limiter._async_waiters) == 196  # parked, not spinning
+        tasks[-1].cancel()
+        release.set()
+        done = await asyncio.gather(*tasks, return_exceptions=True)
+        return [r for r in done if isinstance(r, str)]
+
+    assert len(asyncio.run(main())) == 199
+    assert live[1] == 4 and not limiter._async_waiters
+
+def test_manifest_reuses_passes_and_reruns_failures(tmp_path) -> None:
+    import json
+
+    from instructvault.eval import run_dataset
+    from instructvault.manifest import EvalManifest
+    from instructvault.spec import DatasetRow
+
+    spec = _spec_with_assert({"contains_any": ["hello"]})
+    calls = [0]
+
+    def counting(messages, params):  # type: ignore[no-untyped-def]
+        calls[0] += 1
+        return messages[-1]["content"]
+
+    path = tmp_path / "manifest.json"
+    manifest = EvalManifest(path, context={"provider": "counting"})
+    ok, first = run_dataset(spec, _rows(5, failing={2}), provider=counting, manifest=manifest)
+    assert ok is False
+    manifest.save()
+    assert calls[0] == 5 and not any(r.reused for r in first)
+
+    _, second = run_dataset(spec, _rows(5, failing={2}), provider=counting, manifest=EvalManifest(path, context={"provider": "counting"}))
+    assert calls[0] == 6  # only the failing row ran again
+    assert [r.reused for r in second] == [True, False, True, True, True]
+    assert [r.passed for r in second] == [r.passed for r in first]
+
+    new = DatasetRow.model_validate({"vars": {"x": 1}, "assert": {"contains_all": ["hello"]}})
+    _, shifted = run_dataset(spec, [new, *_rows(5, failing={2})], provider=counting, manifest=EvalManifest(path, context={"provider": "counting"}))
+    assert calls[0] == 8  # only the inserted row and the failing row ran
+    assert [r.reused for r in shifted] == [False, True, False, True, True, True]
+    assert [r.name for r in shifted] == [f"dataset_row_{i}" for i in range(1, 7)]  # current positions
+
+    run_dataset(spec, _rows(5), provider=counting, manifest=EvalManifest(path, context={"provider": "other"}))
+    assert calls[0] == 13  # a different context invalidates everything
+
+    # Saving keeps only the keys an evaluated prompt used; other prompts' entries stay.
+    other = spec.model_copy(update={"name": "other"})
+    keep = EvalManifest(path, context={"provider": "counting"})
+    run_dataset(other, _rows(2), provider=counting, manifest=keep)
+    keep.save()
+    edited = EvalManifest(path, context={"provider": "counting"})
+    run_dataset(_spec_with_assert({"contains_any": ["hello", "123"]}), _rows(3), provider=counting, manifest=edited)
+    edited.save()
+    entries = json.loads(path.read_text(encoding="utf-8"))["entries"].values()
+    assert sorted(e["prompt"] for e in entries) == ["other", "other", "t", "t", "t"]
+
+def test_iter_dataset_jsonl_streams_and_reports_line_numbers(tmp_path) -> None:
+    import io
+    import json
+
+    import pytest
+
+    from instructvault.eval import run_dataset
+    from instructvault.io import iter_dataset_jsonl
+
+    path = tmp_path / "rows.jsonl"
+    path.write_text("\n".join(json.dumps({"vars": {}, "assert": {"contains_any": ["hello"]}}) for _ in range(3)) + "\n\n", encoding="utf-8")
+    assert len(list(iter_dataset_jsonl(path))) == 3
+
+    ok, results = run_dataset(_spec_with_assert({"contains_any": ["hello"]}), iter_dataset_jsonl(str(path)))
+    assert ok and len(results) == 3
+
+    bad = io.StringIO('{"vars": {}, "assert": {"contains_any": ["x"]}}\n{"vars": 5, "assert": {}}\n{not json\n')
+    rows = iter_dataset_jsonl(bad)
+    assert next(rows).vars == {}  # first row yields before later lines are read
+    with pytest.raises(ValueError, match="line 2"):
+        next(rows)
+    with pytest.raises(ValueError, match="Invalid JSON on line 3"):
+        list(iter_dataset_jsonl(io.StringIO('\n\n{not json\n')))
+
+def test_results_carry_step_timings_tokens_and_cost(tmp_path) -> None:
+    from instructvault.eval import run_dataset
+    from instructvault.providers import (
+        ModelPrice,
+        Reply,
+        TokenUsage,
+        cached_provider,
+        parse_price,
+        priced_provider,
+    )
+    from instructvault.sinks import ConsoleSink, ResultStats, result_stats
+    from instructvault.spec import DatasetRow
+
+    def metered(messages, params):  # type: ignore[no-untyped-def]
+        return Reply(messages[-1]["content"], usage=TokenUsage(100, 20), model="gpt-x-2024-01-01")
+
+    def judge(messages, params):  # type: ignore[no-untyped-def]
+        return Reply("0.9", usage=TokenUsage(50, 1), model="gpt-x")
+
+    prices = dict([parse_price("gpt-x=1.0,4.0")])
+    assert prices == {"gpt-x": ModelPrice(1.0, 4.0)}
+    block = {"contains_any": ["hello"], "judge": {"rubric": "friendly?", "threshold": 0.5}}
+    rows = [DatasetRow.model_validate({"vars": {}, "assert": block}) for _ in range(4)]
+    ok, results = run_dataset(_spec_with_assert(block), rows, provider=priced_provider(metered, prices), judge_provider=priced_provider(judge, prices))
+    assert ok
+    r = results[0]
+    assert set(r.timings) == {"render", "provider", "assert", "judge"}
+    assert r.duration >= sum(r.timings.values()) > 0
+    assert (r.prompt_tokens, r.completion_tokens) == (150, 21)
+    assert r.cost is not None and abs(r.cost - (150 * 1.0 + 21 * 4.0) / 1e6) < 1e-12  # dated snapshot matched by prefix
+
+    stats = result_stats(ResultStats(results))
+    assert stats["measured"] == 4 and stats["prompt_tokens"] == 600
+    assert stats["duration"]["p50"] <= stats["duration"]["p95"] <= stats["duration"]["max"]
+    assert set(stats["steps"]) == {"assert", "judge", "provider", "render"}
+
+    # Usage survives the response cache, so replayed runs still report tokens and cost.
+    cached = cached_provider(metered, tmp_path, namespace="m")
+    cached([{"role": "user", "content": "hi"}], {})
+    replayed = priced_provider(cached_provider(metered, tmp_path, namespace="m", mode="replay"), prices)([{"role": "user", "content": "hi"}], {})
+    assert isinstance(replayed, Reply) and replayed.usage == TokenUsage(100, 20) and replayed.cost is not None
+
+    _, plain = run_inline_tests(_spec_with_assert({"contains_any": ["hello"]}))
+    assert "provider" not in plain[0].timings and plain[0].prompt_tokens is None and plain[0].cost is None
+
+    # The console sink aggregates only model-backed results, as floats and running totals.
+    sink = ConsoleSink(multi=False)
+    sink.begin_prompt("p.prompt.yml", "p")
+    for res in [*plain, *results]:
+        sink.add(res)
+    assert sink._stats.measured == 4 and len(sink._stats.durations) == 4 and sink._stats.prompt_tokens == 600
+    sink.end_prompt()
+
+def test_assert_plans_are_shared_and_match_like_the_spec() -> None:
+    import random
+
+    from instructvault.asserts import AUTOMATON_MIN_NEEDLES, compile_assert
+    from instructvault.spec import AssertSpec
+
+    block = {"contains_any": ["HELLO"], "matches": [r"\d+"], "json_schema": {"type": "object"}}
+    a, b = AssertSpec.model_validate(block), AssertSpec.model_validate(dict(block))
+    assert compile_assert(a) is compile_assert(b)  # equal asserts share one compiled plan
+    assert compile_assert(a).match('{"hello": 1}') and not compile_assert(a).match("hello 1")
+
+    # Large needle sets go through the automaton; verdicts must equal plain substring checks.
+    rng = random.Random(7)
+    needles = sorted({"".join(rng.choices("abc", k=rng.randint(1, 6))) for _ in range(400)})
+    assert len(needles) >= AUTOMATON_MIN_NEEDLES
+    for _ in range(200):
+        text = "".join(rng.choices("abcX", k=rng.randint(0, 30)))
+        subset = rng.sample(needles, 3)
+        big_any = compile_assert(AssertSpec.model_validate({"contains_any": [n.upper() for n in needles[:AUTOMATON_MIN_NEEDLES]] + subset}))
+        big_all = compile_assert(AssertSpec.model_validate({"contains_all": needles}))
+        big_none = compile_assert(AssertSpec.model_validate({"not_contains": needles}))
+        expected_any = any(n in text.lower() for n in needles[:AUTOMATON_MIN_NEEDLES] + subset)
+        assert big_any.match(text) is expected_any
+        assert big_all.match(text) is all(n in text.lower() for n in needles)
+        assert big_none.match(text) is not any(n in text.lower() for n in needles)
+    assert big_all.match("|".join(needles).upper())
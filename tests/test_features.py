@@ -93,6 +93,133 @@ def test_verify_ignores_comment_only_change(tmp_path: Path) -> None:
     assert ok
 
 
+def test_hash_cache_lock_builds_are_incremental_and_identical(tmp_path: Path) -> None:
+    import os
+    import subprocess
+    import time
+
+    from instructvault.lock import LockHashCache, dumps_lock
+
+    prompts = _write_prompts(tmp_path)
+    (prompts / "crlf.prompt.yml").write_bytes(_YAML.replace("greet", "crlf").replace("\n", "\r\n").encode())
+    (prompts / "copy.prompt.json").write_text(_JSON_EQUIVALENT, encoding="utf-8")
+    old = time.time() - 60  # older than the racy-stat window
+
+    def age() -> None:
+        for p in prompts.iterdir():
+            os.utime(p, (old, old))
+
+    age()
+    cache_path = tmp_path / ".ivault-cache" / "lock-hashes.json"
+    expected = dumps_lock(build_lock(tmp_path, prompts, ref=None))
+    cache = LockHashCache(cache_path)
+    assert dumps_lock(build_lock(tmp_path, prompts, ref=None, cache=cache)) == expected
+    assert cache.misses == 3
+
+    warm = LockHashCache(cache_path)
+    assert dumps_lock(build_lock(tmp_path, prompts, ref=None, cache=warm)) == expected
+    assert (warm.hits, warm.misses) == (3, 0)
+
+    (prompts / "greet.prompt.yml").write_text(_YAML.replace("You are helpful.", "You are brief."), encoding="utf-8")
+    age()
+    edited = LockHashCache(cache_path)
+    lock = build_lock(tmp_path, prompts, ref=None, cache=edited)
+    assert edited.misses == 1 and dumps_lock(lock) == dumps_lock(build_lock(tmp_path, prompts, ref=None))
+
+    git = ["git", "-C", str(tmp_path), "-c", "user.email=t@example.com", "-c", "user.name=T"]
+    subprocess.check_call([*git, "init", "-q"])
+    subprocess.check_call([*git, "add", "prompts"])
+    subprocess.check_call([*git, "commit", "-q", "-m", "prompts"])
+    at_ref = LockHashCache(cache_path)
+    assert dumps_lock(build_lock(tmp_path, prompts, ref="HEAD", cache=at_ref)) == dumps_lock(build_lock(tmp_path, prompts, ref="HEAD"))
+    assert at_ref.misses == 0  # committed blobs have the OIDs already cached from the worktree
+    ok, _ = verify_lock(json.loads(dumps_lock(lock)), repo_root=tmp_path, prompts_dir=prompts, ref="HEAD", cache=at_ref)
+    assert ok
+
+
+@pytest.mark.parametrize("content", ["[]", "null", '"x"', "{trunc"])
+def test_lock_hash_cache_ignores_malformed_file(tmp_path: Path, content: str) -> None:
+    from instructvault.lock import LockHashCache, dumps_lock
+
+    prompts = _write_prompts(tmp_path)
+    cache_path = tmp_path / "lock-hashes.json"
+    cache_path.write_text(content, encoding="utf-8")
+    cache = LockHashCache(cache_path)
+    assert dumps_lock(build_lock(tmp_path, prompts, ref=None, cache=cache)) == dumps_lock(build_lock(tmp_path, prompts, ref=None))
+    assert cache.hits == 0
+
+
+def test_verify_against_ref_uses_recorded_tree_diff(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import subprocess
+
+    import instructvault.lock as lockmod
+
+    prompts = _write_prompts(tmp_path)
+    for name in ("a", "b", "c"):
+        (prompts / f"{name}.prompt.yml").write_text(_YAML.replace("greet", name), encoding="utf-8")
+    git = ["git", "-C", str(tmp_path), "-c", "user.email=t@example.com", "-c", "user.name=T"]
+    subprocess.check_call([*git, "init", "-q"])
+    subprocess.check_call([*git, "add", "-A"])
+    subprocess.check_call([*git, "commit", "-q", "-m", "v1"])
+    lock = build_lock(tmp_path, prompts, ref="HEAD", record_tree=True)
+    assert lock["prompts_tree"]["path"] == "prompts" and lock["prompts_tree"]["oid"]
+    plain = build_lock(tmp_path, prompts, ref="HEAD")
+
+    (prompts / "a.prompt.yml").write_text(_YAML.replace("greet", "a").replace("helpful", "terse"), encoding="utf-8")
+    (prompts / "b.prompt.yml").write_text(_YAML.replace("greet", "b") + "# comment only\n", encoding="utf-8")
+    (prompts / "c.prompt.yml").unlink()
+    (prompts / "d.prompt.yml").write_text(_YAML.replace("greet", "d"), encoding="utf-8")
+    (prompts / "README.md").write_text("not a prompt", encoding="utf-8")
+    subprocess.check_call([*git, "add", "-A"])
+    subprocess.check_call([*git, "commit", "-q", "-m", "v2"])
+
+    full = verify_lock(plain, repo_root=tmp_path, prompts_dir=prompts, ref="HEAD")
+    assert full == (False, ["added: prompts/d.prompt.yml", "removed: prompts/c.prompt.yml", "changed: prompts/a.prompt.yml"])
+
+    # The tree OID only vouches for the entries it was recorded with.
+    tampered = json.loads(json.dumps(lock))
+    tampered["prompts"][1]["spec_sha256"] = "sha256:" + "0" * 64
+    assert verify_lock(tampered, repo_root=tmp_path, prompts_dir=prompts, ref="HEAD~1") == (False, ["changed: prompts/b.prompt.yml"])
+    stale_model = json.loads(json.dumps(tampered))
+    stale_model["prompts_tree"]["prompts_sha256"] = lockmod._prompts_digest(stale_model["prompts"])
+    stale_model["prompts_tree"]["model"] = "older-model"
+    assert verify_lock(stale_model, repo_root=tmp_path, prompts_dir=prompts, ref="HEAD~1")[0] is False
+
+    def no_full_build(*args: object, **kwargs: object) -> None:
+        raise AssertionError("fast path rebuilt the whole lock")
+
+    monkeypatch.setattr(lockmod, "collect_prompts", no_full_build)
+    assert verify_lock(lock, repo_root=tmp_path, prompts_dir=prompts, ref="HEAD") == full
+    assert verify_lock(lock, repo_root=tmp_path, prompts_dir=prompts, ref="HEAD~1") == (True, [])  # same tree: no reads at all
+
+
+def test_bundles_carry_verifiable_integrity_markers(tmp_path: Path) -> None:
+    from instructvault.bundle import load_bundle, write_bundle
+
+    prompts = _write_prompts(tmp_path)
+    spec = load_prompt_spec(_YAML)
+    json_out, bin_out = tmp_path / "b.json", tmp_path / "b.bin"
+    write_bundle(json_out, repo_root=tmp_path, prompts_dir=prompts, ref=None)
+    write_bundle(bin_out, repo_root=tmp_path, prompts_dir=prompts, ref=None, fmt="binary")
+    payload = json.loads(json_out.read_text())
+    assert payload["prompts"][0]["spec_sha256"] == canonical_spec_hash(spec)
+    for out in (json_out, bin_out):
+        loaded = load_bundle(out, verify=True)
+        assert canonical_spec_hash(loaded["prompts/greet.prompt.yml"]) == canonical_spec_hash(spec)
+
+    payload["prompts"][0]["spec"]["messages"][0]["content"] = "You are rude."
+    json_out.write_text(json.dumps(payload), encoding="utf-8")
+    assert load_bundle(json_out)["prompts/greet.prompt.yml"].messages[0].content == "You are rude."
+    with pytest.raises(ValueError, match="integrity check failed"):
+        InstructVault(bundle_path=json_out, verify_bundle=True)
+
+    del payload["prompts"][0]["spec_sha256"]  # bundles built before markers existed
+    json_out.write_text(json.dumps(payload), encoding="utf-8")
+    assert "prompts/greet.prompt.yml" in load_bundle(json_out)
+    with pytest.raises(ValueError, match="no spec_sha256 marker"):
+        load_bundle(json_out, verify=True)
+
+
 # ----------------------------- runtime cache -------------------------------
 
 def test_worktree_cache_invalidates_on_mtime(tmp_path: Path) -> None:
@@ -127,6 +254,252 @@ def test_clear_cache(tmp_path: Path) -> None:
     assert a is not b
 
 
+def _write_many_prompts(repo: Path, n: int) -> list[str]:
+    prompts = _write_prompts(repo)
+    paths = ["prompts/greet.prompt.yml"]
+    for i in range(1, n):
+        (prompts / f"p{i}.prompt.yml").write_text(_YAML.replace("name: greet", f"name: p{i}"), encoding="utf-8")
+        paths.append(f"prompts/p{i}.prompt.yml")
+    return paths
+
+
+def test_cache_info_counts_hits_and_misses(tmp_path: Path) -> None:
+    _write_prompts(tmp_path)
+    vault = InstructVault(repo_root=tmp_path)
+    vault.load_prompt("prompts/greet.prompt.yml")
+    vault.load_prompt("prompts/greet.prompt.yml")
+    info = vault.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    assert info.currbytes == len(_YAML.encode("utf-8"))
+    vault.clear_cache()
+    assert vault.cache_info().currsize == 0
+    assert InstructVault(repo_root=tmp_path, cache=False).cache_info().maxsize == 0
+
+
+def test_cache_policy_bounds_entries_lru(tmp_path: Path) -> None:
+    from instructvault import CachePolicy
+
+    a, b, c = _write_many_prompts(tmp_path, 3)
+    vault = InstructVault(repo_root=tmp_path, cache=CachePolicy(max_entries=2))
+    first_a = vault.load_prompt(a)
+    vault.load_prompt(b)
+    assert vault.load_prompt(a) is first_a  # refresh "a"; "b" is now least recent
+    vault.load_prompt(c)
+    info = vault.cache_info()
+    assert (info.currsize, info.evictions) == (2, 1)
+    assert vault.load_prompt(a) is first_a
+    assert vault.cache_info().misses == 3  # a, b, c loaded once each
+
+
+def test_cache_policy_byte_budget(tmp_path: Path) -> None:
+    from instructvault import CachePolicy
+
+    paths = _write_many_prompts(tmp_path, 4)
+    size = len(_YAML.encode("utf-8"))
+    vault = InstructVault(repo_root=tmp_path, cache=CachePolicy(max_entries=None, max_bytes=2 * size + 10))
+    for p in paths:
+        vault.load_prompt(p)
+    info = vault.cache_info()
+    assert info.currsize == 2 and info.currbytes <= 2 * size + 10
+    tiny = InstructVault(repo_root=tmp_path, cache=CachePolicy(max_bytes=10))
+    tiny.load_prompt(paths[0])
+    assert tiny.cache_info().currsize == 0  # larger than the whole budget: not cached
+
+
+def test_cache_policy_worktree_ttl(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import instructvault.cache as cache_mod
+    from instructvault import CachePolicy
+
+    _write_prompts(tmp_path)
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    vault = InstructVault(repo_root=tmp_path, cache=CachePolicy(worktree_ttl=5))
+    first = vault.load_prompt("prompts/greet.prompt.yml")
+    now[0] += 4
+    assert vault.load_prompt("prompts/greet.prompt.yml") is first
+    now[0] += 2
+    assert vault.load_prompt("prompts/greet.prompt.yml") is not first
+
+
+def test_cache_policy_rejects_bad_bounds() -> None:
+    from instructvault import CachePolicy
+
+    with pytest.raises(ValueError, match="max_entries"):
+        CachePolicy(max_entries=0)
+
+
+def test_concurrent_misses_share_one_load(tmp_path: Path) -> None:
+    import threading
+    import time
+
+    _write_prompts(tmp_path)
+    vault = InstructVault(repo_root=tmp_path)
+    real_load = vault._load_uncached
+    calls: list[str] = []
+
+    def slow_load(prompt_path: str, ref: str | None):  # type: ignore[no-untyped-def]
+        calls.append(prompt_path)
+        time.sleep(0.2)
+        return real_load(prompt_path, ref)
+
+    vault._load_uncached = slow_load  # type: ignore[method-assign]
+    barrier = threading.Barrier(16)
+    results: list[object] = []
+
+    def worker() -> None:
+        barrier.wait()
+        results.append(vault.load_prompt("prompts/greet.prompt.yml"))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len(results) == 16 and all(r is results[0] for r in results)
+
+
+def test_single_flight_propagates_errors_without_caching() -> None:
+    import threading
+    import time
+
+    from instructvault.cache import SingleFlight
+
+    flight: SingleFlight[str, int] = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors: list[BaseException] = []
+
+    def failing() -> int:
+        started.set()
+        release.wait()
+        raise RuntimeError("boom")
+
+    def call(fn):  # type: ignore[no-untyped-def]
+        try:
+            flight.do("k", fn)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call, args=(failing,))
+    leader.start()
+    started.wait()
+    waiter = threading.Thread(target=call, args=(lambda: 1,))  # joins the in-flight call
+    waiter.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join()
+    waiter.join()
+    assert len(errors) == 2 and errors[0] is errors[1]
+    assert flight.do("k", lambda: 7) == 7  # the failure was not remembered
+
+
+def test_template_cache_reuses_compiled_templates(tmp_path: Path) -> None:
+    from instructvault.render import clear_template_cache, template_cache_info
+
+    _write_prompts(tmp_path)
+    vault = InstructVault(repo_root=tmp_path)
+    clear_template_cache()
+    vault.render("prompts/greet.prompt.yml", {"name": "Ava"})
+    first = template_cache_info()
+    out = vault.render("prompts/greet.prompt.yml", {"name": "Bo"})
+    second = template_cache_info()
+    assert first.misses == 2 and first.hits == 0
+    assert second.misses == 2 and second.hits == 2
+    assert out[-1].content == "Say hi to Bo"
+
+
+def test_template_cache_is_bounded() -> None:
+    from instructvault.render import TemplateCache
+
+    cache = TemplateCache(maxsize=2)
+    a = cache.get("{{ a }}")
+    cache.get("{{ b }}")
+    assert cache.get("{{ a }}") is a  # refreshes recency of "a"
+    cache.get("{{ c }}")  # evicts "b", the least recently used
+    info = cache.info()
+    assert (info.currsize, info.evictions) == (2, 1)
+    assert cache.get("{{ a }}") is a
+    assert cache.get("{{ b }}").render(b="x") == "x"
+    assert cache.info().evictions == 2
+
+
+def test_prompt_parse_cache_parses_each_source_once() -> None:
+    import yaml
+
+    from instructvault import io
+    from instructvault.io import clear_parse_cache, load_prompt, load_prompt_dict, parse_cache_info
+
+    if yaml.__with_libyaml__:
+        assert io._SafeLoader is yaml.CSafeLoader
+    clear_parse_cache()
+    parsed = load_prompt(_YAML)
+    assert parsed.spec == load_prompt_spec(_YAML)
+    assert parsed.spec is not load_prompt_spec(_YAML)  # every caller validates its own copy
+    info = parse_cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+    parsed.data["name"] = "changed"
+    parsed.spec.tests[0].vars["name"] = "changed"
+    assert load_prompt_dict(_YAML)["name"] == "greet"
+    assert load_prompt_spec(_YAML).tests[0].vars == {"name": "Ava"}
+
+
+def test_persistent_parse_cache_roundtrip_strictness_and_pruning(tmp_path: Path) -> None:
+    import os
+
+    from instructvault.io import use_parse_cache
+    from instructvault.parsecache import ParseCache
+
+    cache = ParseCache(tmp_path / "cache")
+    use_parse_cache(cache)
+    try:
+        spec = load_prompt_spec(_YAML)
+        assert load_prompt_spec(_YAML) == spec
+        assert (cache.misses, cache.writes, cache.hits) == (1, 1, 1)
+        untested = _YAML.split("tests:")[0]
+        load_prompt_spec(untested, allow_no_tests=True)
+        with pytest.raises(ValueError):
+            load_prompt_spec(untested, allow_no_tests=False)  # a lenient entry never passes a strict load
+    finally:
+        use_parse_cache(None)
+
+    assert len(list(cache.directory.glob("specs/*/*/*.json"))) == 2
+    old, recent = cache._path(_YAML), cache._path(untested)
+    os.utime(old, (1000, 1000))
+    stale = cache.directory / "specs" / "0123456789abcdef"  # another model's entries
+    stale.mkdir()
+    (stale / "old.json").write_text("{}", encoding="utf-8")
+    small = ParseCache(cache.directory, max_bytes=recent.stat().st_size * 4 // 3 + 4)
+    assert small.prune() == 1
+    assert not stale.exists() and not old.exists() and recent.exists()
+
+    recent.write_text("{not json", encoding="utf-8")  # a damaged entry is just a miss
+    assert small.get(untested) is None and small.misses == 1
+
+
+def test_persistent_parse_cache_is_lossless_and_best_effort(tmp_path: Path) -> None:
+    import datetime
+
+    from instructvault.io import use_parse_cache
+    from instructvault.parsecache import ParseCache
+
+    dated = _YAML.replace('vars: { name: "Ava" }', 'vars: { name: "Ava", when: 2024-01-02 }')
+    cache = ParseCache(tmp_path / "cache")
+    use_parse_cache(cache)
+    try:
+        cold = load_prompt_spec(dated)
+        warm = load_prompt_spec(dated)
+        assert warm == cold and warm.tests[0].vars["when"] == datetime.date(2024, 1, 2)
+        assert (cache.writes, cache.skipped, cache.hits) == (0, 2, 0)  # a date would reload as a string
+
+        not_a_dir = tmp_path / "file"
+        not_a_dir.write_text("", encoding="utf-8")
+        use_parse_cache(ParseCache(not_a_dir))
+        assert load_prompt_spec(_YAML).name == "greet"  # an unwritable cache never fails the load
+    finally:
+        use_parse_cache(None)
+
+
 # ----------------------------- judge evals ---------------------------------
 
 _JUDGE_YAML = """
@@ -199,6 +572,85 @@ def test_judge_score_unparseable_raises() -> None:
         _parse_score("no number here")
 
 
+_MULTI_JUDGE_YAML = """
+spec_version: "1.0"
+name: judged
+variables:
+  required: []
+messages:
+  - role: user
+    content: "Explain gravity"
+tests:
+  - name: quality
+    assert:
+      judge:
+        - { rubric: "Clear.", threshold: 0.5 }
+        - { rubric: "Accurate.", threshold: 0.7 }
+"""
+
+
+def test_judge_cache_ignores_threshold_and_persists(tmp_path: Path) -> None:
+    from instructvault.judge import JudgeCache
+
+    calls: list[str] = []
+
+    def judge(messages, params):  # type: ignore[no-untyped-def]
+        calls.append(messages[-1]["content"])
+        return "0.6"
+
+    spec = load_prompt_spec(_MULTI_JUDGE_YAML)
+    ok, results = run_inline_tests(spec, judge_provider=judge, judge_cache=JudgeCache(tmp_path, namespace="j"))
+    assert ok is False and len(calls) == 2
+    assert results[0].error == "judge score 0.60 < threshold 0.7"
+
+    # A new run with a lower threshold reuses the stored scores: no judge calls.
+    relaxed = load_prompt_spec(_MULTI_JUDGE_YAML.replace("threshold: 0.7", "threshold: 0.6"))
+    ok, _ = run_inline_tests(relaxed, judge_provider=judge, judge_cache=JudgeCache(tmp_path, namespace="j"))
+    assert ok is True and len(calls) == 2
+    run_inline_tests(relaxed, judge_provider=judge, judge_cache=JudgeCache(tmp_path, namespace="j", read=False))
+    assert len(calls) == 4
+
+
+@pytest.mark.parametrize("content", ["{trunc", "[]", '{"score": "high"}', '{"other": 1}'])
+def test_judge_cache_damaged_entry_is_a_miss(tmp_path: Path, content: str) -> None:
+    from instructvault.judge import JudgeCache
+    from instructvault.spec import JudgeSpec
+
+    judge = JudgeSpec(rubric="Clear.")
+    cache = JudgeCache(tmp_path, namespace="j")
+    key = cache.key("out", judge)
+    (tmp_path / key[:2]).mkdir()
+    (tmp_path / key[:2] / f"{key}.json").write_text(content, encoding="utf-8")
+    assert cache.get("out", judge) is None and cache.misses == 1
+
+    # Unwritable directory: the score is still kept for the run.
+    blocked = JudgeCache(tmp_path / "file", namespace="j")
+    (tmp_path / "file").write_text("", encoding="utf-8")
+    blocked.put("out", judge, 0.5)
+    assert blocked.get("out", judge) == 0.5
+
+
+def test_judge_batch_scores_all_rubrics_in_one_call() -> None:
+    from instructvault.judge import _parse_scores
+
+    calls: list[str] = []
+
+    def judge(messages, params):  # type: ignore[no-untyped-def]
+        calls.append(messages[-1]["content"])
+        return "1: 0.9\n2: 8/10" if "CRITERIA" in messages[-1]["content"] else "0.9"
+
+    spec = load_prompt_spec(_MULTI_JUDGE_YAML)
+    ok, _ = run_inline_tests(spec, judge_provider=judge, judge_batch=True)
+    assert ok is True and len(calls) == 1
+    assert "1. (R1) Clear." in calls[0] and calls[0].count("Explain gravity") == 1
+
+    garbled = lambda messages, params: "looks fine" if "CRITERIA" in messages[-1]["content"] else "0.9"  # noqa: E731
+    ok, _ = run_inline_tests(spec, judge_provider=garbled, judge_batch=True)  # falls back to one call per rubric
+    assert ok is True
+    with pytest.raises(ValueError, match="1 of 2"):
+        _parse_scores("1: 0.5\n0.7", 2)
+
+
 _JSON_SCHEMA_YAML = """
 spec_version: "1.0"
 name: schema_check
@@ -57,3 +57,32 @@ def test_provider_flows_to_litellm(tmp_path: Path) -> None:
     result = vault.render("prompts/with_provider.prompt.yml", vars={"name": "Ava"})
     assert result.provider == "anthropic"
     assert result.to_litellm()["model"] == "anthropic/claude-3-5-sonnet"
+
+
+def test_render_many_streams_in_order_with_errors_as_values(tmp_path: Path) -> None:
+    _init(tmp_path)
+    vault = InstructVault(repo_root=tmp_path)
+    rows = ({"name": f"user{i}"} if i % 3 else {} for i in range(1, 11))
+    out = list(vault.render_many("prompts/hello_world.prompt.yml", rows, chunksize=4))
+    assert len(out) == 10
+    for i, item in enumerate(out, start=1):
+        if i % 3:
+            assert isinstance(item, RenderResult)
+            assert item[-1].content == f"Say hello to user{i}."
+            assert item.prompt_name == "hello_world"
+        else:
+            assert isinstance(item, ValueError)
+            assert "Missing required vars" in str(item)
+
+
+def test_render_many_matches_render_across_pools(tmp_path: Path) -> None:
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    _init(tmp_path)
+    vault = InstructVault(repo_root=tmp_path)
+    rows = [{"name": f"user{i}"} for i in range(50)]
+    expected = [vault.render("prompts/hello_world.prompt.yml", r).to_dict() for r in rows]
+    with ThreadPoolExecutor(max_workers=4) as threads, ProcessPoolExecutor(max_workers=2) as procs:
+        for pool in (threads, procs):
+            got = vault.render_many("prompts/hello_world.prompt.yml", rows, executor=pool, chunksize=7)
+            assert [r.to_dict() for r in got if isinstance(r, RenderResult)] == expected